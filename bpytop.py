@@ -17,18 +17,19 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
-import os, sys, io, threading, signal, re, subprocess, logging, logging.handlers, argparse
+import os, sys, io, threading, signal, re, subprocess, logging, logging.handlers, argparse, socket, struct, errno
 import urllib.request
-from time import time, sleep, strftime, tzset
+from time import time, sleep, strftime, tzset, localtime
 from datetime import timedelta
 from _thread import interrupt_main
-from collections import defaultdict
-from select import select
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from select import select, poll, POLLPRI, POLLERR
 from string import Template
 from math import ceil, floor
 from random import randint
 from shutil import which
-from typing import List, Dict, Tuple, Union, Any, Iterable
+from typing import List, Dict, Tuple, Union, Any, Iterable, Set, Deque
 
 errors: List[str] = []
 try: import fcntl, termios, tty, pwd
@@ -62,6 +63,8 @@ args.add_argument("-b", "--boxes",		action="store",	dest="boxes", 	help = "which
 args.add_argument("-lc", "--low-color", action="store_true", 			help = "disable truecolor, converts 24-bit colors to 256-color")
 args.add_argument("-v", "--version",	action="store_true", 			help = "show version info and exit")
 args.add_argument("--debug",			action="store_true", 			help = "start with loglevel set to DEBUG overriding value set in config")
+args.add_argument("--cgroup",			action="store",	dest="cgroup",	help = "only show processes, cpu and memory usage of a cgroup, example: --cgroup system.slice/nginx.service")
+args.add_argument("--pid-root",			action="store",	dest="pid_root", type=int, help = "only show a process and its descendants, example: --pid-root 1234")
 stdargs = args.parse_args()
 
 if stdargs.version:
@@ -72,6 +75,8 @@ if stdargs.version:
 ARG_BOXES: str = stdargs.boxes
 LOW_COLOR: bool = stdargs.low_color
 DEBUG: bool = stdargs.debug
+ARG_CGROUP: str = stdargs.cgroup
+ARG_PID_ROOT: int = stdargs.pid_root or 0
 
 #? Variables ------------------------------------------------------------------------------------->
 
@@ -107,10 +112,18 @@ update_ms=$update_ms
 #* Set to 2 or higher to greatly decrease bpytop cpu usage. (Only integers)
 proc_update_mult=$proc_update_mult
 
-#* Processes sorting, "pid" "program" "arguments" "threads" "user" "memory" "cpu lazy" "cpu responsive",
-#* "cpu lazy" updates top process over time, "cpu responsive" updates top process directly.
+#* Processes sorting, "pid" "program" "arguments" "threads" "user" "memory" "cpu lazy" "cpu responsive" "cpu smooth",
+#* "fds" and "sockets" (only with "proc_fds" enabled),
+#* "cpu lazy" updates top process over time, "cpu responsive" updates top process directly,
+#* "cpu smooth" sorts by an exponentially weighted average of recent cpu usage.
 proc_sorting="$proc_sorting"
 
+#* Half-life in seconds of the cpu usage average used by "cpu smooth" sorting, lower values follow changes faster. (Only integers)
+proc_smooth_halflife=$proc_smooth_halflife
+
+#* Number of minutes of cpu time per program shown in the top consumers view, toggled with "t" in the process box. (Only integers)
+proc_top_minutes=$proc_top_minutes
+
 #* Reverse sorting order, True or False.
 proc_reversed=$proc_reversed
 
@@ -120,6 +133,13 @@ proc_tree=$proc_tree
 #* Which depth the tree view should auto collapse processes at
 tree_depth=$tree_depth
 
+#* Show threads, memory and cpu of processes in tree view including all their descendants.
+tree_totals=$tree_totals
+
+#* Sort processes with the same parent in tree view by the sum of the sorting value over their whole subtree,
+#* for all sorting options except pid, program, arguments and user.
+tree_sort_totals=$tree_sort_totals
+
 #* Use the cpu graph colors in the process list.
 proc_colors=$proc_colors
 
@@ -132,6 +152,36 @@ proc_per_core=$proc_per_core
 #* Show process memory as bytes instead of percent
 proc_mem_bytes=$proc_mem_bytes
 
+#* Hide kernel threads (kthreadd and its children) from the process list, only has effect on Linux.
+proc_hide_kernel=$proc_hide_kernel
+
+#* Show number of open file descriptors and TCP/UDP sockets for each process, only on Linux.
+#* Counts for a process are refreshed at most every 5 seconds to keep the overhead low on hosts with many sockets.
+proc_fds=$proc_fds
+
+#* Split the process scan into this many pid ranges that are read in parallel by a pool of worker threads.
+#* Only useful on hosts with tens of thousands of processes, 1 disables sharding. (Only integers)
+proc_shards=$proc_shards
+
+#* Follow process fork, exec and exit events from the kernel process connector instead of listing all pids every update.
+#* Also shows processes that started and exited between updates. Only on Linux and needs root, falls back to scanning if not available.
+proc_events=$proc_events
+
+#* File to append process start and exit events to, one line per event with time, event, pid and name. Empty to disable.
+#* The last 1000 events are always kept in memory.
+proc_log_file="$proc_log_file"
+
+#* Process accounting file to read processes that exited since last update from, shown in a row at the bottom of the process box.
+#* Needs process accounting turned on, usually "/var/log/account/pacct" or "/var/account/pacct". Only on Linux, empty to disable.
+proc_acct_file="$proc_acct_file"
+
+#* Pin processes by pid or name to sample them every "proc_pinned_ms", shown with graphs at the bottom of the process box.
+#* Separate values with whitespace, a name pins all processes with names containing it. Selected process can also be pinned with "p".
+proc_pinned="$proc_pinned"
+
+#* Sample interval in milliseconds for pinned processes, independent of "update_ms". (Only integers)
+proc_pinned_ms=$proc_pinned_ms
+
 #* Sets the CPU stat shown in upper half of the CPU graph, "total" is always available, see:
 #* https://psutil.readthedocs.io/en/latest/#psutil.cpu_times for attributes available on specific platforms.
 #* Select from a list of detected attributes from the options menu
@@ -148,6 +198,13 @@ cpu_invert_lower=$cpu_invert_lower
 #* Set to True to completely disable the lower CPU graph.
 cpu_single_graph=$cpu_single_graph
 
+#* Show cpu threads as a heatmap grid of colored cells instead of a list of cores, "auto", "on" or "off".
+#* "auto" uses the heatmap when all threads don't fit in the cpu box.
+cpu_heatmap="$cpu_heatmap"
+
+#* Group heatmap cells by "socket" or "numa" node with a graph of average usage per group, or "none". Read from sysfs on Linux.
+cpu_heatmap_group="$cpu_heatmap_group"
+
 #* Shows the system uptime in the CPU box.
 show_uptime=$show_uptime
 
@@ -166,6 +223,12 @@ temp_scale="$temp_scale"
 #* Show CPU frequency, can cause slowdowns on certain systems with some versions of psutil
 show_cpu_freq=$show_cpu_freq
 
+#* Time in milliseconds between reads of per core cpu frequencies from sysfs on Linux, independent of update_ms.
+cpu_freq_ms=$cpu_freq_ms
+
+#* Show frequency of each core in the list of cores, needs show_cpu_freq and cpu frequencies from sysfs on Linux.
+show_core_freq=$show_core_freq
+
 #* Draw a clock at top of screen, formatting according to strftime, empty string to disable.
 draw_clock="$draw_clock"
 
@@ -182,6 +245,9 @@ disks_filter="$disks_filter"
 #* Show graphs instead of meters for memory values.
 mem_graphs=$mem_graphs
 
+#* Extra memory meters read from /proc/meminfo on Linux, space separated list of: "dirty", "writeback", "slab", "shmem" and "hugepages".
+mem_extra="$mem_extra"
+
 #* If swap memory should be shown in memory box.
 show_swap=$show_swap
 
@@ -210,6 +276,10 @@ io_graph_combined=$io_graph_combined
 #* Example: "/dev/sda:100, /dev/sdb:20"
 io_graph_speeds="$io_graph_speeds"
 
+#* Sorting of the disks list, "none" keeps the mount order, "usage" ranks by used space and "io" by read/write speed.
+#* The list can be scrolled with the mouse wheel or with "[" and "]" when there are more disks than fits.
+disks_sort="$disks_sort"
+
 #* Set fixed values for network graphs, default "10M" = 10 Mibibytes, possible units "K", "M", "G", append with "bit" for bits instead of bytes, i.e "100mbit"
 net_download="$net_download"
 net_upload="$net_upload"
@@ -428,12 +498,13 @@ def strtobool(val: str) -> bool:
 
 class Config:
 	'''Holds all config variables and functions for loading from and saving to disk'''
-	keys: List[str] = ["color_theme", "update_ms", "proc_sorting", "proc_reversed", "proc_tree", "check_temp", "draw_clock", "background_update", "custom_cpu_name",
-						"proc_colors", "proc_gradient", "proc_per_core", "proc_mem_bytes", "disks_filter", "update_check", "log_level", "mem_graphs", "show_swap",
+	keys: List[str] = ["color_theme", "update_ms", "proc_sorting", "proc_smooth_halflife", "proc_top_minutes", "proc_reversed", "proc_tree", "check_temp", "draw_clock", "background_update", "custom_cpu_name",
+						"proc_colors", "proc_gradient", "proc_per_core", "proc_mem_bytes", "disks_filter", "update_check", "log_level", "mem_graphs", "mem_extra", "show_swap",
 						"swap_disk", "show_disks", "use_fstab", "net_download", "net_upload", "net_auto", "net_color_fixed", "show_init", "theme_background",
-						"net_sync", "show_battery", "tree_depth", "cpu_sensor", "show_coretemp", "proc_update_mult", "shown_boxes", "net_iface", "only_physical",
-						"truecolor", "io_mode", "io_graph_combined", "io_graph_speeds", "show_io_stat", "cpu_graph_upper", "cpu_graph_lower", "cpu_invert_lower",
-						"cpu_single_graph", "show_uptime", "temp_scale", "show_cpu_freq"]
+						"net_sync", "show_battery", "tree_depth", "tree_totals", "tree_sort_totals", "cpu_sensor", "show_coretemp", "proc_update_mult", "shown_boxes", "net_iface", "only_physical",
+						"truecolor", "io_mode", "io_graph_combined", "io_graph_speeds", "disks_sort", "show_io_stat", "cpu_graph_upper", "cpu_graph_lower", "cpu_invert_lower", "cpu_heatmap", "cpu_heatmap_group",
+						"cpu_single_graph", "show_uptime", "temp_scale", "show_cpu_freq", "cpu_freq_ms", "show_core_freq", "proc_shards", "proc_hide_kernel", "proc_fds", "proc_events", "proc_log_file", "proc_acct_file",
+						"proc_pinned", "proc_pinned_ms"]
 	conf_dict: Dict[str, Union[str, int, bool]] = {}
 	color_theme: str = "Default"
 	theme_background: bool = True
@@ -442,29 +513,46 @@ class Config:
 	update_ms: int = 2000
 	proc_update_mult: int = 2
 	proc_sorting: str = "cpu lazy"
+	proc_smooth_halflife: int = 10
+	proc_top_minutes: int = 10
 	proc_reversed: bool = False
 	proc_tree: bool = False
 	tree_depth: int = 3
+	tree_totals: bool = False
+	tree_sort_totals: bool = False
 	proc_colors: bool = True
 	proc_gradient: bool = True
 	proc_per_core: bool = False
 	proc_mem_bytes: bool = True
+	proc_shards: int = 1
+	proc_hide_kernel: bool = False
+	proc_fds: bool = False
+	proc_events: bool = False
+	proc_log_file: str = ""
+	proc_acct_file: str = ""
+	proc_pinned: str = ""
+	proc_pinned_ms: int = 100
 	cpu_graph_upper: str = "total"
 	cpu_graph_lower: str = "total"
 	cpu_invert_lower: bool = True
 	cpu_single_graph: bool = False
+	cpu_heatmap: str = "auto"
+	cpu_heatmap_group: str = "none"
 	show_uptime: bool = True
 	check_temp: bool = True
 	cpu_sensor: str = "Auto"
 	show_coretemp: bool = True
 	temp_scale: str = "celsius"
 	show_cpu_freq: bool = True
+	cpu_freq_ms: int = 5000
+	show_core_freq: bool = False
 	draw_clock: str = "%X"
 	background_update: bool = True
 	custom_cpu_name: str = ""
 	disks_filter: str = ""
 	update_check: bool = True
 	mem_graphs: bool = True
+	mem_extra: str = ""
 	show_swap: bool = True
 	swap_disk: bool = True
 	show_disks: bool = True
@@ -474,6 +562,7 @@ class Config:
 	io_mode: bool = False
 	io_graph_combined: bool = False
 	io_graph_speeds: str = ""
+	disks_sort: str = "none"
 	net_download: str = "10M"
 	net_upload: str = "10M"
 	net_color_fixed: bool = False
@@ -487,11 +576,15 @@ class Config:
 	warnings: List[str] = []
 	info: List[str] = []
 
-	sorting_options: List[str] = ["pid", "program", "arguments", "threads", "user", "memory", "cpu lazy", "cpu responsive"]
+	sorting_options: List[str] = ["pid", "program", "arguments", "threads", "user", "memory", "cpu lazy", "cpu responsive", "cpu smooth", "fds", "sockets"]
 	log_levels: List[str] = ["ERROR", "WARNING", "INFO", "DEBUG"]
 	cpu_percent_fields: List = ["total"]
 	cpu_percent_fields.extend(getattr(psutil.cpu_times_percent(), "_fields", []))
 	temp_scales: List[str] = ["celsius", "fahrenheit", "kelvin", "rankine"]
+	cpu_heatmap_modes: List[str] = ["auto", "on", "off"]
+	cpu_heatmap_groups: List[str] = ["none", "socket", "numa"]
+	disks_sort_modes: List[str] = ["none", "usage", "io"]
+	mem_extra_names: List[str] = ["dirty", "writeback", "slab", "shmem", "hugepages"]
 
 	cpu_sensors: List[str] = [ "Auto" ]
 
@@ -581,6 +674,21 @@ class Config:
 		if "log_level" in new_config and not new_config["log_level"] in self.log_levels:
 			new_config["log_level"] = "_error_"
 			self.warnings.append(f'Config key "log_level" didn\'t get an acceptable value!')
+		if "proc_shards" in new_config and int(new_config["proc_shards"]) < 1:
+			new_config["proc_shards"] = 1
+			self.warnings.append(f'Config key "proc_shards" can\'t be lower than 1!')
+		if "proc_smooth_halflife" in new_config and int(new_config["proc_smooth_halflife"]) < 1:
+			new_config["proc_smooth_halflife"] = 1
+			self.warnings.append(f'Config key "proc_smooth_halflife" can\'t be lower than 1!')
+		if "proc_top_minutes" in new_config and int(new_config["proc_top_minutes"]) < 1:
+			new_config["proc_top_minutes"] = 1
+			self.warnings.append(f'Config key "proc_top_minutes" can\'t be lower than 1!')
+		if "proc_pinned_ms" in new_config and int(new_config["proc_pinned_ms"]) < 10:
+			new_config["proc_pinned_ms"] = 10
+			self.warnings.append(f'Config key "proc_pinned_ms" can\'t be lower than 10!')
+		if "cpu_freq_ms" in new_config and int(new_config["cpu_freq_ms"]) < 100:
+			new_config["cpu_freq_ms"] = 100
+			self.warnings.append(f'Config key "cpu_freq_ms" can\'t be lower than 100!')
 		if "update_ms" in new_config and int(new_config["update_ms"]) < 100:
 			new_config["update_ms"] = 100
 			self.warnings.append(f'Config key "update_ms" can\'t be lower than 100!')
@@ -603,6 +711,16 @@ class Config:
 		if "temp_scale" in new_config and not new_config["temp_scale"] in self.temp_scales:
 			new_config["temp_scale"] = "_error_"
 			self.warnings.append(f'Config key "temp_scale" does not contain a recognized temperature scale!')
+		if "mem_extra" in new_config:
+			for name in str(new_config["mem_extra"]).split():
+				if not name in self.mem_extra_names:
+					new_config["mem_extra"] = "_error_"
+					self.warnings.append(f'Config key "mem_extra" contains invalid meter name "{name}"!')
+					break
+		for key, valid in [("cpu_heatmap", self.cpu_heatmap_modes), ("cpu_heatmap_group", self.cpu_heatmap_groups), ("disks_sort", self.disks_sort_modes)]:
+			if key in new_config and not new_config[key] in valid:
+				new_config[key] = "_error_"
+				self.warnings.append(f'Config key "{key}" didn\'t get an acceptable value!')
 		return new_config
 
 	def save_config(self):
@@ -1594,6 +1712,8 @@ class Graphs:
 	detailed_cpu: Graph = NotImplemented
 	detailed_mem: Graph = NotImplemented
 	pid_cpu: Dict[int, Graph] = {}
+	pinned: Dict[int, Graph] = {}
+	cpu_groups: List[Graph] = []
 	disk_io: Dict[str, Dict[str, Graph]] = {}
 
 class Meter:
@@ -1806,6 +1926,9 @@ class CpuBox(Box, SubBox):
 									"Full": "■",
 									"Not charging": "■"}
 	clock_block: bool = True
+	heatmap: bool = False
+	groups: List[Tuple[str, List[int]]] = []
+	freq_width: int = 0
 	Box.buffers.append(buffer)
 
 	@classmethod
@@ -1826,21 +1949,40 @@ class CpuBox(Box, SubBox):
 		Box._b_cpu_h = cls.height
 		#THREADS = 64
 		cls.box_columns = ceil((THREADS + 1) / (cls.height - 5))
-		if cls.box_columns * (20 + 13 if cpu.got_sensors else 21) < cls.width - (cls.width // 3):
+		cls.heatmap = CONFIG.cpu_heatmap == "on"
+		if not CpuFreq.searched: CpuFreq.search()
+		cls.freq_width = 5 if CONFIG.show_cpu_freq and CONFIG.show_core_freq and CpuFreq.fds else 0
+		if cls.box_columns * ((20 + 13 if cpu.got_sensors else 21) + cls.freq_width) < cls.width - (cls.width // 3):
 			cls.column_size = 2
-			cls.box_width = (20 + 13 if cpu.got_sensors else 21) * cls.box_columns - ((cls.box_columns - 1) * 1)
-		elif cls.box_columns * (15 + 6 if cpu.got_sensors else 15) < cls.width - (cls.width // 3):
+			cls.box_width = ((20 + 13 if cpu.got_sensors else 21) + cls.freq_width) * cls.box_columns - ((cls.box_columns - 1) * 1)
+		elif cls.box_columns * ((15 + 6 if cpu.got_sensors else 15) + cls.freq_width) < cls.width - (cls.width // 3):
 			cls.column_size = 1
-			cls.box_width = (15 + 6 if cpu.got_sensors else 15) * cls.box_columns - ((cls.box_columns - 1) * 1)
-		elif cls.box_columns * (8 + 6 if cpu.got_sensors else 8) < cls.width - (cls.width // 3):
+			cls.box_width = ((15 + 6 if cpu.got_sensors else 15) + cls.freq_width) * cls.box_columns - ((cls.box_columns - 1) * 1)
+		elif cls.box_columns * ((8 + 6 if cpu.got_sensors else 8) + cls.freq_width) < cls.width - (cls.width // 3):
 			cls.column_size = 0
 		else:
-			cls.box_columns = (cls.width - cls.width // 3) // (8 + 6 if cpu.got_sensors else 8); cls.column_size = 0
+			cls.box_columns = (cls.width - cls.width // 3) // ((8 + 6 if cpu.got_sensors else 8) + cls.freq_width); cls.column_size = 0
+			cls.heatmap = cls.heatmap or CONFIG.cpu_heatmap == "auto"
 
-		if cls.column_size == 0: cls.box_width = (8 + 6 if cpu.got_sensors else 8) * cls.box_columns + 1
+		if cls.column_size == 0: cls.box_width = ((8 + 6 if cpu.got_sensors else 8) + cls.freq_width) * cls.box_columns + 1
 
 		cls.box_height = ceil(THREADS / cls.box_columns) + 4
 
+		if cls.heatmap:
+			groups: List[Tuple[str, List[int]]] = CpuTopology.groups(CONFIG.cpu_heatmap_group)
+			if groups != cls.groups:
+				cls.groups = groups
+				cpu.cpu_groups = [[] for _ in groups]
+			#* Widen the grid of one cell per thread until it fits, group summary rows are skipped for a single unlabeled group
+			summary: int = 1 if groups[0][0] else 0
+			bw: int = 30 if cpu.got_sensors else 20
+			while bw < cls.width - cls.width // 3 and 2 + sum(summary + ceil(len(threads) / bw) for _, threads in groups) > cls.height - 6:
+				bw += 1
+			cls.box_columns = 1
+			cls.column_size = 2 if bw >= 31 else 1 if bw >= 19 else 0
+			cls.box_width = bw + 2
+			cls.box_height = 4 + sum(summary + ceil(len(threads) / bw) for _, threads in groups)
+
 		if cls.box_height > cls.height - 2: cls.box_height = cls.height - 2
 		cls.box_x = (cls.width - 1) - cls.box_width
 		cls.box_y = cls.y + ceil((cls.height - 2) / 2) - ceil(cls.box_height / 2) + 1
@@ -1926,12 +2068,14 @@ class CpuBox(Box, SubBox):
 			if not CONFIG.cpu_single_graph:
 				Graphs.cpu["down"] = Graph(w - bw - 3, hh2, THEME.gradient["cpu"], cpu.cpu_lower, invert=CONFIG.cpu_invert_lower, round_up_low=True)
 			Meters.cpu = Meter(cpu.cpu_usage[0][-1], bw - (21 if cpu.got_sensors else 9), "cpu")
-			if cls.column_size > 0 or ct_width > 0:
+			if cls.heatmap:
+				Graphs.cpu_groups = [Graph(bw - 9, 1, None, cpu.cpu_groups[i]) for i in range(len(cls.groups))] if cls.groups[0][0] else []
+			elif cls.column_size > 0 or ct_width > 0:
 				for n in range(THREADS):
 					Graphs.cores[n] = Graph(5 * cls.column_size + ct_width, 1, None, cpu.cpu_usage[n + 1])
 			if cpu.got_sensors:
 				Graphs.temps[0] = Graph(5, 1, None, cpu.cpu_temp[0], max_value=cpu.cpu_temp_crit, offset=-23)
-				if cls.column_size > 1:
+				if cls.column_size > 1 and not cls.heatmap:
 					for n in range(1, THREADS + 1):
 						if not cpu.cpu_temp[n]:
 							continue
@@ -1970,8 +2114,11 @@ class CpuBox(Box, SubBox):
 		cx = cy = cc = 0
 		ccw = (bw + 1) // cls.box_columns
 		if cpu.cpu_freq:
-			freq: str = f'{cpu.cpu_freq} Mhz' if cpu.cpu_freq < 1000 else f'{float(cpu.cpu_freq / 1000):.1f} GHz'
-			out += f'{Mv.to(by - 1, bx + bw - 9)}{THEME.div_line(Symbol.title_left)}{Fx.b}{THEME.title(freq)}{Fx.ub}{THEME.div_line(Symbol.title_right)}'
+			if cls.heatmap and CpuFreq.high and bw >= 34:
+				freq: str = f'{CpuFreq.low / 1000:.1f}-{CpuFreq.high / 1000:.1f} GHz'
+			else:
+				freq = f'{cpu.cpu_freq} Mhz' if cpu.cpu_freq < 1000 else f'{float(cpu.cpu_freq / 1000):.1f} GHz'
+			out += f'{Mv.to(by - 1, bx + bw - len(freq) - 2)}{THEME.div_line(Symbol.title_left)}{Fx.b}{THEME.title(freq)}{Fx.ub}{THEME.div_line(Symbol.title_right)}'
 		out += f'{Mv.to(y, x)}{Graphs.cpu["up"](None if cls.resized else cpu.cpu_upper[-1])}'
 		if mid_line:
 			out += (f'{Mv.to(y+hh, x-1)}{THEME.cpu_box(Symbol.title_right)}{THEME.div_line}{Symbol.h_line * (w - bw - 3)}{THEME.div_line(Symbol.title_left)}'
@@ -1989,30 +2136,54 @@ class CpuBox(Box, SubBox):
 				cpu.got_sensors = False
 
 		cy += 1
-		for n in range(1, THREADS + 1):
-			out += f'{THEME.main_fg}{Mv.to(by + cy, bx + cx)}{Fx.b + "C" + Fx.ub if THREADS < 100 else ""}{str(n):<{2 if cls.column_size == 0 else 3}}'
-			if cls.column_size > 0 or ct_width > 0:
-				out += f'{THEME.inactive_fg}{"⡀" * (5 * cls.column_size + ct_width)}{Mv.l(5 * cls.column_size + ct_width)}{THEME.gradient["cpu"][cpu.cpu_usage[n][-1]]}{Graphs.cores[n-1](None if cls.resized else cpu.cpu_usage[n][-1])}'
-			else:
-				out += f'{THEME.gradient["cpu"][cpu.cpu_usage[n][-1]]}'
-			out += f'{cpu.cpu_usage[n][-1]:>{3 if cls.column_size < 2 else 4}}{THEME.main_fg}%'
-			if cpu.got_sensors and cpu.cpu_temp[n] and not hide_cores:
-				try:
-					temp, unit = temperature(cpu.cpu_temp[n][-1], CONFIG.temp_scale)
-					if cls.column_size > 1:
-						out += f'{THEME.inactive_fg} ⡀⡀⡀⡀⡀{Mv.l(5)}{THEME.gradient["temp"][min_max(cpu.cpu_temp[n][-1], 0, cpu.cpu_temp_crit) * 100 // cpu.cpu_temp_crit]}{Graphs.temps[n](None if cls.resized else cpu.cpu_temp[n][-1])}'
-					else:
-						out += f'{THEME.gradient["temp"][min_max(temp, 0, cpu.cpu_temp_crit) * 100 // cpu.cpu_temp_crit]}'
-					out += f'{temp:>4}{THEME.main_fg}{unit}'
-				except:
-					cpu.got_sensors = False
-			elif cpu.got_sensors and not hide_cores:
-				out += f'{Mv.r(max(6, 6 * cls.column_size))}'
-			out += f'{THEME.div_line(Symbol.v_line)}'
-			cy += 1
-			if cy > ceil(THREADS/cls.box_columns) and n != THREADS:
-				cc += 1; cy = 1; cx = ccw * cc
-				if cc == cls.box_columns: break
+		if cls.heatmap:
+			for i, (label, threads) in enumerate(cls.groups):
+				if label and cy < bh - 1 and Graphs.cpu_groups:
+					usage: int = cpu.cpu_groups[i][-1] if cpu.cpu_groups[i] else 0
+					out += (f'{THEME.main_fg}{Mv.to(by + cy, bx)}{Fx.b}{label:<4.4}{Fx.ub}{THEME.inactive_fg}{"⡀" * (bw - 9)}{Mv.l(bw - 9)}'
+							f'{THEME.gradient["cpu"][usage]}{Graphs.cpu_groups[i](None if cls.resized else usage)}{usage:>4}{THEME.main_fg}%')
+					cy += 1
+				for start in range(0, len(threads), bw):
+					if cy >= bh - 1: break
+					#* Cell colors are rounded to steps of 10 percent to keep color escapes down on rows of similar load
+					cells: str = ""
+					color: int = -1
+					for n in threads[start:start + bw]:
+						step: int = min_max(cpu.cpu_usage[n][-1] if cpu.cpu_usage[n] else 0, 0, 100) // 10 * 10
+						if step != color:
+							cells += f'{THEME.gradient["cpu"][step]}'
+							color = step
+						cells += Symbol.meter
+					out += f'{Mv.to(by + cy, bx)}{cells}'
+					cy += 1
+		else:
+			for n in range(1, THREADS + 1):
+				out += f'{THEME.main_fg}{Mv.to(by + cy, bx + cx)}{Fx.b + "C" + Fx.ub if THREADS < 100 else ""}{str(n):<{2 if cls.column_size == 0 else 3}}'
+				if cls.column_size > 0 or ct_width > 0:
+					out += f'{THEME.inactive_fg}{"⡀" * (5 * cls.column_size + ct_width)}{Mv.l(5 * cls.column_size + ct_width)}{THEME.gradient["cpu"][cpu.cpu_usage[n][-1]]}{Graphs.cores[n-1](None if cls.resized else cpu.cpu_usage[n][-1])}'
+				else:
+					out += f'{THEME.gradient["cpu"][cpu.cpu_usage[n][-1]]}'
+				out += f'{cpu.cpu_usage[n][-1]:>{3 if cls.column_size < 2 else 4}}{THEME.main_fg}%'
+				if cls.freq_width:
+					core_freq: int = CpuFreq.cores[n - 1] if n <= len(CpuFreq.cores) else 0
+					out += f'{THEME.inactive_fg if not core_freq else ""}{f"{core_freq / 1000:.1f}G" if core_freq else "-":>5}{THEME.main_fg}'
+				if cpu.got_sensors and cpu.cpu_temp[n] and not hide_cores:
+					try:
+						temp, unit = temperature(cpu.cpu_temp[n][-1], CONFIG.temp_scale)
+						if cls.column_size > 1:
+							out += f'{THEME.inactive_fg} ⡀⡀⡀⡀⡀{Mv.l(5)}{THEME.gradient["temp"][min_max(cpu.cpu_temp[n][-1], 0, cpu.cpu_temp_crit) * 100 // cpu.cpu_temp_crit]}{Graphs.temps[n](None if cls.resized else cpu.cpu_temp[n][-1])}'
+						else:
+							out += f'{THEME.gradient["temp"][min_max(temp, 0, cpu.cpu_temp_crit) * 100 // cpu.cpu_temp_crit]}'
+						out += f'{temp:>4}{THEME.main_fg}{unit}'
+					except:
+						cpu.got_sensors = False
+				elif cpu.got_sensors and not hide_cores:
+					out += f'{Mv.r(max(6, 6 * cls.column_size))}'
+				out += f'{THEME.div_line(Symbol.v_line)}'
+				cy += 1
+				if cy > ceil(THREADS/cls.box_columns) and n != THREADS:
+					cc += 1; cy = 1; cx = ccw * cc
+					if cc == cls.box_columns: break
 
 		if cy < bh - 1: cy = bh - 1
 
@@ -2025,7 +2196,18 @@ class CpuBox(Box, SubBox):
 				lavg = f'L {" ".join(str(round(l, 1)) for l in cpu.load_avg):^11.11}'
 			else:
 				lavg = f'{" ".join(str(round(l, 1)) for l in cpu.load_avg[:2]):^7.7}'
-			out += f'{Mv.to(by + cy, bx + cx)}{THEME.main_fg}{lavg}{THEME.div_line(Symbol.v_line)}'
+			out += f'{Mv.to(by + cy, bx + cx)}{THEME.main_fg}{lavg}{"" if cls.heatmap else THEME.div_line(Symbol.v_line)}'
+
+		#* Context switches and interrupts per second from /proc/stat in the bottom border of the cores box
+		if CpuStat.last[0]:
+			rates: List[str] = [f'{rate:.0f}' if rate < 10000 else f'{rate / 1000:.0f}k' if rate < 10000000 else f'{rate / 1000000:.0f}M' for rate in (CpuStat.ctxt_rate, CpuStat.intr_rate)]
+			rates_string: str = f'ctx {rates[0]}/s int {rates[1]}/s'
+			if len(rates_string) + 2 > bw: rates_string = f'ctx {rates[0]} int {rates[1]}'
+			if len(rates_string) + 2 > bw: rates_string = ""
+			fill: int = bw - len(rates_string) - 2
+			if rates_string:
+				out += (f'{Mv.to(by + bh, bx)}{THEME.div_line}{Symbol.h_line * (fill // 2)}{Symbol.title_left}{THEME.main_fg}{rates_string}'
+					f'{THEME.div_line}{Symbol.title_right}{Symbol.h_line * (fill - fill // 2)}')
 
 		if CONFIG.show_uptime:
 			out += f'{Mv.to(y + (0 if not CONFIG.cpu_invert_lower or CONFIG.cpu_single_graph else h - 1), x + 1)}{THEME.graph_text}{Fx.trans("up " + cpu.uptime)}'
@@ -2051,6 +2233,7 @@ class MemBox(Box):
 	disks_width: int = 0
 	disks_io_h: int = 0
 	disks_io_order: List[str] = []
+	disks_start: int = 0
 	graph_speeds: Dict[str, int] = {}
 	graph_height: int
 	resized: bool = True
@@ -2058,7 +2241,8 @@ class MemBox(Box):
 	buffer: str = "mem"
 	swap_on: bool = CONFIG.show_swap
 	Box.buffers.append(buffer)
-	mem_names: List[str] = ["used", "available", "cached", "free"]
+	mem_base: List[str] = ["used", "available", "cached", "free"]
+	mem_names: List[str] = mem_base
 	swap_names: List[str] = ["used", "free"]
 
 	@classmethod
@@ -2093,7 +2277,8 @@ class MemBox(Box):
 		else:
 			cls.mem_width = cls.width - 1
 
-		item_height: int = 6 if cls.swap_on and not CONFIG.swap_disk else 4
+		cls.mem_names = cls.mem_base + ([name for name in CONFIG.mem_extra.split() if name in CONFIG.mem_extra_names] if SYSTEM == "Linux" and not Cgroup.path else [])
+		item_height: int = len(cls.mem_names) + (2 if cls.swap_on and not CONFIG.swap_disk else 0)
 		if cls.height - (3 if cls.swap_on and not CONFIG.swap_disk else 2) > 2 * item_height: cls.mem_size = 3
 		elif cls.mem_width > 25: cls.mem_size = 2
 		else: cls.mem_size = 1
@@ -2115,6 +2300,13 @@ class MemBox(Box):
 				cls.disk_meter += 10
 			if cls.disk_meter < 1: cls.disk_meter = 0
 
+	@classmethod
+	def disks_rows(cls) -> int:
+		'''Return the number of disks that fits in the disks list with the current settings'''
+		if CONFIG.io_mode: per_disk: int = 2 if CONFIG.io_graph_combined else 3
+		else: per_disk = 3 if CONFIG.show_io_stat else 2
+		return max(1, (cls.height - 2) // per_disk)
+
 	@classmethod
 	def _draw_bg(cls) -> str:
 		if not "mem" in cls.boxes: return ""
@@ -2152,10 +2344,11 @@ class MemBox(Box):
 			Meters.disks_free = {}
 			if cls.mem_meter > 0:
 				for name in cls.mem_names:
+					gradient: str = MemInfo.extras[name][0] if name in MemInfo.extras else name
 					if CONFIG.mem_graphs:
-						Meters.mem[name] = Graph(cls.mem_meter, cls.graph_height, THEME.gradient[name], mem.vlist[name])
+						Meters.mem[name] = Graph(cls.mem_meter, cls.graph_height, THEME.gradient[gradient], mem.vlist[name])
 					else:
-						Meters.mem[name] = Meter(mem.percent[name], cls.mem_meter, name)
+						Meters.mem[name] = Meter(mem.percent[name], cls.mem_meter, gradient)
 				if cls.swap_on:
 					for name in cls.swap_names:
 						if CONFIG.swap_disk and CONFIG.show_disks:
@@ -2216,6 +2409,15 @@ class MemBox(Box):
 					Key.mouse["i"] = [[x + w - 10 + i, y-1] for i in range(2)]
 				out_misc += (f'{Mv.to(y-1, x + w - 11)}{THEME.mem_box(Symbol.title_left)}{Fx.b if CONFIG.io_mode else ""}'
 				f'{THEME.hi_fg("i")}{THEME.title("o")}{Fx.ub}{THEME.mem_box(Symbol.title_right)}')
+				Key.mouse["u"] = [[cls.divider + 3 + i, y + h] for i in range(len(CONFIG.disks_sort) + 2)]
+				out_misc += (f'{Mv.to(y + h, cls.divider + 2)}{THEME.mem_box(Symbol.title_left)}{Fx.b if CONFIG.disks_sort != "none" else ""}'
+				f'{THEME.hi_fg("u")}{THEME.title(" " + CONFIG.disks_sort)}{Fx.ub}{THEME.mem_box(Symbol.title_right)}')
+				start, end, total = mem.disks_window
+				if end - start < total:
+					position: str = f'{start + 1}-{end}/{total}' if cls.disks_width >= 25 else f'{end}/{total}'
+					out_misc += f'{Mv.to(y + h, x + w - len(position) - 3)}{THEME.mem_box(Symbol.title_left)}{THEME.title(position)}{THEME.mem_box(Symbol.title_right)}'
+			else:
+				Key.mouse.pop("u", None)
 
 			if Collector.collect_interrupt: return
 			Draw.buffer("mem_misc", out_misc, only_save=True)
@@ -2272,7 +2474,7 @@ class MemBox(Box):
 						io_item = mem.disks_io_dict.get(name, {})
 						if Collector.collect_interrupt: return
 						if cy > h - 1: break
-						out += Fx.trans(f'{Mv.to(y+cy, x+cx)}{gli}{THEME.title}{Fx.b}{item["name"]:{cls.disks_width - 2}.12}{Mv.to(y+cy, x + cx + cls.disks_width - 11)}{item["total"][:None if big_disk else -2]:>9}')
+						out += Fx.trans(f'{Mv.to(y+cy, x+cx)}{gli}{THEME.inactive_fg if item.get("stale") else THEME.title}{Fx.b}{item["name"]:{cls.disks_width - 2}.12}{Mv.to(y+cy, x + cx + cls.disks_width - 11)}{item["total"][:None if big_disk else -2]:>9}')
 						if big_disk:
 							out += Fx.trans(f'{Mv.to(y+cy, x + cx + (cls.disks_width // 2) - (len(str(item["used_percent"])) // 2) - 2)}{Fx.ub}{THEME.main_fg}{item["used_percent"]}%')
 						cy += 1
@@ -2284,12 +2486,16 @@ class MemBox(Box):
 									out += f'{Mv.to(y+cy, x+cx-1)}{" " * 5}'
 								out += (f'{Mv.to(y+cy, x+cx-1)}{Fx.ub}{Graphs.disk_io[name]["rw"](None if cls.redraw else mem.disks_io_dict[name]["rw"][-1])}'
 										f'{Mv.to(y+cy, x+cx-1)}{THEME.main_fg}{item["io"] or "RW"}')
+								if big_disk and item.get("stat") and len(item["stat"]) + len(item["io"] or "RW") < cls.disks_width - 2:
+									out += f'{Mv.to(y+cy, x + cx + cls.disks_width - 2 - len(item["stat"]))}{item["stat"]}'
 								cy += cls.disks_io_h
 							else:
 								if cls.disks_io_h <= 3:
 									out += f'{Mv.to(y+cy, x+cx-1)}{" " * 5}{Mv.to(y+cy+1, x+cx-1)}{" " * 5}'
 								out += (f'{Mv.to(y+cy, x+cx-1)}{Fx.ub}{Graphs.disk_io[name]["read"](None if cls.redraw else mem.disks_io_dict[name]["read"][-1])}'
 										f'{Mv.to(y+cy, x+cx-1)}{THEME.main_fg}{item["io_r"] or "R"}')
+								if big_disk and item.get("stat") and len(item["stat"]) + len(item["io_r"] or "R") < cls.disks_width - 2:
+									out += f'{Mv.to(y+cy, x + cx + cls.disks_width - 2 - len(item["stat"]))}{item["stat"]}'
 								cy += cls.disks_io_h // 2
 								out += f'{Mv.to(y+cy, x+cx-1)}{Graphs.disk_io[name]["write"](None if cls.redraw else mem.disks_io_dict[name]["write"][-1])}'
 								cy += cls.disks_io_h // 2
@@ -2300,7 +2506,7 @@ class MemBox(Box):
 						if not name in Meters.disks_used:
 							continue
 						if cy > h - 1: break
-						out += Fx.trans(f'{Mv.to(y+cy, x+cx)}{gli}{THEME.title}{Fx.b}{item["name"]:{cls.disks_width - 2}.12}{Mv.to(y+cy, x + cx + cls.disks_width - 11)}{item["total"][:None if big_disk else -2]:>9}')
+						out += Fx.trans(f'{Mv.to(y+cy, x+cx)}{gli}{THEME.inactive_fg if item.get("stale") else THEME.title}{Fx.b}{item["name"]:{cls.disks_width - 2}.12}{Mv.to(y+cy, x + cx + cls.disks_width - 11)}{item["total"][:None if big_disk else -2]:>9}')
 						if big_disk:
 							out += f'{Mv.to(y+cy, x + cx + (cls.disks_width // 2) - (len(item["io"]) // 2) - 2)}{Fx.ub}{THEME.main_fg}{Fx.trans(item["io"])}'
 						cy += 1
@@ -2427,6 +2633,16 @@ class NetBox(Box, SubBox):
 				else: cy += 1
 			stats["redraw"] = False
 
+		#* Packets per second, errors and drops in the free row between download and upload
+		if bh >= 5 and bh % 2 and bw >= 20:
+			down, up = net.stats[net.nic]["download"], net.stats[net.nic]["upload"]
+			packets: str = f'Pkt/s ▼{net.strings[net.nic]["download"]["packets"]} ▲{net.strings[net.nic]["upload"]["packets"]}'
+			errors: int = down["errors"] + up["errors"]
+			drops: int = down["drops"] + up["drops"]
+			faults: str = f'E:{errors if errors < 10000 else f"{errors // 1000}k"} D:{drops if drops < 10000 else f"{drops // 1000}k"}'
+			if len(packets) + len(faults) >= bw: faults = ""
+			out += f'{Mv.to(by + bh // 2, bx)}{THEME.inactive_fg}{packets}{faults:>{bw - len(packets)}}{THEME.main_fg}'
+
 		out += (f'{Mv.to(y, x)}{THEME.graph_text(net.sync_string if CONFIG.net_sync else net.strings[net.nic]["download"]["graph_top"])}'
 				f'{Mv.to(y+h-1, x)}{THEME.graph_text(net.sync_string if CONFIG.net_sync else net.strings[net.nic]["upload"]["graph_top"])}')
 
@@ -2462,6 +2678,8 @@ class ProcBox(Box):
 	redraw: bool = True
 	buffer: str = "proc"
 	pid_counter: Dict[int, int] = {}
+	footer_h: int = 0
+	pinned_max: int = 4
 	Box.buffers.append(buffer)
 
 	@classmethod
@@ -2487,7 +2705,7 @@ class ProcBox(Box):
 		cls.y = Box._b_cpu_h + 1
 		cls.current_y = cls.y
 		cls.current_h = cls.height
-		cls.select_max = cls.height - 3
+		cls.select_max = cls.height - 3 - cls.footer_h
 		cls.redraw = True
 		cls.resized = True
 
@@ -2496,8 +2714,31 @@ class ProcBox(Box):
 		if not "proc" in cls.boxes: return ""
 		return create_box(box=cls, line_color=THEME.proc_box)
 
+	@staticmethod
+	def columns(w: int, scroll: bool) -> Tuple[int, int, bool, bool, bool]:
+		'''Return program and arguments column widths and if the threads, user and fds columns fits in a process list of width w'''
+		prog_len: int; arg_len: int
+		tr_show: bool = True
+		usr_show: bool = True
+		fd_show: bool = CONFIG.proc_fds and w > 79
+		if w > 67:
+			arg_len = w - 53 - (1 if scroll else 0) - (12 if fd_show else 0)
+			prog_len = 15
+		else:
+			arg_len = 0
+			prog_len = w - 38 - (1 if scroll else 0)
+			if prog_len < 15:
+				tr_show = False
+				prog_len += 5
+			if prog_len < 12:
+				usr_show = False
+				prog_len += 9
+		return prog_len, arg_len, tr_show, usr_show, fd_show
+
 	@classmethod
 	def selector(cls, key: str, mouse_pos: Tuple[int, int] = (0, 0)):
+		#* The top consumers view has no selectable rows
+		if ProcCollector.top_view: return
 		old: Tuple[int, int] = (cls.start, cls.selected)
 		new_sel: int
 		if key in ["up", "k"]:
@@ -2577,14 +2818,26 @@ class ProcBox(Box):
 		killed: bool = True
 		indent: str = ""
 		offset: int = 0
-		tr_show: bool = True
-		usr_show: bool = True
+		tr_show: bool
+		usr_show: bool
+		fd_show: bool
 		vals: List[str]
 		g_color: str = ""
 		s_len: int = 0
 		if proc.search_filter: s_len = len(proc.search_filter[:10])
 		loc_string: str = f'{cls.start + cls.selected - 1}/{proc.num_procs}'
+		#* Width kept free left of the selection counter for compact fork and exit rates when the full rates don't fit
+		rates_w: int = 0 if w - len(loc_string) > (95 if CONFIG.proc_tree else 81) else 11
 		end: str = ""
+		pin_rows: int = min(len(ProcPinned.pids), cls.pinned_max)
+		foot_h: int = pin_rows + (1 if ProcAcct.active else 0)
+		if foot_h: foot_h += 1
+		if foot_h != cls.footer_h:
+			#* Repair box borders covered by the footer divider
+			for i in range(max(foot_h, cls.footer_h)):
+				out_misc += f'{Mv.to(y + h - 1 - i, x - 1)}{THEME.proc_box(Symbol.v_line)}{Mv.to(y + h - 1 - i, x + w)}{THEME.proc_box(Symbol.v_line)}'
+			cls.footer_h = foot_h
+			cls.redraw = True
 
 		if proc.detailed:
 			dgx, dgw = x, w // 3
@@ -2595,18 +2848,7 @@ class ProcBox(Box):
 			dx = x + dgw + 2
 			dy = cls.y + 1
 
-		if w > 67:
-			arg_len = w - 53 - (1 if proc.num_procs > cls.select_max else 0)
-			prog_len = 15
-		else:
-			arg_len = 0
-			prog_len = w - 38 - (1 if proc.num_procs > cls.select_max else 0)
-			if prog_len < 15:
-				tr_show = False
-				prog_len += 5
-			if prog_len < 12:
-				usr_show = False
-				prog_len += 9
+		prog_len, arg_len, tr_show, usr_show, fd_show = cls.columns(w, proc.num_procs > cls.select_max)
 
 		if CONFIG.proc_tree:
 			tree_len = arg_len + prog_len + 6
@@ -2656,7 +2898,7 @@ class ProcBox(Box):
 					Graphs.detailed_cpu = Graph(dgw+1, 7, THEME.gradient["cpu"], proc.details_cpu)
 					Graphs.detailed_mem = Graph(dw // 3, 1, None, proc.details_mem)
 
-				cls.select_max = cls.height - 11
+				cls.select_max = cls.height - 11 - cls.footer_h
 				y = cls.y + 9
 				h = cls.height - 10
 
@@ -2668,7 +2910,7 @@ class ProcBox(Box):
 					out_misc += (f'{Mv.to(y-1, x-1)}{THEME.proc_box}{Symbol.left_up}{Symbol.h_line*w}{Symbol.right_up}'
 						f'{Mv.to(y-1, x+1)}{THEME.proc_box(Symbol.title_left)}{Fx.b}{THEME.hi_fg(SUPERSCRIPT[cls.num])}{THEME.title(cls.name)}{Fx.ub}{THEME.proc_box(Symbol.title_right)}'
 						f'{Mv.to(y+7, x-1)}{THEME.proc_box(Symbol.v_line)}{Mv.r(w)}{THEME.proc_box(Symbol.v_line)}')
-				cls.select_max = cls.height - 3
+				cls.select_max = cls.height - 3 - cls.footer_h
 
 
 			sort_pos = x + w - len(CONFIG.proc_sorting) - 7
@@ -2713,16 +2955,16 @@ class ProcBox(Box):
 					f'{THEME.inactive_fg if cls.selected == cls.select_max else THEME.main_fg}{Symbol.down}{THEME.proc_box(Symbol.title_right)}'
 					f'{THEME.proc_box(Symbol.title_left)}{title}{Fx.b}info {Fx.ub}{main}{Symbol.enter}{THEME.proc_box(Symbol.title_right)}')
 			if not "enter" in Key.mouse: Key.mouse["enter"] = [[x + 14 + i, y+h] for i in range(6)]
-			if w - len(loc_string) > 34:
+			if w - len(loc_string) - rates_w > 34:
 				if not "T" in Key.mouse: Key.mouse["T"] = [[x + 22 + i, y+h] for i in range(9)]
 				out_misc += f'{THEME.proc_box(Symbol.title_left)}{Fx.b}{hi}T{title}erminate{Fx.ub}{THEME.proc_box(Symbol.title_right)}'
-			if w - len(loc_string) > 40:
+			if w - len(loc_string) - rates_w > 40:
 				if not "K" in Key.mouse: Key.mouse["K"] = [[x + 33 + i, y+h] for i in range(4)]
 				out_misc += f'{THEME.proc_box(Symbol.title_left)}{Fx.b}{hi}K{title}ill{Fx.ub}{THEME.proc_box(Symbol.title_right)}'
-			if w - len(loc_string) > 51:
+			if w - len(loc_string) - rates_w > 51:
 				if not "I" in Key.mouse: Key.mouse["I"] = [[x + 39 + i, y+h] for i in range(9)]
 				out_misc += f'{THEME.proc_box(Symbol.title_left)}{Fx.b}{hi}I{title}nterrupt{Fx.ub}{THEME.proc_box(Symbol.title_right)}'
-			if CONFIG.proc_tree and w - len(loc_string) > 65:
+			if CONFIG.proc_tree and w - len(loc_string) - rates_w > 65:
 				if not " " in Key.mouse: Key.mouse[" "] = [[x + 50 + i, y+h] for i in range(12)]
 				out_misc += f'{THEME.proc_box(Symbol.title_left)}{Fx.b}{hi}spc {title}collapse{Fx.ub}{THEME.proc_box(Symbol.title_right)}'
 
@@ -2730,23 +2972,30 @@ class ProcBox(Box):
 			selected: str = CONFIG.proc_sorting
 			label: str
 			if selected == "memory": selected = "mem"
+			if selected == "sockets": selected = "sock"
 			if selected == "threads" and not CONFIG.proc_tree and not arg_len: selected = "tr"
-			if CONFIG.proc_tree:
-				label = (f'{THEME.title}{Fx.b}{Mv.to(y, x)}{" Tree:":<{tree_len-2}}' + (f'{"Threads: ":<9}' if tr_show else " "*4) + (f'{"User:":<9}' if usr_show else "") + f'Mem%{"Cpu%":>11}{Fx.ub}{THEME.main_fg} ' +
+			if proc.top_view:
+				label = (f'{THEME.title}{Fx.b}{Mv.to(y, x)}{"#":>4} {"Program (last " + str(CONFIG.proc_top_minutes) + "m):":<{w-25}} {"Cpu time:":>10} {"Share:":>7}{Fx.ub}{THEME.main_fg} ')
+				selected = ""
+			elif CONFIG.proc_tree:
+				label = (f'{THEME.title}{Fx.b}{Mv.to(y, x)}{(" Tree (totals):" if CONFIG.tree_totals else " Tree:"):<{tree_len-2}}' + (f'{"Threads: ":<9}' if tr_show else " "*4) +
+						(f'{"Fds:":>5} {"Sock:":>5} ' if fd_show else "") + (f'{"User:":<9}' if usr_show else "") + f'Mem%{"Cpu%":>11}{Fx.ub}{THEME.main_fg} ' +
 						(" " if proc.num_procs > cls.select_max else ""))
 				if selected in ["pid", "program", "arguments"]: selected = "tree"
 			else:
 				label = (f'{THEME.title}{Fx.b}{Mv.to(y, x)}{"Pid:":>7} {"Program:" if prog_len > 8 else "Prg:":<{prog_len}}' + (f'{"Arguments:":<{arg_len-4}}' if arg_len else "") +
-					((f'{"Threads:":<9}' if arg_len else f'{"Tr:":^5}') if tr_show else "") + (f'{"User:":<9}' if usr_show else "") + f'Mem%{"Cpu%":>11}{Fx.ub}{THEME.main_fg} ' +
+					((f'{"Threads:":<9}' if arg_len else f'{"Tr:":^5}') if tr_show else "") + (f'{"Fds:":>5} {"Sock:":>5} ' if fd_show else "") + (f'{"User:":<9}' if usr_show else "") + f'Mem%{"Cpu%":>11}{Fx.ub}{THEME.main_fg} ' +
 					(" " if proc.num_procs > cls.select_max else ""))
 				if selected == "program" and prog_len <= 8: selected = "prg"
 			selected = selected.split(" ")[0].capitalize()
 			if CONFIG.proc_mem_bytes: label = label.replace("Mem%", "MemB")
-			label = label.replace(selected, f'{Fx.u}{selected}{Fx.uu}')
+			if selected: label = label.replace(selected, f'{Fx.u}{selected}{Fx.uu}')
 			out_misc += label
 
 			Draw.buffer("proc_misc", out_misc, only_save=True)
 
+		h -= cls.footer_h
+
 		#* Detailed box draw
 		if proc.detailed:
 			if proc.details["status"] == psutil.STATUS_RUNNING: stat_color = Fx.b
@@ -2787,9 +3036,20 @@ class ProcBox(Box):
 		elif cls.selected > cls.select_max: cls.selected = cls.select_max
 		if cls.selected < 0: cls.selected = 0
 
-		#* Start iteration over all processes and info
+		#* Top cpu consumers view, replaces the process list
 		cy = 1
-		for n, (pid, items) in enumerate(proc.processes.items(), start=1):
+		if proc.top_view:
+			top, total = ProcTop.top(h - 1)
+			for rank, (name, secs, error) in enumerate(top, start=1):
+				if secs < 60: cpu_time = f'{secs:.1f}s'
+				elif secs < 3600: cpu_time = f'{int(secs // 60)}m{int(secs % 60):02}s'
+				else: cpu_time = f'{int(secs // 3600)}h{int(secs % 3600 // 60):02}m'
+				out += (f'{Mv.to(y+cy, x)}{THEME.main_fg}{rank:>4} {Fx.b}{name:<{w-25}.{w-25}}{Fx.ub} {("~" if error else "") + cpu_time:>10} '
+						f'{THEME.gradient["process"][min(100, round(secs * 100 / total))]}{secs * 100 / total:>6.1f}%{THEME.main_fg} ')
+				cy += 1
+
+		#* Start iteration over all processes and info
+		for n, (pid, items) in enumerate(() if proc.top_view else proc.processes.items(), start=1):
 			if n < cls.start: continue
 			l_count += 1
 			if l_count == cls.selected:
@@ -2797,7 +3057,8 @@ class ProcBox(Box):
 				cls.selected_pid = pid
 			else: is_selected = False
 
-			indent, name, cmd, threads, username, mem, mem_b, cpu = [items.get(v, d) for v, d in [("indent", ""), ("name", ""), ("cmd", ""), ("threads", 0), ("username", "?"), ("mem", 0.0), ("mem_b", 0), ("cpu", 0.0)]]
+			indent, name, cmd, threads, username, mem, mem_b, cpu = items.indent, items.name, items.cmd, items.threads, items.username, items.mem, items.mem_b, items.cpu
+			fds, sockets = items.fds, items.sockets
 
 			if CONFIG.proc_tree:
 				arg_len = 0
@@ -2849,6 +3110,7 @@ class ProcBox(Box):
 				f'{c_color}{name:<{offset}.{offset}} {end}' +
 				(f'{g_color}{cmd:<{arg_len}.{arg_len-1}}' if arg_len else "") +
 				(t_color + (f'{threads:>4} ' if threads < 1000 else "999> ") + end if tr_show else "") +
+				(g_color + (f'{fds:>5} ' if fds < 100000 else f'{fds // 1000:>4}k ') + (f'{sockets:>5} ' if sockets < 100000 else f'{sockets // 1000:>4}k ') if fd_show else "") +
 				(g_color + (f'{username:<9.9}' if len(username) < 10 else f'{username[:8]:<8}+') if usr_show else "") +
 				m_color + ((f'{mem:>4.1f}' if mem < 100 else f'{mem:>4.0f} ') if not CONFIG.proc_mem_bytes else f'{floating_humanizer(mem_b, short=True):>4.4}') + end +
 				f' {THEME.inactive_fg}{"⡀"*5}{THEME.main_fg}{g_color}{c_color}' + (f' {cpu:>4.1f} ' if cpu < 100 else f'{cpu:>5.0f} ') + end +
@@ -2867,7 +3129,7 @@ class ProcBox(Box):
 				out += f'{Mv.to(y+cy+i, x)}{" " * w}'
 
 		#* Draw scrollbar if needed
-		if proc.num_procs > cls.select_max:
+		if proc.num_procs > cls.select_max and not proc.top_view:
 			if cls.resized:
 				Key.mouse["mouse_scroll_up"] = [[x+w-2+i, y] for i in range(3)]
 				Key.mouse["mouse_scroll_down"] = [[x+w-2+i, y+h-1] for i in range(3)]
@@ -2879,8 +3141,44 @@ class ProcBox(Box):
 		elif "scroll_up" in Key.mouse:
 			del Key.mouse["scroll_up"], Key.mouse["scroll_down"]
 
+		#* Draw footer with processes that exited since last update, read by ProcAcct
+		if cls.footer_h:
+			out += (f'{Mv.to(y+h, x-1)}{THEME.proc_box}{Symbol.title_right}{Symbol.h_line*w}{Symbol.title_left}{Mv.to(y+h, x+1)}{Symbol.title_left}{Fx.b}' +
+				(f'{THEME.hi_fg("p")}{THEME.title("inned")}' if pin_rows else THEME.title("exited")) + f'{Fx.ub}{THEME.proc_box(Symbol.title_right)}{THEME.main_fg}')
+		if ProcAcct.active and cls.footer_h:
+			a_cpu: float = ProcAcct.cpu_percent if CONFIG.proc_per_core else ProcAcct.cpu_percent / THREADS
+			a_names: str = " ".join(f'{name}({count})' for name, count in ProcAcct.top_names(5))
+			out += (f'{Mv.to(y+h+cls.footer_h-1, x)}{ProcAcct.count:>7} {"exited":<15} {a_names:<{w-31}.{w-31}}{Fx.b}' +
+				(f' {a_cpu:>5.1f}%' if a_cpu < 100 else f' {a_cpu:>5.0f}%') + f' {Fx.ub}{ProcAcct.cpu_time:>6.2f}s')
+
+		#* Draw pinned processes with samples gathered by ProcPinned since last draw
+		if pin_rows:
+			gw: int = w - 37
+			for i, (pid, name) in enumerate(list(ProcPinned.pids.items())[:pin_rows]):
+				samples, p_cpu, p_mem = ProcPinned.take(pid)
+				if not CONFIG.proc_per_core:
+					samples, p_cpu = [v / THREADS for v in samples], p_cpu / THREADS
+				if pid not in Graphs.pinned or Graphs.pinned[pid].width != gw:
+					Graphs.pinned[pid] = Graph(gw, 1, None, [0])
+				for v in samples:
+					Graphs.pinned[pid].add(round(v))
+				out += (f'{Mv.to(y+h+1+i, x)}{pid:>7} {name:<15.15} {THEME.proc_misc}{Graphs.pinned[pid]}{THEME.main_fg}{Fx.b}' +
+					(f' {p_cpu:>5.1f}%' if p_cpu < 100 else f' {p_cpu:>5.0f}%') + f' {Fx.ub}{floating_humanizer(p_mem, short=True):>5.5}')
+		for pid in Graphs.pinned.keys() - ProcPinned.pids.keys():
+			del Graphs.pinned[pid]
+
+		#* Draw process fork and exit rates from ProcLifecycle
+		if not rates_w and ProcLifecycle.last_update:
+			fork_rate, exit_rate = (f'{r:>5.1f}' if r < 1000 else f'{r:>5.0f}' for r in (ProcLifecycle.fork_rate, ProcLifecycle.exit_rate))
+			out += (f'{Mv.to(y+h+cls.footer_h, x + w - 31 - len(loc_string))}{THEME.proc_box(Symbol.title_left)}{THEME.title}forks{THEME.main_fg}{fork_rate}/s '
+					f'{THEME.title}exits{THEME.main_fg}{exit_rate}/s{THEME.proc_box(Symbol.title_right)}')
+		elif w - len(loc_string) > 34 and ProcLifecycle.last_update:
+			fork_rate, exit_rate = (f'{r:>3.0f}' if r < 1000 else f'{r / 1000:>2.0f}k' for r in (ProcLifecycle.fork_rate, ProcLifecycle.exit_rate))
+			out += (f'{Mv.to(y+h+cls.footer_h, x + w - 3 - rates_w - len(loc_string))}{THEME.proc_box(Symbol.title_left)}{THEME.title}f{THEME.main_fg}{fork_rate} '
+					f'{THEME.title}e{THEME.main_fg}{exit_rate}{THEME.proc_box(Symbol.title_right)}')
+
 		#* Draw current selection and number of processes
-		out += (f'{Mv.to(y+h, x + w - 3 - len(loc_string))}{THEME.proc_box}{Symbol.title_left}{THEME.title}'
+		out += (f'{Mv.to(y+h+cls.footer_h, x + w - 3 - len(loc_string))}{THEME.proc_box}{Symbol.title_left}{THEME.title}'
 					f'{Fx.b}{loc_string}{Fx.ub}{THEME.proc_box(Symbol.title_right)}')
 
 		#* Clean up dead processes graphs and counters
@@ -3003,12 +3301,428 @@ class Collector:
 		cls.collect_run.set()
 
 
+class Cgroup:
+	'''Reads processes, cpu and memory usage of a single cgroup, set up with the --cgroup argument'''
+	path: str = ""
+	version: int = 0
+	files: Dict[str, str] = {}
+	cache_key: str = ""
+	mem_host: int = 0
+	cpu_last: Tuple[int, float] = (0, 0.0)
+	root: str = "/sys/fs/cgroup"
+	v1_controllers: Tuple[str, ...] = ("cpu", "cpuacct", "cpu,cpuacct", "memory", "pids", "systemd")
+
+	@classmethod
+	def setup(cls, path: str):
+		'''Find the control files for a cgroup given as a path relative to the cgroup root or an absolute path, raises ValueError if not found'''
+		base: str = path.rstrip("/")
+		rel: str = path[len(cls.root):] if path.startswith(cls.root) else path
+		rel = rel.strip("/")
+		if not os.path.isabs(path) or not os.path.isdir(path):
+			base = f'{cls.root}/{rel}'.rstrip("/")
+		if os.path.isfile(f'{base}/cgroup.controllers') or os.path.isfile(f'{base}/cpu.stat'):
+			cls.version = 2
+			cls.cache_key = "file"
+			cls.files = {"procs" : base, "cpu" : f'{base}/cpu.stat', "cpu_max" : f'{base}/cpu.max', "mem" : f'{base}/memory.current', "mem_max" : f'{base}/memory.max',
+						"mem_stat" : f'{base}/memory.stat', "swap" : f'{base}/memory.swap.current', "swap_max" : f'{base}/memory.swap.max'}
+		else:
+			if rel.split("/", 1)[0] in cls.v1_controllers: rel = rel.partition("/")[2]
+			for cpu_dir in [f'{cls.root}/cpu,cpuacct/{rel}', f'{cls.root}/cpuacct/{rel}']:
+				if os.path.isfile(f'{cpu_dir}/cpuacct.usage'): break
+			else:
+				raise ValueError(f'No cgroup found at "{base}"')
+			mem_dir: str = f'{cls.root}/memory/{rel}'
+			cls.version = 1
+			cls.cache_key = "total_cache"
+			cls.files = {"procs" : cpu_dir, "cpu" : f'{cpu_dir}/cpuacct.usage', "cpu_max" : f'{cpu_dir}/cpu.cfs_quota_us', "mem" : f'{mem_dir}/memory.usage_in_bytes',
+						"mem_max" : f'{mem_dir}/memory.limit_in_bytes', "mem_stat" : f'{mem_dir}/memory.stat', "swap" : f'{mem_dir}/memory.memsw.usage_in_bytes', "swap_max" : f'{mem_dir}/memory.memsw.limit_in_bytes'}
+		cls.mem_host = psutil.virtual_memory().total
+		cls.cpu_last = (0, 0.0)
+		cls.path = base
+		errlog.info(f'Monitoring cgroup v{cls.version} at "{base}"')
+
+	@classmethod
+	def pids(cls) -> List[int]:
+		'''Return sorted pids of all processes in the cgroup and its child cgroups'''
+		pids: List[int] = []
+		for directory, _, files in os.walk(cls.files["procs"]):
+			if not "cgroup.procs" in files: continue
+			try:
+				with open(f'{directory}/cgroup.procs', "r") as f:
+					pids.extend(int(line) for line in f if line.strip())
+			except (OSError, ValueError):
+				pass
+		return sorted(pids)
+
+	@classmethod
+	def cpu_percent(cls) -> int:
+		'''Return cpu usage of the cgroup since last call as percent of available cpus, limited by any cpu quota'''
+		usage: int = 0
+		cpus: float = THREADS
+		if cls.version == 2:
+			for line in readfile(cls.files["cpu"]).splitlines():
+				if line.startswith("usage_usec"):
+					usage = int(line.split()[1]) * 1000
+			quota: List[str] = readfile(cls.files["cpu_max"], "max").split()
+			if quota[0].isdigit() and len(quota) > 1 and int(quota[1]):
+				cpus = min(cpus, int(quota[0]) / int(quota[1]))
+		else:
+			usage = int(readfile(cls.files["cpu"], "0"))
+			quota_us: str = readfile(cls.files["cpu_max"], "-1")
+			period_us: str = readfile(cls.files["cpu_max"].replace("quota", "period"), "0")
+			if quota_us.isdigit() and period_us.isdigit() and int(period_us):
+				cpus = min(cpus, int(quota_us) / int(period_us))
+		now: float = time()
+		last_usage, last_time = cls.cpu_last
+		cls.cpu_last = (usage, now)
+		if not last_time or now <= last_time or cpus <= 0: return 0
+		return min_max(ceil((usage - last_usage) / 10000000 / (now - last_time) / cpus))
+
+	@classmethod
+	def memory(cls) -> Dict[str, int]:
+		'''Return total, free, available, cached and used memory of the cgroup, total is the memory limit or host memory if unlimited'''
+		current: int = int(readfile(cls.files["mem"], "0") or 0)
+		limit: str = readfile(cls.files["mem_max"], "max")
+		total: int = int(limit) if limit.isdigit() and 0 < int(limit) < cls.mem_host else cls.mem_host
+		cached: int = 0
+		for line in readfile(cls.files["mem_stat"]).splitlines():
+			key, _, value = line.partition(" ")
+			if key == cls.cache_key:
+				cached = int(value)
+				break
+		used: int = max(0, min(total, current - cached))
+		return {"total" : total, "free" : max(0, total - current), "available" : total - used, "cached" : cached, "used" : used}
+
+	@classmethod
+	def swap(cls) -> Union[Tuple[int, int], None]:
+		'''Return total and free swap of the cgroup or None if not accounted, total is the swap limit or host swap if unlimited'''
+		if not os.path.isfile(cls.files["swap"]): return None
+		host_total: int = psutil.swap_memory().total
+		used: int = int(readfile(cls.files["swap"], "0") or 0)
+		limit: str = readfile(cls.files["swap_max"], "max")
+		if cls.version == 1:
+			used = max(0, used - int(readfile(cls.files["mem"], "0") or 0))
+			limit = str(int(limit) - int(readfile(cls.files["mem_max"], "0") or 0)) if limit.isdigit() else "max"
+		total: int = int(limit) if limit.isdigit() and 0 < int(limit) < host_total else host_total
+		return total, max(0, total - used)
+
+class CpuTopology:
+	'''Groups cpu threads by socket or numa node from sysfs topology on Linux'''
+	root: str = "/sys/devices/system"
+	cache: Dict[str, List[Tuple[str, List[int]]]] = {}
+
+	@classmethod
+	def groups(cls, mode: str) -> List[Tuple[str, List[int]]]:
+		'''Return a list of (label, thread numbers starting at 1) per group, a single unlabeled group if mode is "none" or topology is unavailable'''
+		if mode in cls.cache: return cls.cache[mode]
+		members: Dict[int, List[int]] = {}
+		if SYSTEM == "Linux" and mode == "socket":
+			for n in range(THREADS):
+				package: str = readfile(f'{cls.root}/cpu/cpu{n}/topology/physical_package_id')
+				if package.isdigit(): members.setdefault(int(package), []).append(n + 1)
+		elif SYSTEM == "Linux" and mode == "numa" and os.path.isdir(f'{cls.root}/node'):
+			for node in os.listdir(f'{cls.root}/node'):
+				if not node.startswith("node") or not node[4:].isdigit(): continue
+				for n in cls.cpulist(readfile(f'{cls.root}/node/{node}/cpulist')):
+					if n < THREADS: members.setdefault(int(node[4:]), []).append(n + 1)
+		groups: List[Tuple[str, List[int]]] = [(f'{mode[0].upper()}{num}', sorted(threads)) for num, threads in sorted(members.items())]
+		if len(groups) < 2 or sorted(n for _, threads in groups for n in threads) != list(range(1, THREADS + 1)):
+			groups = [("", list(range(1, THREADS + 1)))]
+		cls.cache[mode] = groups
+		return groups
+
+	@staticmethod
+	def cpulist(line: str) -> List[int]:
+		'''Convert a sysfs cpu list like "0-3,8-11" to a list of cpu numbers'''
+		out: List[int] = []
+		for part in line.split(","):
+			start, _, end = part.strip().partition("-")
+			if start.isdigit(): out.extend(range(int(start), int(end if end.isdigit() else start) + 1))
+		return out
+
+class CpuStat:
+	'''Samples /proc/stat on Linux with a single read per update through a reused file handle and keeps the previous tick counters,
+	calculates total, per thread and per field cpu usage the same way as psutil, plus context switch and interrupt rates'''
+	path: str = "/proc/stat"
+	fields: Tuple[str, ...] = ("user", "nice", "system", "idle", "iowait", "irq", "softirq", "steal", "guest", "guest_nice")
+	counter_keys: Tuple[str, ...] = ("ctxt", "intr", "processes", "procs_running", "procs_blocked")
+	file: Union[io.TextIOWrapper, None] = None
+	failed: bool = False
+	stamp: float = 0.0
+	ticks: Dict[str, List[int]] = {}
+	counters: Dict[str, int] = {}
+	last: Tuple[float, Dict[str, List[int]], Dict[str, int]] = (0.0, {}, {})
+	total: float = 0.0
+	threads: List[float] = []
+	times: Dict[str, float] = {}
+	ctxt_rate: float = 0.0
+	intr_rate: float = 0.0
+
+	@classmethod
+	def read(cls, max_age: float = 0.0) -> bool:
+		'''Read and parse /proc/stat unless the last read is newer than max_age seconds, return False if not available'''
+		if cls.failed: return False
+		if max_age and time() - cls.stamp < max_age: return True
+		try:
+			if cls.file is None: cls.file = open(cls.path, "r")
+			cls.file.seek(0)
+			data: str = cls.file.read()
+		except OSError as e:
+			errlog.warning(f'Failed to read {cls.path}, falling back to psutil: {e}')
+			cls.stop()
+			cls.failed = True
+			return False
+		ticks: Dict[str, List[int]] = {}
+		counters: Dict[str, int] = {}
+		for line in data.splitlines():
+			key, _, values = line.partition(" ")
+			if key.startswith("cpu"):
+				ticks[key] = [int(n) for n in values.split()]
+			elif key in cls.counter_keys:
+				counters[key] = int(values.split(" ", 1)[0])
+		if not "cpu" in ticks:
+			errlog.warning(f'No cpu line in {cls.path}, falling back to psutil')
+			cls.stop()
+			cls.failed = True
+			return False
+		cls.stamp = time()
+		cls.ticks = ticks
+		cls.counters = counters
+		return True
+
+	@classmethod
+	def sample(cls) -> bool:
+		'''Read /proc/stat and calculate usage since last sample (since boot on first sample), return False if not available'''
+		if not cls.read(): return False
+		last_time, last_ticks, last_counters = cls.last
+		cls.last = (cls.stamp, cls.ticks, cls.counters)
+		usage: List[float] = []
+		for name, values in cls.ticks.items():
+			prev: List[int] = last_ticks.get(name, [])
+			if len(prev) != len(values): prev = [0] * len(values)
+			deltas: List[int] = [max(0, now - before) for now, before in zip(values, prev)]
+			#* Guest time is already included in user and nice time
+			all_delta: int = sum(deltas[:8])
+			busy: int = all_delta - sum(deltas[3:5])
+			usage.append(min(100.0, busy * 100 / all_delta) if all_delta > 0 else 0.0)
+			if name == "cpu":
+				cls.times = {field : min(100.0, round(delta * 100 / all_delta, 1)) if all_delta > 0 else 0.0 for field, delta in zip(cls.fields, deltas)}
+		cls.total, cls.threads = usage[0], usage[1:]
+		elapsed: float = cls.stamp - last_time
+		if last_time and elapsed > 0:
+			cls.ctxt_rate = max(0, cls.counters.get("ctxt", 0) - last_counters.get("ctxt", 0)) / elapsed
+			cls.intr_rate = max(0, cls.counters.get("intr", 0) - last_counters.get("intr", 0)) / elapsed
+		return True
+
+	@classmethod
+	def stop(cls):
+		if cls.file is not None:
+			try: cls.file.close()
+			except OSError: pass
+			cls.file = None
+
+
+class HwmonTemp:
+	'''A temperature input found by Hwmon, current temperature is read through a persistent file descriptor when accessed'''
+	__slots__ = ("label", "high", "critical", "path", "fd")
+
+	def __init__(self, label: str, path: str, fd: int, high: Union[float, None], critical: Union[float, None]):
+		self.label = label
+		self.path = path
+		self.fd = fd
+		self.high = high
+		self.critical = critical
+
+	@property
+	def current(self) -> float:
+		return int(os.pread(self.fd, 32, 0)) / 1000
+
+class Hwmon:
+	'''Finds temperature sensors in /sys/class/hwmon once with the same names, labels and order as psutil.sensors_temperatures(),
+	so only the inputs of the sensors in use are read each update. Sensors are searched for again after read errors'''
+	root: str = "/sys/class/hwmon"
+	sensors: Dict[str, List[HwmonTemp]] = {}
+	searched: bool = False
+	errors: int = 0
+
+	@classmethod
+	def temperatures(cls, sensor: str = "Auto") -> Dict[str, List[Any]]:
+		'''Return found sensors, or psutil.sensors_temperatures() if none was found in hwmon or if "sensor" isn't among them,
+		since psutil can also report sensors from other sources like /sys/class/thermal'''
+		if not cls.searched: cls.search()
+		if not cls.sensors: return psutil.sensors_temperatures()
+		if sensor != "Auto":
+			name, _, label = sensor.partition(":")
+			if not any(entry.label == label or str(num) == label for num, entry in enumerate(cls.sensors.get(name, []), 1)):
+				return psutil.sensors_temperatures()
+		return cls.sensors
+
+	@classmethod
+	def search(cls):
+		cls.reset()
+		cls.searched = True
+		if SYSTEM != "Linux" or not os.path.isdir(cls.root): return
+		bases: Set[str] = set()
+		for hwmon in os.listdir(cls.root):
+			if not hwmon.startswith("hwmon"): continue
+			for directory in [f'{cls.root}/{hwmon}', f'{cls.root}/{hwmon}/device']:
+				try:
+					bases.update(f'{directory}/{file.split("_")[0]}' for file in os.listdir(directory) if file.startswith("temp") and "_" in file)
+				except OSError:
+					pass
+		for base in sorted(bases):
+			try:
+				fd: int = os.open(f'{base}_input', os.O_RDONLY)
+			except OSError:
+				continue
+			try:
+				int(os.pread(fd, 32, 0))
+				with open(f'{os.path.dirname(base)}/name', "r") as f:
+					name: str = f.read().strip()
+			except (OSError, ValueError):
+				os.close(fd)
+				continue
+			high_s: str = readfile(f'{base}_max')
+			critical_s: str = readfile(f'{base}_crit')
+			high: Union[float, None] = int(high_s) / 1000 if high_s.lstrip("-").isdigit() else None
+			critical: Union[float, None] = int(critical_s) / 1000 if critical_s.lstrip("-").isdigit() else None
+			#* Same fallbacks as psutil when only one of the limits is available
+			if high and not critical: critical = high
+			elif critical and not high: high = critical
+			cls.sensors.setdefault(name, []).append(HwmonTemp(readfile(f'{base}_label'), f'{base}_input', fd, high, critical))
+		errlog.debug(f'Found {sum(len(entries) for entries in cls.sensors.values())} temperature sensors in {cls.root}')
+
+	@classmethod
+	def reset(cls):
+		for entries in cls.sensors.values():
+			for entry in entries:
+				try: os.close(entry.fd)
+				except OSError: pass
+		cls.sensors = {}
+		cls.searched = False
+
+class CpuFreq:
+	'''Reads current frequency of each cpu thread from sysfs cpufreq through persistent file descriptors on Linux,
+	sampled every "cpu_freq_ms" independent of update_ms'''
+	root: str = "/sys/devices/system/cpu"
+	fds: Dict[int, int] = {}
+	cores: List[int] = []
+	average: int = 0
+	low: int = 0
+	high: int = 0
+	last: float = 0.0
+	searched: bool = False
+
+	@classmethod
+	def search(cls):
+		cls.stop()
+		cls.searched = True
+		if SYSTEM != "Linux": return
+		for n in range(THREADS):
+			try:
+				cls.fds[n] = os.open(f'{cls.root}/cpu{n}/cpufreq/scaling_cur_freq', os.O_RDONLY)
+			except OSError:
+				pass
+
+	@classmethod
+	def update(cls) -> bool:
+		'''Read frequencies in MHz if "cpu_freq_ms" has passed since last read, return False if no frequencies are available'''
+		if not cls.searched: cls.search()
+		if not cls.fds: return False
+		now: float = time()
+		if now - cls.last >= CONFIG.cpu_freq_ms / 1000:
+			cls.last = now
+			cores: List[int] = [0] * THREADS
+			for n, fd in cls.fds.items():
+				try:
+					cores[n] = int(os.pread(fd, 32, 0)) // 1000
+				except (OSError, ValueError):
+					pass
+			known: List[int] = [freq for freq in cores if freq]
+			cls.cores = cores
+			cls.average = sum(known) // len(known) if known else 0
+			cls.low, cls.high = min(known, default=0), max(known, default=0)
+		return cls.average > 0
+
+	@classmethod
+	def stop(cls):
+		for fd in cls.fds.values():
+			try: os.close(fd)
+			except OSError: pass
+		cls.fds = {}
+		cls.cores = []
+		cls.average = cls.low = cls.high = 0
+		cls.last = 0.0
+		cls.searched = False
+
+class TempSampler:
+	'''Runs the coretemp, osx-cpu-temp or vcgencmd sensor commands in a background thread, at most every update_ms and not more often
+	than every "min_interval" seconds, CpuCollector reads the last sampled cpu and core temperatures without waiting for the commands'''
+	method: str = ""
+	temp: int = -1
+	cores: List[int] = []
+	error: Union[Exception, None] = None
+	min_interval: float = 3.0
+	thread: Union[threading.Thread, None] = None
+	stopping = threading.Event()
+	lock = threading.Lock()
+
+	@classmethod
+	def start(cls, method: str):
+		if cls.thread is not None and cls.method == method: return
+		cls.stop()
+		cls.method = method
+		cls.stopping.clear()
+		cls.thread = threading.Thread(target=cls._runner, daemon=True)
+		cls.thread.start()
+
+	@classmethod
+	def stop(cls):
+		cls.stopping.set()
+		if cls.thread is not None:
+			cls.thread.join(timeout=2)
+			cls.thread = None
+		with cls.lock:
+			cls.temp, cls.cores, cls.error = -1, [], None
+
+	@classmethod
+	def take(cls) -> Tuple[int, List[int]]:
+		'''Return last sampled cpu temperature and core temperatures, cpu temperature is -1 before the first sample.
+		Raises the exception that stopped sampling, if any'''
+		with cls.lock:
+			if cls.error is not None: raise cls.error
+			return cls.temp, cls.cores.copy()
+
+	@classmethod
+	def _runner(cls):
+		while True:
+			try:
+				temp, cores = cls._sample(cls.method)
+			except Exception as e:
+				with cls.lock: cls.error = e
+				break
+			with cls.lock:
+				cls.temp, cls.cores = temp, cores
+			if cls.stopping.wait(max(cls.min_interval, CONFIG.update_ms / 1000)): break
+
+	@staticmethod
+	def _sample(method: str) -> Tuple[int, List[int]]:
+		if method == "coretemp":
+			return (max(0, int(subprocess.check_output(["coretemp", "-p"], universal_newlines=True).strip())),
+					[max(0, int(x)) for x in subprocess.check_output("coretemp", universal_newlines=True).split()])
+		elif method == "osx-cpu-temp":
+			return max(0, round(float(subprocess.check_output("osx-cpu-temp", universal_newlines=True).strip()[:-2]))), []
+		elif method == "vcgencmd":
+			return max(0, round(float(subprocess.check_output(["vcgencmd", "measure_temp"], universal_newlines=True).strip()[5:-2]))), []
+		raise ValueError(f'Unknown sensor method "{method}"')
+
 class CpuCollector(Collector):
-	'''Collects cpu usage for cpu and cores, cpu frequency, load_avg, uptime and cpu temps'''
+	'''Collects cpu usage for cpu, cores and heatmap groups, cpu frequency, load_avg, uptime and cpu temps'''
 	cpu_usage: List[List[int]] = []
 	cpu_upper: List[int] = []
 	cpu_lower: List[int] = []
 	cpu_temp: List[List[int]] = []
+	cpu_groups: List[List[int]] = []
 	cpu_temp_high: int = 0
 	cpu_temp_crit: int = 0
 	for _ in range(THREADS + 1):
@@ -3028,6 +3742,8 @@ class CpuCollector(Collector):
 	def get_sensors(cls):
 		'''Check if we can get cpu temps and return method of getting temps'''
 		cls.sensor_method = ""
+		Hwmon.reset()
+		TempSampler.stop()
 		if SYSTEM == "MacOS":
 			try:
 				if which("coretemp") and subprocess.check_output(["coretemp", "-p"], universal_newlines=True).strip().replace("-", "").isdigit():
@@ -3059,29 +3775,43 @@ class CpuCollector(Collector):
 
 	@classmethod
 	def _collect(cls):
-		cls.cpu_usage[0].append(ceil(psutil.cpu_percent(percpu=False)))
+		stat: bool = SYSTEM == "Linux" and CpuStat.sample()
+		if Cgroup.path:
+			cls.cpu_usage[0].append(Cgroup.cpu_percent())
+		elif stat:
+			cls.cpu_usage[0].append(ceil(CpuStat.total))
+		else:
+			cls.cpu_usage[0].append(ceil(psutil.cpu_percent(percpu=False)))
 		if len(cls.cpu_usage[0]) > Term.width * 4:
 			del cls.cpu_usage[0][0]
 
-		cpu_times_percent = psutil.cpu_times_percent()
+		cpu_times_percent: Dict[str, float] = CpuStat.times if stat else psutil.cpu_times_percent()._asdict()
 		for x in ["upper", "lower"]:
 			if getattr(CONFIG, "cpu_graph_" + x) == "total":
 				setattr(cls, "cpu_" + x, cls.cpu_usage[0])
 			else:
-				getattr(cls, "cpu_" + x).append(ceil(getattr(cpu_times_percent, getattr(CONFIG, "cpu_graph_" + x))))
+				getattr(cls, "cpu_" + x).append(ceil(cpu_times_percent.get(getattr(CONFIG, "cpu_graph_" + x), 0)))
 			if len(getattr(cls, "cpu_" + x)) > Term.width * 4:
 				del getattr(cls, "cpu_" + x)[0]
 
-		for n, thread in enumerate(psutil.cpu_percent(percpu=True), start=1):
+		for n, thread in enumerate(CpuStat.threads[:THREADS] if stat else psutil.cpu_percent(percpu=True), start=1):
 			cls.cpu_usage[n].append(ceil(thread))
 			if len(cls.cpu_usage[n]) > Term.width * 2:
 				del cls.cpu_usage[n][0]
+		if CpuBox.heatmap and len(cls.cpu_groups) == len(CpuBox.groups) > 1:
+			for usage, (_, threads) in zip(cls.cpu_groups, CpuBox.groups):
+				usage.append(ceil(sum(cls.cpu_usage[n][-1] for n in threads if cls.cpu_usage[n]) / len(threads)))
+				if len(usage) > Term.width * 2:
+					del usage[0]
 		try:
-			if CONFIG.show_cpu_freq and hasattr(psutil.cpu_freq(), "current"):
-				freq: float = psutil.cpu_freq().current
+			if not CONFIG.show_cpu_freq:
+				if cls.cpu_freq > 0: cls.cpu_freq = 0
+			elif CpuFreq.update():
+				cls.cpu_freq = CpuFreq.average
+			else:
+				freq_info = psutil.cpu_freq()
+				freq: float = getattr(freq_info, "current", 0.0)
 				cls.cpu_freq = round(freq * (1 if freq > 10 else 1000))
-			elif cls.cpu_freq > 0:
-				cls.cpu_freq = 0
 		except Exception as e:
 			if not cls.freq_error:
 				cls.freq_error = True
@@ -3109,7 +3839,7 @@ class CpuCollector(Collector):
 			try:
 				if CONFIG.cpu_sensor != "Auto":
 					s_name, s_label = CONFIG.cpu_sensor.split(":", 1)
-				for name, entries in psutil.sensors_temperatures().items():
+				for name, entries in Hwmon.temperatures(CONFIG.cpu_sensor).items():
 					for num, entry in enumerate(entries, 1):
 						if name == s_name and (entry.label == s_label or str(num) == s_label):
 							if entry.label.startswith("Package"):
@@ -3123,7 +3853,7 @@ class CpuCollector(Collector):
 							if getattr(entry, "critical", None) != None and entry.critical > 1: cls.cpu_temp_crit = round(entry.critical)
 							else: cls.cpu_temp_crit = 95
 							temp = round(entry.current)
-						elif entry.label.startswith(("Package", "Tdie")) and cpu_type in ["", "other"] and s_name == "_-_" and hasattr(entry, "current"):
+						elif entry.label.startswith(("Package", "Tdie")) and cpu_type in ["", "other"] and s_name == "_-_" and (isinstance(entry, HwmonTemp) or hasattr(entry, "current")):
 							if not cls.cpu_temp_high or cls.sensor_swap or cpu_type == "other":
 								cls.sensor_swap = False
 								if getattr(entry, "high", None) != None and entry.high > 1: cls.cpu_temp_high = round(entry.high)
@@ -3132,7 +3862,7 @@ class CpuCollector(Collector):
 								else: cls.cpu_temp_crit = 95
 							cpu_type = "intel" if entry.label.startswith("Package") else "ryzen"
 							temp = round(entry.current)
-						elif (entry.label.startswith(("Core", "Tccd", "CPU")) or (name.lower().startswith("cpu") and not entry.label)) and hasattr(entry, "current"):
+						elif (entry.label.startswith(("Core", "Tccd", "CPU")) or (name.lower().startswith("cpu") and not entry.label)) and (isinstance(entry, HwmonTemp) or hasattr(entry, "current")):
 							if entry.label.startswith(("Core", "Tccd")):
 								entry_int = int(entry.label.replace("Core", "").replace("Tccd", ""))
 								if entry_int in core_dict and cpu_type != "ryzen":
@@ -3147,6 +3877,7 @@ class CpuCollector(Collector):
 								continue
 							elif cpu_type in ["intel", "ryzen"]:
 								continue
+							entry_temp: int = round(entry.current)
 							if not cpu_type:
 								cpu_type = "other"
 								if not cls.cpu_temp_high or cls.sensor_swap:
@@ -3155,8 +3886,9 @@ class CpuCollector(Collector):
 									else: cls.cpu_temp_high = 60 if name == "cpu_thermal" else 80
 									if getattr(entry, "critical", None) != None and entry.critical > 1: cls.cpu_temp_crit = round(entry.critical)
 									else: cls.cpu_temp_crit = 80 if name == "cpu_thermal" else 95
-								temp = round(entry.current)
-							cores.append(round(entry.current))
+								temp = entry_temp
+							cores.append(entry_temp)
+				Hwmon.errors = 0
 				if core_dict:
 					if not temp or temp == 1000:
 						temp = sum(core_dict.values()) // len(core_dict)
@@ -3197,15 +3929,21 @@ class CpuCollector(Collector):
 							except IndexError:
 								break
 			except Exception as e:
+				if isinstance(e, (OSError, ValueError)) and Hwmon.sensors and Hwmon.errors < 3:
+					errlog.warning(f'Failed to read cpu temperature, searching for sensors again: {e}')
+					Hwmon.errors += 1
+					Hwmon.reset()
+					return
 				errlog.exception(f'{e}')
 				cls.got_sensors = False
 				CpuBox._calc_size()
 
 		else:
 			try:
+				TempSampler.start(cls.sensor_method)
+				temp, cores = TempSampler.take()
+				if temp < 0: return
 				if cls.sensor_method == "coretemp":
-					temp = max(0, int(subprocess.check_output(["coretemp", "-p"], universal_newlines=True).strip()))
-					cores = [max(0, int(x)) for x in subprocess.check_output("coretemp", universal_newlines=True).split()]
 					if len(cores) == THREADS / 2:
 						cls.cpu_temp[0].append(temp)
 						for n, t in enumerate(cores, start=1):
@@ -3225,12 +3963,10 @@ class CpuCollector(Collector):
 						cls.cpu_temp_high = 85
 						cls.cpu_temp_crit = 100
 				elif cls.sensor_method == "osx-cpu-temp":
-					temp = max(0, round(float(subprocess.check_output("osx-cpu-temp", universal_newlines=True).strip()[:-2])))
 					if not cls.cpu_temp_high:
 						cls.cpu_temp_high = 85
 						cls.cpu_temp_crit = 100
 				elif cls.sensor_method == "vcgencmd":
-					temp = max(0, round(float(subprocess.check_output(["vcgencmd", "measure_temp"], universal_newlines=True).strip()[5:-2])))
 					if not cls.cpu_temp_high:
 						cls.cpu_temp_high = 60
 						cls.cpu_temp_crit = 80
@@ -3253,6 +3989,268 @@ class CpuCollector(Collector):
 	def _draw(cls):
 		CpuBox._draw_fg()
 
+class Mounts:
+	'''Caches mounted partitions that pass the fstype excludes, "disks_filter" and fstab filters, keeping only the first mount of each filesystem.
+	On Linux the list is only rebuilt when /proc/self/mountinfo signals a change of the mount table with POLLPRI or when the filter settings change'''
+	mountinfo: str = "/proc/self/mountinfo"
+	fd: int = -1
+	poller: Any = None
+	key: Tuple = ()
+	disks: List[Any] = []
+	#* Unique name for each listed mount point, the device unless several listed mounts share the device name like "tmpfs"
+	names: Dict[str, str] = {}
+	fstab: Set[str] = set()
+	generation: int = 0
+
+	@classmethod
+	def partitions(cls, excludes: List[str]) -> List[Any]:
+		key: Tuple = (CONFIG.use_fstab, CONFIG.only_physical, CONFIG.disks_filter, tuple(excludes))
+		if cls._changed() or key != cls.key:
+			cls.key = key
+			cls._refresh(excludes)
+		return cls.disks
+
+	@classmethod
+	def _changed(cls) -> bool:
+		if SYSTEM != "Linux": return True
+		if cls.poller is None:
+			try:
+				cls.fd = os.open(cls.mountinfo, os.O_RDONLY)
+				cls.poller = poll()
+				cls.poller.register(cls.fd, POLLPRI | POLLERR)
+			except OSError as e:
+				errlog.warning(f'Can\'t watch /proc/self/mountinfo for changes, reading partitions every update: {e}')
+				cls.poller = False
+			return True
+		if cls.poller is False: return True
+		#* The kernel resets the change event for this file descriptor when polled
+		return bool(cls.poller.poll(0))
+
+	@classmethod
+	def _refresh(cls, excludes: List[str]):
+		filtering: Set[str] = set()
+		filter_exclude: bool = False
+		if CONFIG.disks_filter:
+			if CONFIG.disks_filter.startswith("exclude="):
+				filter_exclude = True
+				filtering = {v.strip() for v in CONFIG.disks_filter.replace("exclude=", "").strip().split(",")}
+			else:
+				filtering = {v.strip() for v in CONFIG.disks_filter.strip().split(",")}
+
+		cls.fstab = set()
+		if CONFIG.use_fstab and SYSTEM != "MacOS":
+			try:
+				with open('/etc/fstab','r') as fstab:
+					for line in fstab:
+						line = line.strip()
+						if line and not line.startswith('#'):
+							mount_data = (line.split())
+							if mount_data[2].lower() != "swap":
+								cls.fstab.add(mount_data[1])
+				errlog.debug(f'new fstab_filter set : {cls.fstab}')
+			except IOError:
+				CONFIG.use_fstab = False
+				errlog.warning(f'Error reading fstab, use_fstab flag reset to {CONFIG.use_fstab}')
+
+		cls.disks = []
+		cls.generation += 1
+		ids: Dict[str, str] = cls._mount_ids() if SYSTEM == "Linux" else {}
+		filesystems: Set[str] = set()
+		filesystem: str
+		for disk in psutil.disk_partitions(all=CONFIG.use_fstab or not CONFIG.only_physical):
+			if CONFIG.use_fstab and disk.mountpoint not in cls.fstab:
+				continue
+			if excludes and disk.fstype in excludes:
+				continue
+			if filtering and ((not filter_exclude and not disk.mountpoint in filtering) or (filter_exclude and disk.mountpoint in filtering)):
+				continue
+			if SYSTEM == "MacOS" and disk.mountpoint == "/private/var/vm":
+				continue
+			#* Bind and repeated mounts of the same filesystem share the "major:minor" id, mounts of pseudo filesystems without a device node are always kept
+			filesystem = ids.get(disk.mountpoint, disk.device if disk.device.startswith("/") else f'{disk.device}:{disk.mountpoint}')
+			if filesystem in filesystems:
+				continue
+			filesystems.add(filesystem)
+			cls.disks.append(disk)
+		devices: Dict[str, int] = defaultdict(int)
+		for disk in cls.disks:
+			devices[disk.device] += 1
+		cls.names = {disk.mountpoint : disk.device if devices[disk.device] == 1 else f'{disk.device}:{disk.mountpoint}' for disk in cls.disks}
+
+	@classmethod
+	def _mount_ids(cls) -> Dict[str, str]:
+		'''Return the "major:minor" id of the filesystem for each mount point in /proc/self/mountinfo'''
+		ids: Dict[str, str] = {}
+		try:
+			with open(cls.mountinfo, "r") as f:
+				for line in f:
+					fields: List[str] = line.split(" ", 5)
+					if len(fields) < 5: continue
+					#* Spaces, tabs, newlines and backslashes in mount points are octal escaped
+					ids[re.sub(r'\\([0-7]{3})', lambda m: chr(int(m.group(1), 8)), fields[4])] = fields[2]
+		except OSError as e:
+			errlog.warning(f'Failed to read {cls.mountinfo}: {e}')
+		return ids
+
+class DiskStats:
+	'''Reads /proc/diskstats on Linux with a single read per update through a reused file handle'''
+	path: str = "/proc/diskstats"
+	file: Union[io.TextIOWrapper, None] = None
+	failed: bool = False
+	stats: Dict[str, Tuple[int, int, int, int, int]] = {}
+
+	@classmethod
+	def read(cls) -> bool:
+		'''Read read bytes, write bytes, completed ios, weighted ms doing io and ms doing io per device, return False if not available'''
+		if cls.failed: return False
+		try:
+			if cls.file is None: cls.file = open(cls.path, "r")
+			cls.file.seek(0)
+			data: str = cls.file.read()
+		except OSError as e:
+			errlog.warning(f'Failed to read {cls.path}, falling back to psutil: {e}')
+			if cls.file is not None: cls.file.close()
+			cls.file = None
+			cls.failed = True
+			return False
+		stats: Dict[str, Tuple[int, int, int, int, int]] = {}
+		for line in data.splitlines():
+			#* major, minor, name, reads, reads merged, sectors read, ms reading, writes, writes merged, sectors written, ms writing,
+			#* ios in progress, ms doing io, weighted ms doing io, sectors are always 512 bytes
+			values: List[str] = line.split()
+			if len(values) < 14: continue
+			stats[values[2]] = (int(values[5]) * 512, int(values[9]) * 512, int(values[3]) + int(values[7]), int(values[13]), int(values[12]))
+		cls.stats = stats
+		return True
+
+class MemInfo:
+	'''Reads /proc/meminfo on Linux with a single read per update through a reused file handle, values are converted to bytes.
+	Feeds memory and swap values and the optional meters set in "mem_extra"'''
+	path: str = "/proc/meminfo"
+	file: Union[io.TextIOWrapper, None] = None
+	failed: bool = False
+	values: Dict[str, int] = {}
+	#* Gradient name and the /proc/meminfo keys summed for the value of each optional meter in Config.mem_extra_names
+	extras: Dict[str, Tuple[str, Tuple[str, ...]]] = dict(zip(Config.mem_extra_names, [
+		("used", ("Dirty",)),
+		("used", ("Writeback",)),
+		("cached", ("Slab",)),
+		("used", ("Shmem",)),
+		("used", ("HugePages_Used",)) ]))
+
+	@classmethod
+	def read(cls) -> bool:
+		'''Read /proc/meminfo, return False if not available'''
+		if cls.failed: return False
+		try:
+			if cls.file is None: cls.file = open(cls.path, "r")
+			cls.file.seek(0)
+			data: str = cls.file.read()
+		except OSError as e:
+			errlog.warning(f'Failed to read {cls.path}, falling back to psutil: {e}')
+			if cls.file is not None: cls.file.close()
+			cls.file = None
+			cls.failed = True
+			return False
+		values: Dict[str, int] = {}
+		for line in data.splitlines():
+			key, _, value = line.partition(":")
+			fields: List[str] = value.split()
+			if not fields or not fields[0].isdigit(): continue
+			values[key] = int(fields[0]) * (1024 if len(fields) > 1 and fields[1] == "kB" else 1)
+		if not "MemTotal" in values:
+			errlog.warning(f'No MemTotal in {cls.path}, falling back to psutil')
+			cls.failed = True
+			return False
+		values["HugePages_Used"] = (values.get("HugePages_Total", 0) - values.get("HugePages_Free", 0)) * values.get("Hugepagesize", 0)
+		cls.values = values
+		return True
+
+	@classmethod
+	def memory(cls) -> Dict[str, int]:
+		'''Return total, free, available, cached and used memory calculated the same way as psutil.virtual_memory()'''
+		total: int = cls.values["MemTotal"]
+		free: int = cls.values.get("MemFree", 0)
+		cached: int = cls.values.get("Cached", 0) + cls.values.get("SReclaimable", 0)
+		available: int = cls.values.get("MemAvailable", free + cls.values.get("Buffers", 0) + cached)
+		return {"total" : total, "free" : free, "available" : available, "cached" : cached, "used" : total - available}
+
+	@classmethod
+	def extra(cls, name: str) -> int:
+		return sum(cls.values.get(key, 0) for key in cls.extras[name][1])
+
+class DiskUsage:
+	'''Reads disk usage of mount points in daemon worker threads so a hung network or fuse mount can't stall the collector.
+	Waits at most "timeout" seconds per update for newly queued mounts, mounts that haven't answered are marked stale and keep their last known usage.
+	Mounts that answered slower than "timeout" are polled every "slow_interval" seconds, workers above "min_workers" exit after being idle as long'''
+	timeout: float = 0.2
+	slow_interval: float = 30.0
+	min_workers: int = 4
+	max_workers: int = 16
+	started: int = 0
+	queue: Deque[str] = deque()
+	pending: Dict[str, float] = {}
+	results: Dict[str, Any] = {}
+	next_poll: Dict[str, float] = {}
+	stale: Set[str] = set()
+	cond = threading.Condition()
+
+	@classmethod
+	def usage(cls, mounts: List[str]) -> Dict[str, Any]:
+		'''Return last known usage per mount point, missing for mounts that never answered'''
+		now: float = time()
+		submitted: List[str] = []
+		with cls.cond:
+			for mount in mounts:
+				if mount in cls.pending or cls.next_poll.get(mount, 0.0) > now: continue
+				cls.pending[mount] = now
+				cls.queue.append(mount)
+				submitted.append(mount)
+			#* Start more workers while hung mounts are holding workers, up to "max_workers"
+			hung: int = sum(1 for start in cls.pending.values() if now - start > cls.timeout)
+			while cls.queue and cls.started < cls.max_workers and cls.started - hung < cls.min_workers:
+				threading.Thread(target=cls._worker, daemon=True).start()
+				cls.started += 1
+			cls.cond.notify_all()
+			#* Mounts still pending from earlier updates are not waited for again
+			deadline: float = now + cls.timeout
+			while any(mount in cls.pending for mount in submitted) and time() < deadline:
+				cls.cond.wait(deadline - time())
+			cls.stale = {mount for mount in mounts if mount in cls.pending}
+			return cls.results
+
+	@classmethod
+	def prune(cls, mounts: List[str]):
+		'''Drop results and poll times of mounts that are no longer listed'''
+		with cls.cond:
+			for mount in set(cls.results) - set(mounts): del cls.results[mount]
+			for mount in set(cls.next_poll) - set(mounts): del cls.next_poll[mount]
+
+	@classmethod
+	def _worker(cls):
+		while True:
+			with cls.cond:
+				while not cls.queue:
+					if not cls.cond.wait(cls.slow_interval) and not cls.queue and cls.started > cls.min_workers:
+						cls.started -= 1
+						return
+				mount: str = cls.queue.popleft()
+			start: float = time()
+			try:
+				result: Any = psutil.disk_usage(mount)
+			except Exception:
+				result = None
+			took: float = time() - start
+			with cls.cond:
+				if result is not None: cls.results[mount] = result
+				if took > cls.timeout:
+					cls.next_poll[mount] = time() + cls.slow_interval
+					errlog.debug(f'Disk usage of "{mount}" took {took:.2f} seconds, polling every {cls.slow_interval:.0f} seconds')
+				else:
+					cls.next_poll.pop(mount, None)
+				cls.pending.pop(mount, None)
+				cls.cond.notify_all()
+
 class MemCollector(Collector):
 	'''Collects memory and disks information'''
 	values: Dict[str, int] = {}
@@ -3271,13 +4269,18 @@ class MemCollector(Collector):
 	disks_io_dict: Dict[str, Dict[str, List[int]]] = {}
 	recheck_diskutil: bool = True
 	diskutil_map: Dict[str, str] = {}
+	io_names: Dict[str, str] = {}
+	io_generation: int = -1
 
 	io_error: bool = False
 
 	old_disks: List[str] = []
 	old_io_disks: List[str] = []
-
-	fstab_filter: List[str] = []
+	old_devices: List[str] = []
+	old_window: Tuple[int, int, int] = (0, 0, 0)
+	#* Start, end and total count of the disks list
+	disks_window: Tuple[int, int, int] = (0, 0, 0)
+	usage_scan: float = 0.0
 
 	excludes: List[str] = ["squashfs", "nullfs"]
 	if SYSTEM == "BSD": excludes += ["devfs", "tmpfs", "procfs", "linprocfs", "gvfs", "fusefs"]
@@ -3287,13 +4290,21 @@ class MemCollector(Collector):
 	@classmethod
 	def _collect(cls):
 		#* Collect memory
-		mem = psutil.virtual_memory()
-		if hasattr(mem, "cached"):
-			cls.values["cached"] = mem.cached
+		meminfo: bool = SYSTEM == "Linux" and MemInfo.read()
+		if Cgroup.path:
+			cls.values.update(Cgroup.memory())
+		elif meminfo:
+			cls.values.update(MemInfo.memory())
 		else:
-			cls.values["cached"] = mem.active
-		cls.values["total"], cls.values["free"], cls.values["available"] = mem.total, mem.free, mem.available
-		cls.values["used"] = cls.values["total"] - cls.values["available"]
+			mem = psutil.virtual_memory()
+			if hasattr(mem, "cached"):
+				cls.values["cached"] = mem.cached
+			else:
+				cls.values["cached"] = mem.active
+			cls.values["total"], cls.values["free"], cls.values["available"] = mem.total, mem.free, mem.available
+			cls.values["used"] = cls.values["total"] - cls.values["available"]
+		for name in MemBox.mem_names[len(MemBox.mem_base):]:
+			cls.values[name] = MemInfo.extra(name) if meminfo else 0
 
 		for key, value in cls.values.items():
 			cls.string[key] = floating_humanizer(value)
@@ -3306,11 +4317,17 @@ class MemCollector(Collector):
 
 		#* Collect swap
 		if CONFIG.show_swap or CONFIG.swap_disk:
-			swap = psutil.swap_memory()
-			cls.swap_values["total"], cls.swap_values["free"] = swap.total, swap.free
+			cg_swap: Union[Tuple[int, int], None] = Cgroup.swap() if Cgroup.path else None
+			if cg_swap:
+				cls.swap_values["total"], cls.swap_values["free"] = cg_swap
+			elif meminfo:
+				cls.swap_values["total"], cls.swap_values["free"] = MemInfo.values.get("SwapTotal", 0), MemInfo.values.get("SwapFree", 0)
+			else:
+				swap = psutil.swap_memory()
+				cls.swap_values["total"], cls.swap_values["free"] = swap.total, swap.free
 			cls.swap_values["used"] = cls.swap_values["total"] - cls.swap_values["free"]
 
-			if swap.total:
+			if cls.swap_values["total"]:
 				if not MemBox.swap_on:
 					MemBox.redraw = True
 				MemBox.swap_on = True
@@ -3336,31 +4353,21 @@ class MemCollector(Collector):
 		#* Collect disks usage
 		disk_read: int = 0
 		disk_write: int = 0
-		dev_name: str
 		disk_name: str
-		filtering: Tuple = ()
-		filter_exclude: bool = False
+		dev: str
 		io_string_r: str
 		io_string_w: str
 		u_percent: int
 		cls.disks = {}
-
-		if CONFIG.disks_filter:
-			if CONFIG.disks_filter.startswith("exclude="):
-				filter_exclude = True
-				filtering = tuple(v.strip() for v in CONFIG.disks_filter.replace("exclude=", "").strip().split(","))
-			else:
-				filtering = tuple(v.strip() for v in CONFIG.disks_filter.strip().split(","))
-		try:
-			io_counters = psutil.disk_io_counters(perdisk=SYSTEM != "BSD", nowrap=True)
-		except ValueError as e:
-			if not cls.io_error:
-				cls.io_error = True
-				errlog.error(f'Non fatal error during disk io collection!')
-				if psutil.version_info[0] < 5 or (psutil.version_info[0] == 5 and psutil.version_info[1] < 7):
-					errlog.error(f'Caused by outdated psutil version.')
-				errlog.exception(f'{e}')
-			io_counters = None
+		now: float = time()
+		elapsed: float = max(now - cls.timestamp, 0.001)
+		io_counters: Dict[str, Tuple[int, int, int, int, int]] = cls._io_counters()
+		partitions: List[Any] = Mounts.partitions(cls.excludes)
+		devices: List[str] = [Mounts.names[disk.mountpoint] for disk in partitions]
+		if devices != cls.old_devices:
+			cls.recheck_diskutil = True
+			cls.usage_scan = 0.0
+			cls.old_devices = devices
 
 		if SYSTEM == "MacOS" and cls.recheck_diskutil:
 			cls.recheck_diskutil = False
@@ -3375,99 +4382,95 @@ class MemCollector(Collector):
 						if xdisk and ydisk:
 							cls.diskutil_map[xdisk] = ydisk
 							xdisk = ydisk = ""
+				cls.io_names = {}
 			except:
 				pass
-
-		if CONFIG.use_fstab and SYSTEM != "MacOS" and not cls.fstab_filter:
-			try:
-				with open('/etc/fstab','r') as fstab:
-					for line in fstab:
-						line = line.strip()
-						if line and not line.startswith('#'):
-							mount_data = (line.split())
-							if mount_data[2].lower() != "swap":
-								cls.fstab_filter += [mount_data[1]]
-				errlog.debug(f'new fstab_filter set : {cls.fstab_filter}')
-			except IOError:
-				CONFIG.use_fstab = False
-				errlog.warning(f'Error reading fstab, use_fstab flag reset to {CONFIG.use_fstab}')
-		if not CONFIG.use_fstab and cls.fstab_filter:
-			cls.fstab_filter = []
-			errlog.debug(f'use_fstab flag has been turned to {CONFIG.use_fstab}, fstab_filter cleared')
-
-		for disk in psutil.disk_partitions(all=CONFIG.use_fstab or not CONFIG.only_physical):
-			disk_io = None
+		if Mounts.generation != cls.io_generation:
+			cls.io_names = {}
+			cls.io_generation = Mounts.generation
+
+		#* Io counters are looked up for every disk to allow sorting by speed, usage and strings are only collected for the shown disks
+		disks_io: Dict[str, Tuple[int, int, int, int, int]] = {}
+		rates: Dict[str, Tuple[int, int]] = {}
+		if io_counters:
+			for disk in partitions:
+				if SYSTEM == "BSD":
+					disk_io = io_counters.get("") if disk.mountpoint == "/" else None
+				else:
+					if not disk.device in cls.io_names: cls.io_names[disk.device] = cls._io_name(disk.device, io_counters)
+					disk_io = io_counters.get(cls.io_names[disk.device])
+				if not disk_io: continue
+				dev = Mounts.names[disk.mountpoint]
+				disks_io[dev] = disk_io
+				if dev in cls.disk_hist:
+					last_io = cls.disk_hist[dev]
+					rates[dev] = (round(max(0, disk_io[0] - last_io[0]) / elapsed), round(max(0, disk_io[1] - last_io[1]) / elapsed))
+
+		DiskUsage.prune([disk.mountpoint for disk in partitions])
+		if CONFIG.disks_sort == "usage":
+			#* Usage of disks outside the shown window is refreshed every "DiskUsage.slow_interval" seconds for ranking
+			if now >= cls.usage_scan:
+				DiskUsage.usage([disk.mountpoint for disk in partitions])
+				cls.usage_scan = now + DiskUsage.slow_interval
+			partitions = sorted(partitions, key=lambda disk: getattr(DiskUsage.results.get(disk.mountpoint), "percent", 0), reverse=True)
+		elif CONFIG.disks_sort == "io":
+			partitions = sorted(partitions, key=lambda disk: sum(rates.get(Mounts.names[disk.mountpoint], (0, 0))), reverse=True)
+
+		rows: int = max(1, MemBox.disks_rows() - (1 if CONFIG.swap_disk and MemBox.swap_on else 0))
+		MemBox.disks_start = max(0, min(MemBox.disks_start, len(partitions) - rows))
+		partitions = partitions[MemBox.disks_start:MemBox.disks_start + rows]
+		cls.disks_window = (MemBox.disks_start, MemBox.disks_start + len(partitions), len(devices))
+
+		usage: Dict[str, Any] = DiskUsage.usage([disk.mountpoint for disk in partitions])
+		for disk in partitions:
+			dev = Mounts.names[disk.mountpoint]
 			io_string_r = io_string_w = ""
-			if CONFIG.use_fstab and disk.mountpoint not in cls.fstab_filter:
-				continue
 			disk_name = disk.mountpoint.rsplit('/', 1)[-1] if not disk.mountpoint == "/" else "root"
-			if cls.excludes and disk.fstype in cls.excludes:
-				continue
-			if filtering and ((not filter_exclude and not disk.mountpoint in filtering) or (filter_exclude and disk.mountpoint in filtering)):
-				continue
-			if SYSTEM == "MacOS" and disk.mountpoint == "/private/var/vm":
-				continue
-			try:
-				disk_u = psutil.disk_usage(disk.mountpoint)
-			except:
-				pass
+			disk_u = usage.get(disk.mountpoint)
 
 			u_percent = round(getattr(disk_u, "percent", 0))
-			cls.disks[disk.device] = { "name" : disk_name, "used_percent" : u_percent, "free_percent" : 100 - u_percent }
+			cls.disks[dev] = { "name" : disk_name, "used_percent" : u_percent, "free_percent" : 100 - u_percent, "stale" : disk.mountpoint in DiskUsage.stale }
 			for name in ["total", "used", "free"]:
-				cls.disks[disk.device][name] = floating_humanizer(getattr(disk_u, name, 0))
+				cls.disks[dev][name] = floating_humanizer(getattr(disk_u, name, 0))
 
 			#* Collect disk io
-			if io_counters:
-				try:
-					if SYSTEM != "BSD":
-						dev_name = os.path.realpath(disk.device).rsplit('/', 1)[-1]
-						if not dev_name in io_counters:
-							for names in io_counters:
-								if names in dev_name:
-									disk_io = io_counters[names]
-									break
-							else:
-								if cls.diskutil_map:
-									for names, items in cls.diskutil_map.items():
-										if items in dev_name and names in io_counters:
-											disk_io = io_counters[names]
-						else:
-							disk_io = io_counters[dev_name]
-					elif disk.mountpoint == "/":
-						disk_io = io_counters
-					else:
-						raise Exception
-					disk_read = round((disk_io.read_bytes - cls.disk_hist[disk.device][0]) / (time() - cls.timestamp)) #type: ignore
-					disk_write = round((disk_io.write_bytes - cls.disk_hist[disk.device][1]) / (time() - cls.timestamp)) #type: ignore
-					if not disk.device in cls.disks_io_dict:
-						cls.disks_io_dict[disk.device] = {"read" : [], "write" : [], "rw" : []}
-					cls.disks_io_dict[disk.device]["read"].append(disk_read >> 20)
-					cls.disks_io_dict[disk.device]["write"].append(disk_write >> 20)
-					cls.disks_io_dict[disk.device]["rw"].append((disk_read + disk_write) >> 20)
-
-					if len(cls.disks_io_dict[disk.device]["read"]) > MemBox.width:
-						del cls.disks_io_dict[disk.device]["read"][0], cls.disks_io_dict[disk.device]["write"][0], cls.disks_io_dict[disk.device]["rw"][0]
-
-				except:
-					disk_read = disk_write = 0
+			disk_io = disks_io.get(dev)
+			if dev in rates:
+				last_io = cls.disk_hist[dev]
+				disk_read, disk_write = rates[dev]
+				iops: int = round(max(0, disk_io[2] - last_io[2]) / elapsed)
+				queue: float = max(0, disk_io[3] - last_io[3]) / elapsed / 1000 if disk_io[3] >= 0 else -1
+				util: int = min(100, round(max(0, disk_io[4] - last_io[4]) / elapsed / 10)) if disk_io[4] >= 0 else -1
+				cls.disks[dev].update({ "iops" : iops, "queue" : queue, "util" : util,
+					"stat" : (f'{iops}' if iops < 10000 else f'{iops // 1000}k') + "io" + (f' q{queue:.1f}' if queue >= 0 else "") + (f' {util}%' if util >= 0 else "") })
+				if not dev in cls.disks_io_dict:
+					cls.disks_io_dict[dev] = {"read" : [], "write" : [], "rw" : []}
+				cls.disks_io_dict[dev]["read"].append(disk_read >> 20)
+				cls.disks_io_dict[dev]["write"].append(disk_write >> 20)
+				cls.disks_io_dict[dev]["rw"].append((disk_read + disk_write) >> 20)
+
+				if len(cls.disks_io_dict[dev]["read"]) > MemBox.width:
+					del cls.disks_io_dict[dev]["read"][0], cls.disks_io_dict[dev]["write"][0], cls.disks_io_dict[dev]["rw"][0]
 			else:
 				disk_read = disk_write = 0
 
 			if disk_io:
-				cls.disk_hist[disk.device] = (disk_io.read_bytes, disk_io.write_bytes)
 				if CONFIG.io_mode or MemBox.disks_width > 30:
 					if disk_read > 0:
 						io_string_r = f'▲{floating_humanizer(disk_read, short=True)}'
 					if disk_write > 0:
 						io_string_w = f'▼{floating_humanizer(disk_write, short=True)}'
 					if CONFIG.io_mode:
-						cls.disks[disk.device]["io_r"] = io_string_r
-						cls.disks[disk.device]["io_w"] = io_string_w
+						cls.disks[dev]["io_r"] = io_string_r
+						cls.disks[dev]["io_w"] = io_string_w
 				elif disk_read + disk_write > 0:
 					io_string_r += f'▼▲{floating_humanizer(disk_read + disk_write, short=True)}'
 
-			cls.disks[disk.device]["io"] = io_string_r + (" " if io_string_w and io_string_r else "") + io_string_w
+			cls.disks[dev]["io"] = io_string_r + (" " if io_string_w and io_string_r else "") + io_string_w
+
+		cls.disk_hist = disks_io
+		for name in [name for name in cls.disks_io_dict if not name in cls.disks]:
+			del cls.disks_io_dict[name]
 
 		if CONFIG.swap_disk and MemBox.swap_on:
 			cls.disks["__swap"] = { "name" : "swap", "used_percent" : cls.swap_percent["used"], "free_percent" : cls.swap_percent["free"], "io" : "" }
@@ -3482,18 +4485,82 @@ class MemCollector(Collector):
 				except:
 					pass
 
-		if cls.old_disks != list(cls.disks) or cls.old_io_disks != list(cls.disks_io_dict):
+		if cls.old_disks != list(cls.disks) or cls.old_io_disks != list(cls.disks_io_dict) or cls.old_window != cls.disks_window:
 			MemBox.redraw = True
-			cls.recheck_diskutil = True
 			cls.old_disks = list(cls.disks)
 			cls.old_io_disks = list(cls.disks_io_dict)
+			cls.old_window = cls.disks_window
 
-		cls.timestamp = time()
+		cls.timestamp = now
+
+	@classmethod
+	def _io_counters(cls) -> Dict[str, Tuple[int, int, int, int, int]]:
+		'''Return read bytes, write bytes, completed ios, weighted ms doing io and ms doing io per device from DiskStats on Linux
+		or psutil on other systems, BSD totals are returned with an empty device name and unavailable values are -1'''
+		if SYSTEM == "Linux" and DiskStats.read(): return DiskStats.stats
+		try:
+			counters = psutil.disk_io_counters(perdisk=SYSTEM != "BSD", nowrap=True)
+		except ValueError as e:
+			if not cls.io_error:
+				cls.io_error = True
+				errlog.error(f'Non fatal error during disk io collection!')
+				if psutil.version_info[0] < 5 or (psutil.version_info[0] == 5 and psutil.version_info[1] < 7):
+					errlog.error(f'Caused by outdated psutil version.')
+				errlog.exception(f'{e}')
+			return {}
+		if not counters: return {}
+		if SYSTEM == "BSD": counters = {"" : counters}
+		return {name : (c.read_bytes, c.write_bytes, c.read_count + c.write_count, -1, getattr(c, "busy_time", -1)) for name, c in counters.items()}
+
+	@classmethod
+	def _io_name(cls, device: str, io_counters: Dict[str, Any]) -> str:
+		'''Find the io counters name of a mounted device, called once per device when mounts change'''
+		dev_name: str = os.path.realpath(device).rsplit('/', 1)[-1]
+		if dev_name in io_counters: return dev_name
+		for names in io_counters:
+			if names in dev_name:
+				return names
+		for names, items in cls.diskutil_map.items():
+			if items in dev_name and names in io_counters:
+				return names
+		return ""
 
 	@classmethod
 	def _draw(cls):
 		MemBox._draw_fg()
 
+class NetDev:
+	'''Reads /proc/net/dev on Linux with a single read per update through a reused file handle, counters for each interface
+	are in the same order as psutil.net_io_counters()'''
+	path: str = "/proc/net/dev"
+	file: Union[io.TextIOWrapper, None] = None
+	failed: bool = False
+	stats: Dict[str, Tuple[int, ...]] = {}
+
+	@classmethod
+	def read(cls) -> bool:
+		'''Read bytes sent, bytes received, packets sent, packets received, errors in, errors out, drops in and drops out per interface, return False if not available'''
+		if cls.failed: return False
+		try:
+			if cls.file is None: cls.file = open(cls.path, "r")
+			cls.file.seek(0)
+			data: str = cls.file.read()
+		except OSError as e:
+			errlog.warning(f'Failed to read {cls.path}, falling back to psutil: {e}')
+			if cls.file is not None: cls.file.close()
+			cls.file = None
+			cls.failed = True
+			return False
+		stats: Dict[str, Tuple[int, ...]] = {}
+		for line in data.splitlines()[2:]:
+			name, _, values = line.partition(":")
+			fields: List[str] = values.split()
+			if len(fields) < 12: continue
+			#* Receive: bytes packets errs drop fifo frame compressed multicast, Transmit: bytes packets errs drop ...
+			stats[name.strip()] = (int(fields[8]), int(fields[0]), int(fields[9]), int(fields[1]), int(fields[2]), int(fields[10]), int(fields[3]), int(fields[11]))
+		cls.stats = stats
+		return True
+
 class NetCollector(Collector):
 	'''Collects network stats'''
 	buffer: str = NetBox.buffer
@@ -3506,9 +4573,9 @@ class NetCollector(Collector):
 	graph_raise: Dict[str, int] = {"download" : 5, "upload" : 5}
 	graph_lower: Dict[str, int] = {"download" : 5, "upload" : 5}
 	#min_top: int = 10<<10
-	#* Stats structure = stats[netword device][download, upload][total, last, top, graph_top, offset, speed, redraw, graph_raise, graph_low] = int, List[int], bool
+	#* Stats structure = stats[netword device][download, upload][total, last, top, graph_top, offset, speed, redraw, graph_raise, graph_low, packets, errors, drops] = int, List[int], bool
 	stats: Dict[str, Dict[str, Dict[str, Any]]] = {}
-	#* Strings structure strings[network device][download, upload][total, byte_ps, bit_ps, top, graph_top] = str
+	#* Strings structure strings[network device][download, upload][total, byte_ps, bit_ps, top, graph_top, packets] = str
 	strings: Dict[str, Dict[str, Dict[str, str]]] = {}
 	switched: bool = False
 	timestamp: float = time()
@@ -3518,23 +4585,24 @@ class NetCollector(Collector):
 	sync_top: int = 0
 	sync_string: str = ""
 	address: str = ""
+	#* Link state and addresses are cached and refreshed when the interfaces change or every "link_interval" seconds to catch links going up or down
+	up_stat: Dict[str, Any] = {}
+	addrs: Dict[str, List[Any]] = {}
+	link_names: Set[str] = set()
+	link_time: float = 0.0
+	link_interval: float = 10.0
 
 	@classmethod
-	def _get_nics(cls):
+	def _get_nics(cls, io_all: Union[Dict[str, Tuple[int, ...]], None] = None):
 		'''Get a list of all network devices sorted by highest throughput'''
 		cls.nic_i = 0
 		cls.nics = []
 		cls.nic = ""
-		try:
-			io_all = psutil.net_io_counters(pernic=True)
-		except Exception as e:
-			if not cls.nic_error:
-				cls.nic_error = True
-				errlog.exception(f'{e}')
+		if io_all is None: io_all = cls._io_counters()
 		if not io_all: return
-		up_stat = psutil.net_if_stats()
-		for nic in sorted(io_all.keys(), key=lambda nic: (getattr(io_all[nic], "bytes_recv", 0) + getattr(io_all[nic], "bytes_sent", 0)), reverse=True):
-			if nic not in up_stat or not up_stat[nic].isup:
+		if set(io_all) != cls.link_names: cls._refresh_links(io_all)
+		for nic in sorted(io_all.keys(), key=lambda nic: io_all[nic][0] + io_all[nic][1], reverse=True):
+			if nic not in cls.up_stat or not cls.up_stat[nic].isup:
 				continue
 			cls.nics.append(nic)
 		if not cls.nics: cls.nics = [""]
@@ -3543,6 +4611,30 @@ class NetCollector(Collector):
 			cls.nic = cls.net_iface
 			cls.nic_i = cls.nics.index(cls.nic)
 
+	@classmethod
+	def _io_counters(cls) -> Dict[str, Tuple[int, ...]]:
+		'''Return bytes sent, bytes received, packets sent, packets received, errors in, errors out, drops in and drops out per interface
+		from NetDev on Linux or psutil on other systems'''
+		if SYSTEM == "Linux" and NetDev.read(): return NetDev.stats
+		try:
+			return {nic : tuple(counters) for nic, counters in psutil.net_io_counters(pernic=True).items()}
+		except Exception as e:
+			if not cls.nic_error:
+				cls.nic_error = True
+				errlog.exception(f'{e}')
+			return {}
+
+	@classmethod
+	def _refresh_links(cls, names: Iterable[str]):
+		try:
+			cls.up_stat = psutil.net_if_stats()
+			cls.addrs = psutil.net_if_addrs()
+		except Exception as e:
+			if not cls.nic_error:
+				cls.nic_error = True
+				errlog.exception(f'{e}')
+		cls.link_names = set(names)
+		cls.link_time = time()
 
 	@classmethod
 	def switch(cls, key: str):
@@ -3564,50 +4656,57 @@ class NetCollector(Collector):
 	def _collect(cls):
 		speed: int
 		stat: Dict
-		up_stat = psutil.net_if_stats()
-
-		if sorted(cls.nics) != sorted(nic for nic in up_stat if up_stat[nic].isup):
-			old_nic = cls.nic
-			cls._get_nics()
-			cls.nic = old_nic
-			if cls.nic not in cls.nics:
-				cls.nic_i = -1
-			else:
-				cls.nic_i = cls.nics.index(cls.nic)
+		io_all: Dict[str, Tuple[int, ...]] = cls._io_counters()
+
+		if set(io_all) != cls.link_names or time() - cls.link_time > cls.link_interval:
+			cls._refresh_links(io_all)
+			if sorted(cls.nics) != sorted(nic for nic in cls.up_stat if cls.up_stat[nic].isup):
+				old_nic = cls.nic
+				cls._get_nics(io_all)
+				cls.nic = old_nic
+				if cls.nic not in cls.nics:
+					cls.nic_i = -1
+				else:
+					cls.nic_i = cls.nics.index(cls.nic)
 
 		if cls.switched:
 			cls.nic = cls.new_nic
 			cls.switched = False
 
-		if not cls.nic or cls.nic not in up_stat:
-			cls._get_nics()
+		if not cls.nic or cls.nic not in cls.up_stat:
+			cls._get_nics(io_all)
 			if not cls.nic: return
 			NetBox.redraw = True
-		try:
-			io_all = psutil.net_io_counters(pernic=True)[cls.nic]
-		except KeyError:
-			pass
+		if not cls.nic in io_all:
 			return
+		#* Counters for each direction: bytes, packets, errors and drops
+		counters: Dict[str, Tuple[int, int, int, int]] = {
+			"download" : (io_all[cls.nic][1], io_all[cls.nic][3], io_all[cls.nic][4], io_all[cls.nic][6]),
+			"upload" : (io_all[cls.nic][0], io_all[cls.nic][2], io_all[cls.nic][5], io_all[cls.nic][7]) }
 		if not cls.nic in cls.stats:
 			cls.stats[cls.nic] = {}
 			cls.strings[cls.nic] = { "download" : {}, "upload" : {}}
-			for direction, value in ["download", io_all.bytes_recv], ["upload", io_all.bytes_sent]:
-				cls.stats[cls.nic][direction] = { "total" : value, "last" : value, "top" : 0, "graph_top" : 0, "offset" : 0, "speed" : [], "redraw" : True, "graph_raise" : 0, "graph_lower" : 7 }
-				for v in ["total", "byte_ps", "bit_ps", "top", "graph_top"]:
+			for direction, value in counters.items():
+				cls.stats[cls.nic][direction] = { "total" : value[0], "last" : value[0], "top" : 0, "graph_top" : 0, "offset" : 0, "speed" : [], "redraw" : True, "graph_raise" : 0, "graph_lower" : 7,
+					"packets" : value[1], "errors" : value[2], "drops" : value[3] }
+				for v in ["total", "byte_ps", "bit_ps", "top", "graph_top", "packets"]:
 					cls.strings[cls.nic][direction][v] = ""
 
-		cls.stats[cls.nic]["download"]["total"] = io_all.bytes_recv
-		cls.stats[cls.nic]["upload"]["total"] = io_all.bytes_sent
-		if cls.nic in psutil.net_if_addrs():
-			cls.address = getattr(psutil.net_if_addrs()[cls.nic][0], "address", "")
+		if cls.nic in cls.addrs and cls.addrs[cls.nic]:
+			cls.address = getattr(cls.addrs[cls.nic][0], "address", "")
 
+		elapsed: float = max(time() - cls.timestamp, 0.001)
 		for direction in ["download", "upload"]:
 			stat = cls.stats[cls.nic][direction]
 			strings = cls.strings[cls.nic][direction]
+			stat["total"] = counters[direction][0]
 			#* Calculate current speed
-			stat["speed"].append(round((stat["total"] - stat["last"]) / (time() - cls.timestamp)))
+			stat["speed"].append(round((stat["total"] - stat["last"]) / elapsed))
 			stat["last"] = stat["total"]
 			speed = stat["speed"][-1]
+			packets: int = round(max(0, counters[direction][1] - stat["packets"]) / elapsed)
+			stat["packets"], stat["errors"], stat["drops"] = counters[direction][1:]
+			strings["packets"] = f'{packets}' if packets < 10000 else f'{packets // 1000}k'
 
 			if cls.net_min[direction] == -1:
 				cls.net_min[direction] = units_to_bytes(getattr(CONFIG, "net_" + direction))
@@ -3672,12 +4771,513 @@ class NetCollector(Collector):
 		NetBox._draw_fg()
 
 
+class ProcInfo:
+	'''Compact record for one row in the process list, names and usernames are interned to share the string objects between updates'''
+	__slots__ = ("name", "cmd", "threads", "username", "mem", "mem_b", "cpu", "indent", "depth", "fds", "sockets")
+
+	def __init__(self, name: str = "", cmd: str = "", threads: int = 0, username: str = "?", mem: float = 0.0, mem_b: int = 0, cpu: float = 0.0, indent: str = "", depth: int = 0,
+				fds: int = 0, sockets: int = 0):
+		self.name: str = sys.intern(name)
+		self.cmd: str = cmd
+		self.threads: int = threads
+		self.username: str = sys.intern(username)
+		self.mem: float = mem
+		self.mem_b: int = mem_b
+		self.cpu: float = cpu
+		self.indent: str = indent
+		self.depth: int = depth
+		self.fds: int = fds
+		self.sockets: int = sockets
+
+class ProcEvents:
+	'''Follows fork, exec and exit events from the netlink process connector in a background thread,
+	keeps the set of running pids and records processes that started and exited between updates'''
+	source: Any = None
+	thread: Union[threading.Thread, None] = None
+	lock = threading.Lock()
+	active: bool = False
+	failed: bool = False
+	resync: bool = False
+	pids: Set[int] = set()
+	changed: Set[int] = set()
+	recent: Dict[int, List] = {}
+	exited: List[Tuple[int, int, str, List[str], float]] = []
+	NETLINK_CONNECTOR: int = 11
+	CN_IDX_PROC: int = 1
+	PROC_EVENT_FORK: int = 0x1
+	PROC_EVENT_EXEC: int = 0x2
+	PROC_EVENT_EXIT: int = 0x80000000
+
+	@classmethod
+	def start(cls, source: Any = None):
+		'''Subscribe to process events, a stand-in source with recv() and close() methods can be given instead of the netlink socket'''
+		if source is None:
+			if SYSTEM != "Linux" or not hasattr(socket, "AF_NETLINK"):
+				cls.failed = True
+				return
+			try:
+				source = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, cls.NETLINK_CONNECTOR)
+				source.bind((0, cls.CN_IDX_PROC))
+				#* nlmsghdr + cn_msg + PROC_CN_MCAST_LISTEN
+				source.send(struct.pack("=IHHII", 40, 3, 0, 0, os.getpid()) + struct.pack("=IIIIHH", cls.CN_IDX_PROC, 1, 0, 0, 4, 0) + struct.pack("=I", 1))
+				source.settimeout(1)
+			except OSError as e:
+				errlog.warning(f'Process events not available, falling back to scanning all pids: {e}')
+				cls.failed = True
+				return
+		if cls.source is not None: cls.stop()
+		cls.source = source
+		with cls.lock:
+			cls.pids = set(psutil.pids())
+			cls.changed = set()
+			cls.recent = {}
+			cls.exited = []
+			cls.resync = False
+		cls.active = True
+		cls.thread = threading.Thread(target=cls._runner, daemon=True)
+		cls.thread.start()
+
+	@classmethod
+	def stop(cls):
+		cls.active = False
+		if cls.thread is not None:
+			cls.thread.join(timeout=2)
+			cls.thread = None
+		if cls.source is not None:
+			cls.source.close()
+			cls.source = None
+
+	@classmethod
+	def take(cls) -> Tuple[List[int], Set[int], List[Tuple[int, int, str, List[str], float]]]:
+		'''Return running pids, pids that forked, exec'd or exited since the last call and processes that both started and exited since the last call'''
+		with cls.lock:
+			if cls.resync:
+				cls.pids = set(psutil.pids())
+				cls.resync = False
+			changed: Set[int] = cls.changed | {p[0] for p in cls.exited}
+			out = (sorted(cls.pids), changed, cls.exited)
+			cls.changed = set()
+			cls.recent = {}
+			cls.exited = []
+		return out
+
+	@classmethod
+	def _runner(cls):
+		data: bytes
+		source: Any = cls.source
+		while cls.active:
+			try:
+				data = source.recv(4096)
+			except socket.timeout:
+				continue
+			except OSError as e:
+				if e.errno == errno.ENOBUFS:
+					#* Events were dropped, get a fresh pid list on next update
+					with cls.lock:
+						cls.resync = True
+					continue
+				if cls.active: errlog.warning(f'Process events stopped, falling back to scanning all pids: {e}')
+				break
+			if not data: break
+			cls.parse(data)
+		else:
+			return
+		#* Stopped by an error or a closed source, don't restart on the next update
+		cls.failed = True
+		cls.active = False
+		source.close()
+		if cls.source is source: cls.source = None
+
+	@classmethod
+	def parse(cls, data: bytes):
+		'''Parse one or more netlink messages holding a proc_event each'''
+		offset: int = 0
+		length: int
+		what: int
+		while offset + 52 <= len(data):
+			length = struct.unpack_from("=I", data, offset)[0]
+			what = struct.unpack_from("=I", data, offset + 36)[0]
+			if what == cls.PROC_EVENT_FORK:
+				_, parent, pid, tgid = struct.unpack_from("=4I", data, offset + 52)
+				if pid == tgid: cls._event(what, pid, parent)
+			elif what in (cls.PROC_EVENT_EXEC, cls.PROC_EVENT_EXIT):
+				pid, tgid = struct.unpack_from("=2I", data, offset + 52)
+				if pid == tgid: cls._event(what, pid)
+			if length < 52: break
+			offset += (length + 3) & ~3
+
+	@classmethod
+	def _event(cls, what: int, pid: int, parent: int = 0):
+		#* Names are read from /proc before taking the lock so take() isn't held up by slow reads
+		names: Tuple[str, List[str]] = cls._names(pid) if what in (cls.PROC_EVENT_FORK, cls.PROC_EVENT_EXEC) else ("", [])
+		with cls.lock:
+			#* A forked pid can be a reused pid, so cached values of the old process are dropped too
+			if what == cls.PROC_EVENT_FORK:
+				cls.pids.add(pid)
+				cls.changed.add(pid)
+				cls.recent[pid] = [parent, *names, time()]
+			elif what == cls.PROC_EVENT_EXEC:
+				cls.changed.add(pid)
+				if pid in cls.recent:
+					cls.recent[pid][1:3] = names
+			else:
+				cls.pids.discard(pid)
+				if pid in cls.recent:
+					cls.exited.append((pid, *cls.recent.pop(pid)))
+
+	@staticmethod
+	def _names(pid: int) -> Tuple[str, List[str]]:
+		name: str = readfile(f'/proc/{pid}/comm', "")
+		cmdline: List[str] = []
+		try:
+			with open(f'/proc/{pid}/cmdline', "rb") as f:
+				cmdline = f.read().decode(errors="replace").rstrip("\0").split("\0")
+		except OSError:
+			pass
+		return name, [c for c in cmdline if c]
+
+class ProcPinned:
+	'''Samples cpu and memory usage of pinned processes every "proc_pinned_ms" in a background thread,
+	reads persistent /proc/PID/stat and /proc/PID/statm handles on Linux and uses psutil on other systems'''
+	pids: Dict[int, str] = {}
+	manual: Set[int] = set()
+	excluded: Set[int] = set()
+	samples: Dict[int, List[float]] = {}
+	cpu: Dict[int, float] = {}
+	mem: Dict[int, int] = {}
+	last: Dict[int, Tuple[float, float]] = {}
+	fds: Dict[int, Tuple[int, int]] = {}
+	procs: Dict[int, psutil.Process] = {}
+	thread: Union[threading.Thread, None] = None
+	stopping = threading.Event()
+	lock = threading.Lock()
+	max_samples: int = 1000
+	clk_tck: int = os.sysconf("SC_CLK_TCK") if hasattr(os, "sysconf") else 100
+	page_size: int = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+	@classmethod
+	def toggle(cls, pid: int):
+		'''Pin or unpin a process by pid'''
+		if pid in cls.pids:
+			cls.manual.discard(pid)
+			cls.excluded.add(pid)
+		else:
+			cls.manual.add(pid)
+			cls.excluded.discard(pid)
+		cls.update(ProcCollector.processes)
+
+	@classmethod
+	def update(cls, processes: Dict[int, ProcInfo]):
+		'''Resolve pids and names set in "proc_pinned" and pids pinned with "p", names are matched against the current process list.
+		Pids unpinned with "p" stay excluded, the number of pinned processes is limited to what fits in the process box'''
+		pids: Dict[int, str] = {}
+		name: str
+		for target in CONFIG.proc_pinned.split():
+			if target.isdigit() and int(target) not in cls.excluded:
+				cls.manual.add(int(target))
+		for pid in sorted(cls.manual):
+			if pid in processes: name = processes[pid].name
+			elif pid in cls.pids: name = cls.pids[pid]
+			else:
+				try:
+					name = psutil.Process(pid).name()
+				except psutil.Error:
+					cls.manual.discard(pid)
+					continue
+			pids[pid] = name
+		for target in CONFIG.proc_pinned.lower().split():
+			if target.isdigit(): continue
+			for pid, p in processes.items():
+				if target in p.name.lower() and pid not in cls.excluded: pids[pid] = p.name
+		pids = dict(list(pids.items())[:ProcBox.pinned_max])
+		with cls.lock:
+			for pid in cls.pids.keys() - pids.keys():
+				cls._remove(pid)
+			cls.pids = pids
+		if pids and cls.thread is None:
+			cls.stopping.clear()
+			cls.thread = threading.Thread(target=cls._runner, daemon=True)
+			cls.thread.start()
+		elif not pids and cls.thread is not None:
+			cls.stop()
+
+	@classmethod
+	def stop(cls):
+		cls.stopping.set()
+		if cls.thread is not None:
+			cls.thread.join(timeout=2)
+			cls.thread = None
+		with cls.lock:
+			for pid in list(cls.fds) + list(cls.procs):
+				cls._remove(pid)
+
+	@classmethod
+	def take(cls, pid: int) -> Tuple[List[float], float, int]:
+		'''Return cpu samples since last call, last cpu percent and last memory usage in bytes for a pinned pid'''
+		with cls.lock:
+			samples: List[float] = cls.samples.get(pid, [])
+			cls.samples[pid] = []
+			return samples, cls.cpu.get(pid, 0.0), cls.mem.get(pid, 0)
+
+	@classmethod
+	def _runner(cls):
+		while not cls.stopping.wait(max(CONFIG.proc_pinned_ms, 10) / 1000):
+			with cls.lock:
+				for pid in list(cls.pids):
+					try:
+						cls._sample(pid)
+					except (OSError, ValueError, IndexError, psutil.Error):
+						#* Process has exited
+						cls._remove(pid)
+						del cls.pids[pid]
+						cls.manual.discard(pid)
+
+	@classmethod
+	def _sample(cls, pid: int):
+		cpu_time: float
+		if SYSTEM == "Linux":
+			if pid not in cls.fds:
+				cls.fds[pid] = (os.open(f'/proc/{pid}/stat', os.O_RDONLY), os.open(f'/proc/{pid}/statm', os.O_RDONLY))
+			stat: bytes = os.pread(cls.fds[pid][0], 1024, 0)
+			#* utime and stime are the 12th and 13th values after the parenthesized process name
+			values: List[bytes] = stat[stat.rfind(b")") + 2:].split()
+			cpu_time = (int(values[11]) + int(values[12])) / cls.clk_tck
+			cls.mem[pid] = int(os.pread(cls.fds[pid][1], 256, 0).split()[1]) * cls.page_size
+		else:
+			if pid not in cls.procs:
+				cls.procs[pid] = psutil.Process(pid)
+			with cls.procs[pid].oneshot():
+				cpu_time = sum(cls.procs[pid].cpu_times()[:2])
+				cls.mem[pid] = cls.procs[pid].memory_info().rss
+		now: float = time()
+		if pid in cls.last:
+			cls.cpu[pid] = round(100 * (cpu_time - cls.last[pid][0]) / max(now - cls.last[pid][1], 0.001), 1)
+			cls.samples.setdefault(pid, []).append(cls.cpu[pid])
+			if len(cls.samples[pid]) > cls.max_samples: del cls.samples[pid][0]
+		cls.last[pid] = (cpu_time, now)
+
+	@classmethod
+	def _remove(cls, pid: int):
+		for fd in cls.fds.pop(pid, ()):
+			os.close(fd)
+		for values in [cls.procs, cls.samples, cls.cpu, cls.mem, cls.last]:
+			values.pop(pid, None)
+
+class ProcAcct:
+	'''Reads records of exited processes appended to a Linux process accounting file (acct_v3 format) since last read,
+	counts processes and cpu time per command for the last update and adds the cpu time to ProcTop'''
+	active: bool = False
+	file: str = ""
+	offset: int = -1
+	inode: int = 0
+	count: int = 0
+	cpu_time: float = 0.0
+	cpu_percent: float = 0.0
+	names: Dict[str, int] = {}
+	last_read: float = 0.0
+	record = struct.Struct("=BBHIIIIIIf8H16s")
+	ahz: int = 100
+
+	@staticmethod
+	def comp_t(value: int) -> int:
+		'''Decode a comp_t value, 13-bit mantissa and 3-bit base-8 exponent'''
+		return (value & 0x1fff) << (((value >> 13) & 0x7) * 3)
+
+	@classmethod
+	def read(cls):
+		'''Read new records, starts at end of file on first read and from start of file if it was rotated or truncated'''
+		now: float = time()
+		if cls.file != CONFIG.proc_acct_file:
+			cls.file = CONFIG.proc_acct_file
+			cls.offset = -1
+		cls.count = 0
+		cls.cpu_time = 0.0
+		cls.names = {}
+		data: bytes = b''
+		try:
+			with open(cls.file, "rb") as f:
+				stat = os.fstat(f.fileno())
+				if cls.offset < 0:
+					cls.offset = stat.st_size - stat.st_size % cls.record.size
+				elif stat.st_ino != cls.inode or stat.st_size < cls.offset:
+					cls.offset = 0
+				cls.inode = stat.st_ino
+				f.seek(cls.offset)
+				data = f.read()
+		except OSError as e:
+			if cls.active: errlog.warning(f'Couldn\'t read process accounting file {cls.file}: {e}')
+			cls.active = False
+			return
+		cls.active = True
+		size: int = len(data) - len(data) % cls.record.size
+		cls.offset += size
+		bucket: SpaceSaving = ProcTop.bucket()
+		for values in cls.record.iter_unpack(data[:size]):
+			if values[1] & 0x7f != 3: continue
+			name: str = values[18].split(b"\0", 1)[0].decode(errors="replace")
+			cpu_time: float = (cls.comp_t(values[10]) + cls.comp_t(values[11])) / cls.ahz
+			cls.count += 1
+			cls.cpu_time += cpu_time
+			cls.names[name] = cls.names.get(name, 0) + 1
+			if cpu_time: bucket.add(f'{name} (exited)', cpu_time)
+		if cls.last_read: cls.cpu_percent = cls.cpu_time * 100 / max(now - cls.last_read, 0.001)
+		cls.last_read = now
+
+	@classmethod
+	def top_names(cls, n: int) -> List[Tuple[str, int]]:
+		return sorted(cls.names.items(), key=lambda i: i[1], reverse=True)[:n]
+
+class ProcLifecycle:
+	'''Records process starts and exits found by comparing pid sets between updates, in a ring of (time, started, pid, name) tuples
+	that is optionally appended to "proc_log_file". Fork rate is read from the "processes" counter of CpuStat on Linux'''
+	events: Deque[Tuple[float, bool, int, str]] = deque(maxlen=1000)
+	names: Dict[int, str] = {}
+	last_update: float = 0.0
+	forks: int = -1
+	forks_stamp: float = 0.0
+	fork_rate: float = 0.0
+	exit_rate: float = 0.0
+	log_failed: str = ""
+
+	@classmethod
+	def update(cls, pids: List[int], procs: List[Any], exited: List[Tuple[int, int, str, List[str], float]], host: bool = True):
+		now: float = time()
+		names: Dict[int, str] = dict.fromkeys(pids, "")
+		for p in procs:
+			if p.pid in names: names[p.pid] = p.info["name"]
+		for pid in names:
+			if not names[pid]: names[pid] = cls.names.get(pid, "")
+		new: List[Tuple[float, bool, int, str]] = []
+		forks: int = -1
+		forks_stamp: float = 0.0
+		if host and SYSTEM == "Linux" and CpuStat.read(max_age=1.0):
+			forks, forks_stamp = CpuStat.counters.get("processes", -1), CpuStat.stamp
+		if cls.last_update:
+			started: List[int] = [pid for pid in names if pid not in cls.names]
+			ended: List[int] = [pid for pid in cls.names if pid not in names]
+			for start_pid, ppid, name, _, start in exited:
+				new.append((start, True, start_pid, name))
+				new.append((now, False, start_pid, name))
+			new.extend((now, True, pid, names[pid]) for pid in started)
+			new.extend((now, False, pid, cls.names[pid]) for pid in ended)
+			elapsed: float = max(now - cls.last_update, 0.001)
+			#* The counter can be up to a second older than this update, so it is divided by the time between its own reads
+			if forks >= 0 and cls.forks >= 0:
+				if forks_stamp > cls.forks_stamp: cls.fork_rate = (forks - cls.forks) / (forks_stamp - cls.forks_stamp)
+			else: cls.fork_rate = (len(started) + len(exited)) / elapsed
+			cls.exit_rate = (len(ended) + len(exited)) / elapsed
+			cls.events.extend(new)
+		cls.names = names
+		cls.forks, cls.forks_stamp = forks, forks_stamp
+		cls.last_update = now
+		if new and CONFIG.proc_log_file: cls._log(new)
+
+	@classmethod
+	def _log(cls, events: List[Tuple[float, bool, int, str]]):
+		if cls.log_failed == CONFIG.proc_log_file: return
+		try:
+			with open(CONFIG.proc_log_file, "a") as f:
+				f.write("".join(f'{strftime("%Y-%m-%d %H:%M:%S", localtime(t))}\t{"start" if started else "exit"}\t{pid}\t{name}\n' for t, started, pid, name in events))
+		except OSError as e:
+			cls.log_failed = CONFIG.proc_log_file
+			errlog.warning(f'Couldn\'t write process events to {CONFIG.proc_log_file}: {e}')
+
+class SpaceSaving:
+	'''Space-Saving heavy hitters counter, keeps at most "size" keys. When full, the key with the lowest count is replaced
+	and the new key inherits its count, which is kept as the maximum overestimation for the new key
+	* add(key, value) : adds value to the count of key
+	* top(n) : returns list of the n highest (key, count, error) tuples
+	'''
+	def __init__(self, size: int):
+		self.size: int = size
+		self.counts: Dict[str, float] = {}
+		self.errors: Dict[str, float] = {}
+
+	def add(self, key: str, value: float):
+		if key in self.counts:
+			self.counts[key] += value
+		elif len(self.counts) < self.size:
+			self.counts[key] = value
+			self.errors[key] = 0.0
+		else:
+			low: str = min(self.counts, key=self.counts.__getitem__)
+			low_count: float = self.counts.pop(low)
+			del self.errors[low]
+			self.counts[key] = low_count + value
+			self.errors[key] = low_count
+
+	def top(self, n: int) -> List[Tuple[str, float, float]]:
+		return sorted(((k, v, self.errors[k]) for k, v in self.counts.items()), key=lambda i: i[1], reverse=True)[:n]
+
+class ProcTop:
+	'''Cpu time used per program over the last "proc_top_minutes" minutes, kept in one SpaceSaving counter per minute to
+	use the same memory regardless of how many processes come and go. Cpu time of children that exited between updates
+	is counted from the "children" cpu times of their parent, or read from the process accounting file by ProcAcct if enabled'''
+	buckets: Deque[Tuple[int, SpaceSaving]] = deque()
+	size: int = 100
+	cpu_times: Dict[int, Tuple[float, float]] = {}
+	last_update: float = 0.0
+
+	@classmethod
+	def update(cls, procs: List[psutil.Process]):
+		'''Add cpu time used since last update for each process, new processes that started after the last update are counted from start'''
+		now: float = time()
+		bucket: SpaceSaving = cls.bucket()
+		cpu_times: Dict[int, Tuple[float, float]] = {}
+		for p in procs:
+			times = p.info.get("cpu_times")
+			if not hasattr(times, "user"): continue
+			own: float = times.user + times.system
+			children: float = getattr(times, "children_user", 0.0) + getattr(times, "children_system", 0.0)
+			cpu_times[p.pid] = (own, children)
+			if p.pid in cls.cpu_times:
+				last_own, last_children = cls.cpu_times[p.pid]
+			elif cls.last_update and p.info.get("create_time", 0.0) >= cls.last_update:
+				last_own = last_children = 0.0
+			else:
+				continue
+			if own > last_own: bucket.add(p.info["name"], own - last_own)
+			if children > last_children and not ProcAcct.active: bucket.add(f'{p.info["name"]} (exited children)', children - last_children)
+		cls.cpu_times = cpu_times
+		cls.last_update = now
+
+	@classmethod
+	def bucket(cls) -> SpaceSaving:
+		'''Return counter for the current minute, counters older than "proc_top_minutes" are dropped'''
+		minute: int = int(time() // 60)
+		if not cls.buckets or cls.buckets[-1][0] != minute:
+			cls.buckets.append((minute, SpaceSaving(cls.size)))
+		while cls.buckets[0][0] <= minute - CONFIG.proc_top_minutes:
+			cls.buckets.popleft()
+		return cls.buckets[-1][1]
+
+	@classmethod
+	def top(cls, n: int) -> Tuple[List[Tuple[str, float, float]], float]:
+		'''Return the n programs with most cpu time in the last "proc_top_minutes" minutes and the total of all counted cpu time'''
+		counts: Dict[str, float] = defaultdict(float)
+		errors: Dict[str, float] = defaultdict(float)
+		minute: int = int(time() // 60)
+		for b_minute, bucket in cls.buckets:
+			if b_minute <= minute - CONFIG.proc_top_minutes: continue
+			for key, count in bucket.counts.items():
+				counts[key] += count
+				errors[key] += bucket.errors[key]
+		return sorted(((k, v, errors[k]) for k, v in counts.items()), key=lambda i: i[1], reverse=True)[:n], sum(counts.values())
+
+class ProcExited:
+	'''Stand-in for a process that started and exited between two updates, holds the values recorded by ProcEvents'''
+	__slots__ = ("pid", "info")
+
+	def __init__(self, pid: int, info: Dict):
+		self.pid: int = pid
+		self.info: Dict = info
+
 class ProcCollector(Collector):
 	'''Collects process stats'''
 	buffer: str = ProcBox.buffer
 	search_filter: str = ""
 	case_sensitive: bool = False
-	processes: Dict = {}
+	processes: Dict[int, ProcInfo] = {}
 	num_procs: int = 0
 	det_cpu: float = 0.0
 	detailed: bool = False
@@ -3688,7 +5288,9 @@ class ProcCollector(Collector):
 	expand: int = 0
 	collapsed: Dict = {}
 	tree_counter: int = 0
-	p_values: List[str] = ["pid", "name", "cmdline", "num_threads", "username", "memory_percent", "cpu_percent", "cpu_times", "create_time"]
+	base_values: List[str] = ["pid", "name", "memory_percent", "cpu_percent", "cpu_times", "create_time"]
+	value_defaults: Dict[str, Any] = {"cmdline" : [], "num_threads" : 0, "username" : ""}
+	attrs: List[str] = base_values
 	sort_expr: Dict = {}
 	sort_expr["pid"] = compile("p.info['pid']", "str", "eval")
 	sort_expr["program"] = compile("'' if p.info['name'] == 0.0 else p.info['name']", "str", "eval")
@@ -3698,12 +5300,252 @@ class ProcCollector(Collector):
 	sort_expr["memory"] = compile("p.info['memory_percent']", "str", "eval")
 	sort_expr["cpu lazy"] = compile("(sum(p.info['cpu_times'][:2] if not p.info['cpu_times'] == 0.0 else [0.0, 0.0]) * 1000 / (time() - p.info['create_time']))", "str", "eval")
 	sort_expr["cpu responsive"] = compile("(p.info['cpu_percent'] if CONFIG.proc_per_core else (p.info['cpu_percent'] / THREADS))", "str", "eval")
+	sort_expr["cpu smooth"] = compile("p.info.get('cpu_smooth', 0.0)", "str", "eval")
+	sort_expr["fds"] = compile("p.info.get('fds', 0)", "str", "eval")
+	sort_expr["sockets"] = compile("p.info.get('sockets', 0)", "str", "eval")
+	cheap_values: List[str] = ["pid", "name", "ppid", "status"]
+	totals_sorting: List[str] = ["threads", "memory", "cpu lazy", "cpu responsive", "cpu smooth", "fds", "sockets"]
+	kthreadd: int = -1
+	pmap: Dict[int, psutil.Process] = {}
+	shard_pool: Union[ThreadPoolExecutor, None] = None
+	shard_workers: int = 0
+	scan_times: List[Tuple[float, int]] = []
+	pid_root: int = 0
+	children_file: Union[bool, None] = None
+	static_values: List[str] = ["name", "cmdline", "username"]
+	static: Dict[int, Dict] = {}
+	fd_counts: Dict[int, Tuple[float, int, int]] = {}
+	cpu_smooth: Dict[int, Tuple[float, float]] = {}
+	top_view: bool = False
+	fd_interval: float = 5.0
+	fd_budget: int = 500
+
+	@classmethod
+	def _scan(cls, attrs: List[str], err: float, search: List[str]) -> List[psutil.Process]:
+		'''Return all processes with requested attributes in .info, split in pid ranges read in parallel when "proc_shards" is above 1'''
+		scan_start: float = time()
+		if cls.kthreadd == -1:
+			cls.kthreadd = 2 if SYSTEM == "Linux" and readfile("/proc/2/comm") == "kthreadd" else 0
+		shards: int = CONFIG.proc_shards
+		pids: List[int]
+		exited: List[Tuple[int, int, str, List[str], float]] = []
+		#* Process events are only used when scanning all pids, nothing would drain them in pid root or cgroup mode
+		events: bool = CONFIG.proc_events and not cls.pid_root and not Cgroup.path
+		if events and not ProcEvents.active and not ProcEvents.failed:
+			ProcEvents.start()
+		elif not events and ProcEvents.active:
+			ProcEvents.stop()
+			cls.static.clear()
+		if cls.pid_root: pids = cls._descendants(cls.pid_root)
+		elif Cgroup.path: pids = Cgroup.pids()
+		elif ProcEvents.active:
+			pids, changed, exited = ProcEvents.take()
+			for pid in changed:
+				cls.static.pop(pid, None)
+		else: pids = psutil.pids()
+		procs: List[psutil.Process]
+		for pid in cls.pmap.keys() - set(pids):
+			del cls.pmap[pid]
+			cls.static.pop(pid, None)
+			cls.fd_counts.pop(pid, None)
+			cls.cpu_smooth.pop(pid, None)
+		if shards < 2 and cls.shard_pool is not None:
+			cls.stop_pool()
+		if shards < 2 or len(pids) < shards:
+			procs = cls._scan_shard(pids, attrs, err, search)
+		else:
+			if cls.shard_workers != shards or cls.shard_pool is None:
+				if cls.shard_pool is not None: cls.shard_pool.shutdown(wait=False)
+				cls.shard_pool = ThreadPoolExecutor(max_workers=shards, thread_name_prefix="proc_shard")
+				cls.shard_workers = shards
+			size: int = ceil(len(pids) / shards)
+			procs = []
+			for shard in cls.shard_pool.map(lambda s_pids: cls._scan_shard(s_pids, attrs, err, search), [pids[i:i + size] for i in range(0, len(pids), size)]):
+				procs.extend(shard)
+		if DEBUG:
+			cls.scan_times.append((time() - scan_start, len(procs)))
+			if len(cls.scan_times) >= 10:
+				secs, num = (sum(x) for x in zip(*cls.scan_times))
+				errlog.debug(f'Process scan with {shards} shard(s): {num // len(cls.scan_times)} processes, {secs * 10000 / max(1, num):.6f} seconds per 10k processes')
+				cls.scan_times = []
+		if CONFIG.proc_fds and SYSTEM == "Linux":
+			cls._count_fds(procs)
+		cls._smooth(procs)
+		ProcTop.update(procs)
+		if not cls.collect_interrupt:
+			ProcLifecycle.update(pids, procs, exited, host=not (cls.pid_root or Cgroup.path))
+		for pid, ppid, name, cmdline, start in exited:
+			if not name or (search and not cls._match(search, name, str(pid), " ".join(cmdline))): continue
+			procs.append(ProcExited(pid, {"pid" : pid, "name" : name, "ppid" : ppid, "status" : psutil.STATUS_DEAD, "cmdline" : cmdline, "num_threads" : 0, "username" : "",
+							"memory_percent" : 0.0, "cpu_percent" : 0.0, "cpu_times" : err, "create_time" : start, "memory_info" : err}))
+		return procs
+
+	@classmethod
+	def stop_pool(cls):
+		'''Shut down the shard worker threads, a new pool is started by the next sharded scan'''
+		if cls.shard_pool is not None:
+			cls.shard_pool.shutdown(wait=True)
+			cls.shard_pool = None
+			cls.shard_workers = 0
+
+	@classmethod
+	def _descendants(cls, root: int) -> List[int]:
+		'''Return pid of root and all its descendants, walks /proc/PID/task/*/children on Linux without reading every process'''
+		if cls.children_file is None:
+			cls.children_file = SYSTEM == "Linux" and os.path.isfile(f'/proc/self/task/{os.getpid()}/children')
+		if not cls.children_file:
+			try:
+				return sorted([root] + [p.pid for p in psutil.Process(root).children(recursive=True)])
+			except psutil.Error:
+				return []
+		pids: Set[int] = set()
+		queue: List[int] = [root]
+		while queue:
+			pid = queue.pop()
+			if pid in pids: continue
+			pids.add(pid)
+			try:
+				for task in os.scandir(f'/proc/{pid}/task'):
+					with open(f'{task.path}/children', "r") as f:
+						queue.extend(int(c) for c in f.read().split())
+			except (OSError, ValueError):
+				continue
+		return sorted(pids)
+
+	@classmethod
+	def _scan_shard(cls, pids: List[int], attrs: List[str], err: float, search: List[str]) -> List[psutil.Process]:
+		'''Read attributes for a range of pids, cached process objects are reused to keep cpu percent deltas between updates'''
+		out: List[psutil.Process] = []
+		p: Union[psutil.Process, None]
+		for pid in pids:
+			if cls.collect_interrupt: break
+			try:
+				p = cls.pmap.get(pid)
+				if p is None or not p.is_running():
+					p = cls.pmap[pid] = psutil.Process(pid)
+				if not cls._read(p, attrs, err, search):
+					continue
+			except psutil.Error:
+				cls.pmap.pop(pid, None)
+				continue
+			out.append(p)
+		return out
+
+	@classmethod
+	def _smooth(cls, procs: List[psutil.Process]):
+		'''Update exponentially weighted average of cpu percent for each process, weighted by time since last update and "proc_smooth_halflife"'''
+		now: float = time()
+		halflife: int = max(CONFIG.proc_smooth_halflife, 1)
+		for p in procs:
+			cpu: float = p.info["cpu_percent"]
+			if p.pid in cls.cpu_smooth:
+				last, last_time = cls.cpu_smooth[p.pid]
+				cpu = last + (1 - 0.5 ** ((now - last_time) / halflife)) * (cpu - last)
+			cls.cpu_smooth[p.pid] = (cpu, now)
+			p.info["cpu_smooth"] = cpu
+
+	@classmethod
+	def _count_fds(cls, procs: List[psutil.Process]):
+		'''Set number of open fds and TCP/UDP sockets in .info, counts older than "fd_interval" seconds are refreshed
+		for at most "fd_budget" processes per update, oldest first'''
+		now: float = time()
+		stale: List[int] = sorted((p.pid for p in procs if now - cls.fd_counts.get(p.pid, (0.0, 0, 0))[0] > cls.fd_interval), key=lambda pid: cls.fd_counts.get(pid, (0.0, 0, 0))[0])
+		if stale:
+			inodes: Set[str] = set()
+			for proto in ["tcp", "tcp6", "udp", "udp6"]:
+				try:
+					with open(f'/proc/net/{proto}', "r") as f:
+						next(f, None)
+						for line in f:
+							inodes.add(line.split(None, 10)[9])
+				except (OSError, IndexError):
+					pass
+			for pid in stale[:cls.fd_budget]:
+				fds = sockets = 0
+				try:
+					for entry in os.scandir(f'/proc/{pid}/fd'):
+						fds += 1
+						try:
+							link = os.readlink(entry.path)
+						except OSError:
+							continue
+						if link.startswith("socket:[") and link[8:-1] in inodes:
+							sockets += 1
+				except OSError:
+					pass
+				cls.fd_counts[pid] = (now, fds, sockets)
+		for p in procs:
+			_, p.info["fds"], p.info["sockets"] = cls.fd_counts.get(p.pid, (0.0, 0, 0))
+
+	@classmethod
+	def _read(cls, p: psutil.Process, attrs: List[str], err: float, search: List[str]) -> bool:
+		'''Read process attributes to .info in stages, returns False if the process should be left out
+		* 1: pid, name, ppid and status, drops the idle process and kernel threads if "proc_hide_kernel" is set
+		* 2: cmdline and username, only if a search filter is active and didn't match name or pid
+		* 3: all other requested attributes, only for processes that passed the first two stages'''
+		info: Dict
+		static: Dict = cls.static.get(p.pid, {})
+		with p.oneshot():
+			info = p.as_dict([a for a in cls.cheap_values if a not in static], ad_value=err)
+			info.update(static)
+			if info["name"] == "idle" or info["name"] == err or info["pid"] == err:
+				return False
+			kernel: bool = cls.kthreadd > 0 and cls.kthreadd in (info["pid"], info["ppid"])
+			if kernel and CONFIG.proc_hide_kernel:
+				return False
+			if search and not cls._match(search, info["name"], str(info["pid"])):
+				info.update(p.as_dict([a for a in (["username"] if kernel else ["cmdline", "username"]) if a not in static], ad_value=err))
+				if kernel or info["cmdline"] == err: info["cmdline"] = []
+				if info["username"] == err: info["username"] = ""
+				if not cls._match(search, info["username"], " ".join(info["cmdline"])):
+					if cls.detailed and info["pid"] == cls.detailed_pid:
+						cls.det_cpu = p.cpu_percent()
+					return False
+			info.update(p.as_dict([a for a in attrs if a not in info], ad_value=err))
+		if ProcEvents.active and any(a in info and a not in static and info[a] != err for a in cls.static_values):
+			#* Name, arguments and user only change on exec, which clears the cached values, as does a fork of a reused pid
+			cls.static[p.pid] = {a : info[a] for a in cls.static_values if a in info and info[a] != err}
+		for a, default in cls.value_defaults.items():
+			if a not in info: info[a] = default
+		p.info = info
+		return True
+
+	@classmethod
+	def _attrs(cls, sorting: str, search: List[str]) -> List[str]:
+		'''Return the process attributes needed by the columns that fits in the process box, the sorting and the filter.
+		Attributes not read are set to empty defaults from "value_defaults" by _read()'''
+		_, arg_len, tr_show, usr_show, _ = ProcBox.columns(ProcBox.width - 2, cls.num_procs > ProcBox.select_max)
+		attrs: List[str] = cls.base_values[:]
+		if arg_len or CONFIG.proc_tree or sorting == "arguments" or (search and CONFIG.proc_tree): attrs.append("cmdline")
+		if tr_show or sorting == "threads": attrs.append("num_threads")
+		if usr_show or sorting == "user" or (search and CONFIG.proc_tree): attrs.append("username")
+		if CONFIG.proc_mem_bytes: attrs.append("memory_info")
+		return attrs
+
+	@staticmethod
+	def _values(info: Dict, proc_per_cpu: bool) -> Tuple[int, float, int, float]:
+		'''Return threads, memory percent, memory bytes and cpu percent of a process, as shown in the process list'''
+		threads: int = 0 if info["num_threads"] == 0.0 else info["num_threads"]
+		mem_b: int = info["memory_info"].rss if CONFIG.proc_mem_bytes and hasattr(info.get("memory_info"), "rss") else 0
+		cpu: float = info["cpu_percent"] if proc_per_cpu else round(info["cpu_percent"] / THREADS, 2)
+		return threads, info["memory_percent"], mem_b, cpu
+
+	@classmethod
+	def _match(cls, search: List[str], *values: str) -> bool:
+		'''Check if any of the search terms is found in any of the values'''
+		for value in values:
+			if not cls.case_sensitive:
+				value = value.lower()
+			for s in search:
+				if s in value:
+					return True
+		return False
 
 	@classmethod
 	def _collect(cls):
 		'''List all processes with pid, name, arguments, threads, username, memory percent and cpu percent'''
 		if not "proc" in Box.boxes: return
-		out: Dict = {}
+		out: Dict[int, ProcInfo] = {}
 		cls.det_cpu = 0.0
 		sorting: str = CONFIG.proc_sorting
 		reverse: bool = not CONFIG.proc_reversed
@@ -3721,56 +5563,35 @@ class ProcCollector(Collector):
 			sorting = "program"
 
 		sort_cmd = cls.sort_expr[sorting]
+		cls.attrs = cls._attrs(sorting, search)
+		if CONFIG.proc_acct_file and SYSTEM == "Linux": ProcAcct.read()
+		elif ProcAcct.active: ProcAcct.active = False
 
 		if CONFIG.proc_tree:
 			cls._tree(sort_cmd=sort_cmd, reverse=reverse, proc_per_cpu=proc_per_cpu, search=search)
 		else:
-			for p in sorted(psutil.process_iter(cls.p_values + (["memory_info"] if CONFIG.proc_mem_bytes else []), err), key=lambda p: eval(sort_cmd), reverse=reverse):
+			for p in sorted(cls._scan(cls.attrs, err, search), key=lambda p: eval(sort_cmd), reverse=reverse):
 				if cls.collect_interrupt or cls.proc_interrupt:
 					return
-				if p.info["name"] == "idle" or p.info["name"] == err or p.info["pid"] == err:
-					continue
-				if p.info["cmdline"] == err:
-					p.info["cmdline"] = ""
-				if p.info["username"] == err:
-					p.info["username"] = ""
-				if p.info["num_threads"] == err:
-					p.info["num_threads"] = 0
-				if search:
-					if cls.detailed and p.info["pid"] == cls.detailed_pid:
-						cls.det_cpu = p.info["cpu_percent"]
-					for value in [ p.info["name"], " ".join(p.info["cmdline"]), str(p.info["pid"]), p.info["username"] ]:
-						if not cls.case_sensitive:
-							value = value.lower()
-						for s in search:
-							if s in value:
-								break
-						else: continue
-						break
-					else: continue
+				info = p.info
 
-				cpu = p.info["cpu_percent"] if proc_per_cpu else round(p.info["cpu_percent"] / THREADS, 2)
-				mem = p.info["memory_percent"]
-				if CONFIG.proc_mem_bytes and hasattr(p.info["memory_info"], "rss"):
-					mem_b = p.info["memory_info"].rss
+				cpu = info["cpu_percent"] if proc_per_cpu else round(info["cpu_percent"] / THREADS, 2)
+				if CONFIG.proc_mem_bytes and hasattr(info["memory_info"], "rss"):
+					mem_b = info["memory_info"].rss
 				else:
 					mem_b = 0
 
-				cmd = " ".join(p.info["cmdline"]) or "[" + p.info["name"] + "]"
+				cmd = ("" if info["cmdline"] == err else " ".join(info["cmdline"])) or "[" + info["name"] + "]"
 
-				out[p.info["pid"]] = {
-					"name" : p.info["name"],
-					"cmd" : cmd,
-					"threads" : p.info["num_threads"],
-					"username" : p.info["username"],
-					"mem" : mem,
-					"mem_b" : mem_b,
-					"cpu" : cpu }
+				#* Rows are built straight from the scanned values with positional arguments, keywords cost more than the rest of the row at 10k processes
+				out[info["pid"]] = ProcInfo(info["name"], cmd, 0 if info["num_threads"] == err else info["num_threads"], "" if info["username"] == err else info["username"],
+											info["memory_percent"], mem_b, cpu, "", 0, info.get("fds", 0), info.get("sockets", 0))
 
 				n += 1
 
 			cls.num_procs = n
-			cls.processes = out.copy()
+			cls.processes = out
+			ProcPinned.update(out)
 
 		if cls.detailed:
 			cls.expand = ((ProcBox.width - 2) - ((ProcBox.width - 2) // 3) - 40) // 10
@@ -3791,6 +5612,7 @@ class ProcCollector(Collector):
 					if not SYSTEM == "MacOS": attrs.extend(["io_counters"])
 
 				if not c_pid in cls.processes: attrs.extend(["pid", "name", "cmdline", "num_threads", "username", "memory_percent"])
+				else: attrs.extend(a for a in cls.value_defaults if a not in cls.attrs)
 
 				cls.details = det.as_dict(attrs=attrs, ad_value="")
 				if det.parent() != None: cls.details["parent_name"] = det.parent().name()
@@ -3798,12 +5620,13 @@ class ProcCollector(Collector):
 
 				cls.details["pid"] = c_pid
 				if c_pid in cls.processes:
-					cls.details["name"] = cls.processes[c_pid]["name"]
-					cls.details["cmdline"] = cls.processes[c_pid]["cmd"]
-					cls.details["threads"] = f'{cls.processes[c_pid]["threads"]}'
-					cls.details["username"] = cls.processes[c_pid]["username"]
-					cls.details["memory_percent"] = cls.processes[c_pid]["mem"]
-					cls.details["cpu_percent"] = round(cls.processes[c_pid]["cpu"] * (1 if CONFIG.proc_per_core else THREADS))
+					c_proc: ProcInfo = cls.processes[c_pid]
+					cls.details["name"] = c_proc.name
+					cls.details["cmdline"] = c_proc.cmd if "cmdline" in cls.attrs else " ".join(cls.details["cmdline"]) or "[" + c_proc.name + "]"
+					cls.details["threads"] = f'{c_proc.threads if "num_threads" in cls.attrs else cls.details["num_threads"]}'
+					if "username" in cls.attrs: cls.details["username"] = c_proc.username
+					cls.details["memory_percent"] = c_proc.mem
+					cls.details["cpu_percent"] = round(c_proc.cpu * (1 if CONFIG.proc_per_core else THREADS))
 				else:
 					cls.details["cmdline"] = " ".join(cls.details["cmdline"]) or "[" + cls.details["name"] + "]"
 					cls.details["threads"] = f'{cls.details["num_threads"]}'
@@ -3857,115 +5680,116 @@ class ProcCollector(Collector):
 	@classmethod
 	def _tree(cls, sort_cmd, reverse: bool, proc_per_cpu: bool, search: List[str]):
 		'''List all processes in a tree view with pid, name, threads, username, memory percent and cpu percent'''
-		out: Dict = {}
+		out: Dict[int, ProcInfo] = {}
 		err: float = 0.0
 		det_cpu: float = 0.0
 		infolist: Dict = {}
 		cls.tree_counter += 1
 		tree = defaultdict(list)
 		n: int = 0
-		for p in sorted(psutil.process_iter(cls.p_values + (["memory_info"] if CONFIG.proc_mem_bytes else []), err), key=lambda p: eval(sort_cmd), reverse=reverse):
+		procs: List[psutil.Process] = cls._scan(cls.attrs, err, [])
+		sort_keys: Dict[int, Any] = {}
+		for p in procs:
+			sort_keys[p.pid] = eval(sort_cmd)
+		for p in sorted(procs, key=lambda p: sort_keys[p.pid], reverse=reverse):
 			if cls.collect_interrupt: return
-			try:
-				tree[p.ppid()].append(p.pid)
-			except (psutil.NoSuchProcess, psutil.ZombieProcess):
-				pass
-			else:
-				infolist[p.pid] = p.info
-				n += 1
+			tree[p.info["ppid"]].append(p.pid)
+			infolist[p.pid] = p.info
+			n += 1
 		if 0 in tree and 0 in tree[0]:
 			tree[0].remove(0)
 
-		def create_tree(pid: int, tree: defaultdict, indent: str = "", inindent: str = " ", found: bool = False, depth: int = 0, collapse_to: Union[None, int] = None):
+		root: int = 0
+		if cls.pid_root:
+			if cls.pid_root in infolist: root = cls.pid_root
+		elif tree:
+			#* Every process whose parent wasn't scanned is a top level process under a placeholder root, like processes of a cgroup
+			root = -1
+			tree[root] = [pid for pid, info in infolist.items() if info["ppid"] not in infolist or info["ppid"] == pid]
+
+		#* Inclusive threads, memory and cpu of every process and all its descendants, summed in one post-order pass,
+		#* together with the sum of the sorting value when sorting by subtree totals
+		sort_totals: bool = CONFIG.tree_sort_totals and CONFIG.proc_sorting in cls.totals_sorting
+		totals: Dict[int, Tuple[int, float, int, float]] = {}
+		key_totals: Dict[int, float] = {}
+		order: List[int] = []
+		stack: List[int] = [root] if tree else []
+		while stack:
+			pid = stack.pop()
+			order.append(pid)
+			if pid in tree: stack.extend(tree[pid])
+		for pid in reversed(order):
+			t_threads, t_mem, t_mem_b, t_cpu = cls._values(infolist[pid], proc_per_cpu) if pid in infolist else (0, 0.0, 0, 0.0)
+			for child in tree.get(pid, []):
+				c_threads, c_mem, c_mem_b, c_cpu = totals[child]
+				t_threads += c_threads; t_mem += c_mem; t_mem_b += c_mem_b; t_cpu += c_cpu
+			totals[pid] = (t_threads, t_mem, t_mem_b, t_cpu)
+			if sort_totals: key_totals[pid] = sort_keys.get(pid, 0) + sum(key_totals.get(child, 0) for child in tree.get(pid, []))
+
+		if sort_totals:
+			for children in tree.values():
+				children.sort(key=lambda c: key_totals.get(c, 0), reverse=reverse)
+
+		def create_tree(pid: int, tree: defaultdict, indent: str = "", inindent: str = " ", found: bool = False, depth: int = 0):
 			nonlocal infolist, proc_per_cpu, search, out, det_cpu
 			name: str; threads: int; username: str; mem: float; cpu: float; collapse: bool = False
 			cont: bool = True
 			getinfo: Dict = {}
 			if cls.collect_interrupt: return
-			try:
-				name = psutil.Process(pid).name()
-				if name == "idle": return
-			except psutil.Error:
-				pass
-				cont = False
-				name = ""
 			if pid in infolist:
 				getinfo = infolist[pid]
+				name = getinfo["name"]
+			else:
+				cont = False
+				name = ""
 
 			if search and not found:
 				if cls.detailed and pid == cls.detailed_pid:
 					det_cpu = getinfo["cpu_percent"]
 				if "username" in getinfo and isinstance(getinfo["username"], float): getinfo["username"] = ""
 				if "cmdline" in getinfo and isinstance(getinfo["cmdline"], float): getinfo["cmdline"] = ""
-				for value in [ name, str(pid), getinfo.get("username", ""), " ".join(getinfo.get("cmdline", "")) ]:
-					if not cls.case_sensitive:
-						value = value.lower()
-					for s in search:
-						if s in value:
-							found = True
-							break
-					else: continue
-					break
+				if cls._match(search, name, str(pid), getinfo.get("username", ""), " ".join(getinfo.get("cmdline", ""))):
+					found = True
 				else: cont = False
 			if cont:
+				if pid in cls.collapsed:
+					collapse = cls.collapsed[pid]
+				else:
+					collapse = depth > CONFIG.tree_depth
+					cls.collapsed[pid] = collapse
+				if search: collapse = False
+
+				#* Collapsed processes show the totals of their whole subtree
+				if CONFIG.tree_totals or collapse:
+					threads, mem, mem_b, cpu = totals[pid]
+				elif getinfo:
+					threads, mem, mem_b, cpu = cls._values(getinfo, proc_per_cpu)
+				else:
+					threads = mem_b = 0
+					mem = cpu = 0.0
 				if getinfo:
-					if getinfo["num_threads"] == err: threads = 0
-					else: threads = getinfo["num_threads"]
 					if getinfo["username"] == err: username = ""
 					else: username = getinfo["username"]
-					cpu = getinfo["cpu_percent"] if proc_per_cpu else round(getinfo["cpu_percent"] / THREADS, 2)
-					mem = getinfo["memory_percent"]
 					if getinfo["cmdline"] == err: cmd = ""
 					else: cmd = " ".join(getinfo["cmdline"]) or "[" + getinfo["name"] + "]"
-					if CONFIG.proc_mem_bytes and hasattr(getinfo["memory_info"], "rss"):
-						mem_b = getinfo["memory_info"].rss
-					else:
-						mem_b = 0
 				else:
-					threads = mem_b = 0
-					username = ""
-					mem = cpu = 0.0
+					username = cmd = ""
 
-				if pid in cls.collapsed:
-					collapse = cls.collapsed[pid]
-				else:
-					collapse = depth > CONFIG.tree_depth
-					cls.collapsed[pid] = collapse
+				if pid in tree and len(tree[pid]) > 0:
+					sign: str = "+" if collapse else "-"
+					inindent = inindent.replace(" ├─ ", "[" + sign + "]─").replace(" └─ ", "[" + sign + "]─")
+				out[pid] = ProcInfo(name, cmd, threads, username, mem, mem_b, cpu, inindent, depth, getinfo.get("fds", 0), getinfo.get("sockets", 0))
 
-				if collapse_to and not search:
-					out[collapse_to]["threads"] += threads
-					out[collapse_to]["mem"] += mem
-					out[collapse_to]["mem_b"] += mem_b
-					out[collapse_to]["cpu"] += cpu
-				else:
-					if pid in tree and len(tree[pid]) > 0:
-						sign: str = "+" if collapse else "-"
-						inindent = inindent.replace(" ├─ ", "[" + sign + "]─").replace(" └─ ", "[" + sign + "]─")
-					out[pid] = {
-						"indent" : inindent,
-						"name": name,
-						"cmd" : cmd,
-						"threads" : threads,
-						"username" : username,
-						"mem" : mem,
-						"mem_b" : mem_b,
-						"cpu" : cpu,
-						"depth" : depth,
-						}
-
-			if search: collapse = False
-			elif collapse and not collapse_to:
-				collapse_to = pid
-
-			if pid not in tree:
+			if collapse or pid not in tree:
 				return
 			children = tree[pid][:-1]
 
 			for child in children:
-				create_tree(child, tree, indent + " │ ", indent + " ├─ ", found=found, depth=depth+1, collapse_to=collapse_to)
-			create_tree(tree[pid][-1], tree, indent + "  ", indent + " └─ ", depth=depth+1, collapse_to=collapse_to)
+				create_tree(child, tree, indent + " │ ", indent + " ├─ ", found=found, depth=depth+1)
+			create_tree(tree[pid][-1], tree, indent + "  ", indent + " └─ ", depth=depth+1)
 
-		create_tree(min(tree), tree)
+		if order:
+			create_tree(root, tree)
 		cls.det_cpu = det_cpu
 
 		if cls.collect_interrupt: return
@@ -3975,13 +5799,17 @@ class ProcCollector(Collector):
 				if not psutil.pid_exists(pid):
 					del cls.collapsed[pid]
 		cls.num_procs = len(out)
-		cls.processes = out.copy()
+		cls.processes = out
+		ProcPinned.update(out)
 
 	@classmethod
 	def sorting(cls, key: str):
-		index: int = CONFIG.sorting_options.index(CONFIG.proc_sorting) + (1 if key in ["right", "l"] else -1)
-		if index >= len(CONFIG.sorting_options): index = 0
-		elif index < 0: index = len(CONFIG.sorting_options) - 1
+		index: int = CONFIG.sorting_options.index(CONFIG.proc_sorting)
+		while True:
+			index += 1 if key in ["right", "l"] else -1
+			if index >= len(CONFIG.sorting_options): index = 0
+			elif index < 0: index = len(CONFIG.sorting_options) - 1
+			if CONFIG.proc_fds or CONFIG.sorting_options[index] not in ["fds", "sockets"]: break
 		CONFIG.proc_sorting = CONFIG.sorting_options[index]
 		if "left" in Key.mouse: del Key.mouse["left"]
 		Collector.collect(ProcCollector, interrupt=True, redraw=True)
@@ -4153,6 +5981,8 @@ class Menu:
 			"(b) (n)" : "Select previous/next network device.",
 			"(s)" : "Toggle showing swap as a disk.",
 			"(i)" : "Toggle disks io mode with big graphs.",
+			"(u)" : "Cycle disks sorting, order: none->usage->io.",
+			"([) (])" : "Scroll the disks list up/down.",
 			"(z)" : "Toggle totals reset for current network device",
 			"(a)" : "Toggle auto scaling for the network graphs.",
 			"(y)" : "Toggle synced scaling mode for network graphs.",
@@ -4161,10 +5991,12 @@ class Menu:
 			"(c)" : "Toggle per-core cpu usage of processes.",
 			"(r)" : "Reverse sorting order in processes box.",
 			"(e)" : "Toggle processes tree view.",
+			"(t)" : "Toggle top cpu consumers of the last minutes.",
 			"(delete)" : "Clear any entered filter.",
 			"Selected (shift+t)" : "Terminate selected process with SIGTERM - 15.",
 			"Selected (shift+k)" : "Kill selected process with SIGKILL - 9.",
 			"Selected (shift+i)" : "Interrupt selected process with SIGINT - 2.",
+			"Selected (p)" : "Pin/unpin selected process for fast sampling.",
 			"_1" : " ",
 			"_2" : "For bug reporting and project updates, visit:",
 			"_3" : "https://github.com/aristocratos/bpytop",
@@ -4403,6 +6235,25 @@ class Menu:
 						'to fit to box height.',
 						'',
 						'True or False.'],
+				"cpu_heatmap" : [
+						'Show cpu threads as a heatmap.',
+						'',
+						'Draws one colored cell per thread instead',
+						'of a list of cores with graphs.',
+						'',
+						'"auto" uses the heatmap when all threads',
+						'doesn\'t fit in the cpu box.',
+						'',
+						'"auto", "on" or "off".'],
+				"cpu_heatmap_group" : [
+						'Group cpu heatmap cells.',
+						'',
+						'Groups cells by "socket" or "numa" node',
+						'with a graph of average usage per group.',
+						'',
+						'Topology is read from sysfs on Linux.',
+						'',
+						'"none", "socket" or "numa".'],
 				"check_temp" : [
 					'Enable cpu temperature reporting.',
 					'',
@@ -4435,6 +6286,25 @@ class Menu:
 					'',
 					'Can cause slowdowns on systems with many',
 					'cores and psutil versions below 5.8.1'],
+				"cpu_freq_ms" : [
+					'Cpu frequency sample interval.',
+					'',
+					'Time in milliseconds between reads of per',
+					'core frequencies from sysfs on Linux,',
+					'independent of update_ms.',
+					'',
+					'Min value: 100 ms',
+					'Default value: 5000 ms'],
+				"show_core_freq" : [
+					'Show frequency of each core.',
+					'',
+					'Shown in the list of cores, the heatmap',
+					'shows lowest and highest frequency.',
+					'',
+					'Needs show_cpu_freq and frequencies from',
+					'sysfs on Linux.',
+					'',
+					'True or False.'],
 				"custom_cpu_name" : [
 					'Custom cpu model name in cpu percentage box.',
 					'',
@@ -4452,6 +6322,16 @@ class Menu:
 					'Show graphs for memory values.',
 					'',
 					'True or False.'],
+				"mem_extra" : [
+					'Extra memory meters.',
+					'',
+					'Read from /proc/meminfo on Linux.',
+					'',
+					'Space separated list of meter names.',
+					'Available meters: "dirty", "writeback",',
+					'"slab", "shmem" and "hugepages".',
+					'',
+					'Empty string to disable.'],
 				"show_disks" : [
 					'Split memory box to also show disks.',
 					'',
@@ -4487,6 +6367,15 @@ class Menu:
 					'comma ",".',
 					'',
 					'Example: "/dev/sda:100, /dev/sdb:20".'],
+				"disks_sort" : [
+					'Sorting of the disks list.',
+					'',
+					'"none" keeps the mount order, "usage" ranks',
+					'by used space and "io" by read/write speed.',
+					'',
+					'Scroll the list with the mouse wheel or',
+					'with "[" and "]" when there are more disks',
+					'than fits in the box.'],
 				"show_swap" : [
 					'If swap memory should be shown in memory box.',
 					'',
@@ -4588,11 +6477,37 @@ class Menu:
 					'Processes sorting option.',
 					'',
 					'Possible values: "pid", "program", "arguments",',
-					'"threads", "user", "memory", "cpu lazy" and',
-					'"cpu responsive".',
+					'"threads", "user", "memory", "cpu lazy",',
+					'"cpu responsive", "cpu smooth", "fds" and',
+					'"sockets".',
 					'',
 					'"cpu lazy" updates top process over time,',
-					'"cpu responsive" updates top process directly.'],
+					'"cpu responsive" updates top process directly.',
+					'"cpu smooth" uses an average of recent usage.',
+					'"fds" and "sockets" needs "proc_fds" enabled.'],
+				"proc_smooth_halflife" : [
+					'Cpu smooth sorting half-life.',
+					'',
+					'Half-life in seconds of the exponentially',
+					'weighted cpu usage average used by the',
+					'"cpu smooth" sorting option.',
+					'',
+					'Lower values follow changes faster.',
+					'',
+					'Min value: 1',
+					'(Only integers)'],
+				"proc_top_minutes" : [
+					'Top consumers minutes.',
+					'',
+					'Number of minutes of cpu time per program',
+					'shown in the top consumers view, toggled',
+					'with "t" in the process box.',
+					'',
+					'Includes processes that exited between',
+					'updates, counted by their parent.',
+					'',
+					'Min value: 1',
+					'(Only integers)'],
 				"proc_reversed" : [
 					'Reverse processes sorting order.',
 					'',
@@ -4608,6 +6523,21 @@ class Menu:
 					'',
 					'Sets the depth where the tree view will auto',
 					'collapse processes at.'],
+				"tree_totals" : [
+					'Process tree subtree totals.',
+					'',
+					'Show threads, memory and cpu of processes in',
+					'tree view including all their descendants.'],
+				"tree_sort_totals" : [
+					'Sort process tree by subtree totals.',
+					'',
+					'Sort processes with the same parent by the',
+					'sum of the sorting value over their whole',
+					'subtree, so the heaviest process family is',
+					'shown first.',
+					'',
+					'Not used when sorting by pid, program,',
+					'arguments or user.'],
 				"proc_colors" : [
 					'Enable colors in process view.',
 					'',
@@ -4631,6 +6561,85 @@ class Menu:
 					'Show memory as bytes in process list.',
 					' ',
 					'True or False.'],
+				"proc_hide_kernel" : [
+					'Hide kernel threads.',
+					'',
+					'Hides kthreadd and all kernel threads started',
+					'by it from the process list.',
+					'Kernel threads are dropped before their',
+					'arguments, user and memory are read.',
+					'',
+					'Only has effect on Linux.'],
+				"proc_fds" : [
+					'Show open fds and sockets.',
+					'',
+					'Show number of open file descriptors and',
+					'TCP/UDP sockets for each process.',
+					'',
+					'Counts for a process are refreshed at most',
+					'every 5 seconds.',
+					'',
+					'Only on Linux.'],
+				"proc_shards" : [
+					'Process scan shards.',
+					'',
+					'Splits the process scan into this many pid',
+					'ranges that are read in parallel by a pool',
+					'of worker threads.',
+					'',
+					'Only useful on hosts with tens of thousands',
+					'of processes, 1 disables sharding.',
+					'(Only integers)'],
+				"proc_events" : [
+					'Use kernel process events.',
+					'',
+					'Follows fork, exec and exit events from the',
+					'kernel process connector instead of listing',
+					'all pids every update, and shows processes',
+					'that started and exited between updates.',
+					'',
+					'Only on Linux and needs root, falls back to',
+					'scanning all pids if not available.'],
+				"proc_log_file" : [
+					'Process events log file.',
+					'',
+					'File to append process start and exit events',
+					'to, one line per event with time, event, pid',
+					'and name.',
+					'',
+					'The last 1000 events are always kept in',
+					'memory. Empty to disable.'],
+				"proc_acct_file" : [
+					'Process accounting file.',
+					'',
+					'Reads processes that exited since last update',
+					'from a process accounting file and shows',
+					'their count and cpu usage in a row at the',
+					'bottom of the process box.',
+					'',
+					'Needs process accounting turned on, usually',
+					'"/var/log/account/pacct".',
+					'Only on Linux, empty to disable.'],
+				"proc_pinned" : [
+					'Pinned processes.',
+					'',
+					'Pids or names of processes to sample every',
+					'"proc_pinned_ms", shown with graphs at the',
+					'bottom of the process box.',
+					'',
+					'A name pins all processes with names',
+					'containing it, separate values with',
+					'whitespace.',
+					'',
+					'Selected process can also be pinned with "p".'],
+				"proc_pinned_ms" : [
+					'Pinned processes sample interval.',
+					'',
+					'Time in milliseconds between samples of',
+					'pinned processes, independent of update_ms.',
+					'',
+					'Min value: 10 ms',
+					'(Only integers)'],
 			}
 		}
 
@@ -4639,6 +6648,10 @@ class Menu:
 		cpu_graph_i: Dict[str, int] = { "cpu_graph_upper" : CONFIG.cpu_percent_fields.index(CONFIG.cpu_graph_upper),
 										"cpu_graph_lower" : CONFIG.cpu_percent_fields.index(CONFIG.cpu_graph_lower)}
 		temp_scale_i: int = CONFIG.temp_scales.index(CONFIG.temp_scale)
+		disks_sort_i: int = CONFIG.disks_sort_modes.index(CONFIG.disks_sort)
+		heatmap_lists: Dict[str, List[str]] = { "cpu_heatmap" : CONFIG.cpu_heatmap_modes, "cpu_heatmap_group" : CONFIG.cpu_heatmap_groups }
+		heatmap_i: Dict[str, int] = { "cpu_heatmap" : CONFIG.cpu_heatmap_modes.index(CONFIG.cpu_heatmap),
+										"cpu_heatmap_group" : CONFIG.cpu_heatmap_groups.index(CONFIG.cpu_heatmap_group)}
 		color_i: int
 		max_opt_len: int = max([len(categories[x]) for x in categories]) * 2
 		cat_list = list(categories)
@@ -4704,11 +6717,15 @@ class Menu:
 						counter = f' {cpu_graph_i[opt] + 1}/{len(CONFIG.cpu_percent_fields)}'
 					elif opt == "temp_scale":
 						counter = f' {temp_scale_i + 1}/{len(CONFIG.temp_scales)}'
+					elif opt == "disks_sort":
+						counter = f' {disks_sort_i + 1}/{len(CONFIG.disks_sort_modes)}'
+					elif opt in ["cpu_heatmap", "cpu_heatmap_group"]:
+						counter = f' {heatmap_i[opt] + 1}/{len(heatmap_lists[opt])}'
 					else:
 						counter = ""
 					out += f'{Mv.to(y+1+cy, x+1)}{t_color}{Fx.b}{opt.replace("_", " ").capitalize() + counter:^24.24}{Fx.ub}{Mv.to(y+2+cy, x+1)}{v_color}'
 					if opt == selected:
-						if isinstance(value, bool) or opt in ["color_theme", "proc_sorting", "log_level", "cpu_sensor", "cpu_graph_upper", "cpu_graph_lower", "temp_scale"]:
+						if isinstance(value, bool) or opt in ["color_theme", "proc_sorting", "log_level", "cpu_sensor", "cpu_graph_upper", "cpu_graph_lower", "temp_scale", "cpu_heatmap", "cpu_heatmap_group", "disks_sort"]:
 							out += f'{t_color} {Symbol.left}{v_color}{d_quote + str(value) + d_quote:^20.20}{t_color}{Symbol.right} '
 						elif inputting:
 							out += f'{str(input_val)[-17:] + Fx.bl + "█" + Fx.ubl + "" + Symbol.enter:^33.33}'
@@ -4788,6 +6805,31 @@ class Menu:
 								else:
 									CONFIG.proc_update_mult = int(input_val)
 								Collector.proc_counter = 1
+							elif selected == "proc_shards":
+								if not input_val or int(input_val) < 1:
+									CONFIG.proc_shards = 1
+								else:
+									CONFIG.proc_shards = int(input_val)
+							elif selected == "proc_top_minutes":
+								if not input_val or int(input_val) < 1:
+									CONFIG.proc_top_minutes = 1
+								else:
+									CONFIG.proc_top_minutes = int(input_val)
+							elif selected == "proc_smooth_halflife":
+								if not input_val or int(input_val) < 1:
+									CONFIG.proc_smooth_halflife = 1
+								else:
+									CONFIG.proc_smooth_halflife = int(input_val)
+							elif selected == "proc_pinned_ms":
+								if not input_val or int(input_val) < 10:
+									CONFIG.proc_pinned_ms = 10
+								else:
+									CONFIG.proc_pinned_ms = int(input_val)
+							elif selected == "cpu_freq_ms":
+								if not input_val or int(input_val) < 100:
+									CONFIG.cpu_freq_ms = 100
+								else:
+									CONFIG.cpu_freq_ms = int(input_val)
 							elif selected == "tree_depth":
 								if not input_val or int(input_val) < 0:
 									CONFIG.tree_depth = 0
@@ -4803,6 +6845,8 @@ class Menu:
 								Box.view_mode = "user"
 								Box.view_modes["user"] = CONFIG.shown_boxes.split()
 								Draw.clear(saved=True)
+							elif selected == "mem_extra":
+								CONFIG.mem_extra = " ".join(name for name in input_val.lower().split() if name in CONFIG.mem_extra_names)
 							elif isinstance(getattr(CONFIG, selected), str):
 								setattr(CONFIG, selected, input_val)
 								if selected.startswith("net_"):
@@ -4844,7 +6888,7 @@ class Menu:
 					cat_int = int(key) - 1
 					change_cat = True
 				elif key == "enter" and selected in ["update_ms", "disks_filter", "custom_cpu_name", "net_download",
-					 "net_upload", "draw_clock", "tree_depth", "proc_update_mult", "shown_boxes", "net_iface", "io_graph_speeds"]:
+					 "net_upload", "draw_clock", "tree_depth", "proc_update_mult", "proc_smooth_halflife", "proc_top_minutes", "proc_shards", "proc_pinned", "proc_pinned_ms", "cpu_freq_ms", "proc_log_file", "proc_acct_file", "shown_boxes", "net_iface", "io_graph_speeds", "mem_extra"]:
 					inputting = True
 					input_val = str(getattr(CONFIG, selected))
 				elif key == "left" and selected == "update_ms" and CONFIG.update_ms - 100 >= 100:
@@ -4859,6 +6903,26 @@ class Menu:
 				elif key == "right" and selected == "proc_update_mult":
 					CONFIG.proc_update_mult += 1
 					Collector.proc_counter = 1
+				elif key == "left" and selected == "proc_shards" and CONFIG.proc_shards > 1:
+					CONFIG.proc_shards -= 1
+				elif key == "right" and selected == "proc_shards":
+					CONFIG.proc_shards += 1
+				elif key == "left" and selected == "proc_top_minutes" and CONFIG.proc_top_minutes > 1:
+					CONFIG.proc_top_minutes -= 1
+				elif key == "right" and selected == "proc_top_minutes":
+					CONFIG.proc_top_minutes += 1
+				elif key == "left" and selected == "proc_smooth_halflife" and CONFIG.proc_smooth_halflife > 1:
+					CONFIG.proc_smooth_halflife -= 1
+				elif key == "right" and selected == "proc_smooth_halflife":
+					CONFIG.proc_smooth_halflife += 1
+				elif key == "left" and selected == "proc_pinned_ms" and CONFIG.proc_pinned_ms - 10 >= 10:
+					CONFIG.proc_pinned_ms -= 10
+				elif key == "right" and selected == "proc_pinned_ms":
+					CONFIG.proc_pinned_ms += 10
+				elif key == "left" and selected == "cpu_freq_ms" and CONFIG.cpu_freq_ms - 100 >= 100:
+					CONFIG.cpu_freq_ms -= 100
+				elif key == "right" and selected == "cpu_freq_ms":
+					CONFIG.cpu_freq_ms += 100
 				elif key == "left" and selected == "tree_depth" and CONFIG.tree_depth > 0:
 					CONFIG.tree_depth -= 1
 					ProcCollector.collapsed = {}
@@ -4873,6 +6937,7 @@ class Menu:
 						else:
 							CpuCollector.sensor_method = ""
 							CpuCollector.got_sensors = False
+							TempSampler.stop()
 					if selected in ["net_auto", "net_color_fixed", "net_sync"]:
 						if selected == "net_auto": NetCollector.auto_min = CONFIG.net_auto
 						NetBox.redraw = True
@@ -4881,6 +6946,8 @@ class Menu:
 						Draw.now(Term.bg)
 					if selected == "show_battery":
 						Draw.clear("battery", saved=True)
+					if selected == "proc_events" and CONFIG.proc_events:
+						ProcEvents.failed = False
 					Term.refresh(force=True)
 					cls.resized = False
 				elif key in ["left", "right"] and selected == "color_theme" and len(Theme.themes) > 1:
@@ -4928,6 +6995,27 @@ class Menu:
 					CONFIG.temp_scale = CONFIG.temp_scales[temp_scale_i]
 					Term.refresh(force=True)
 					cls.resized = False
+				elif key in ["left", "right"] and selected == "disks_sort":
+					if key == "left":
+						disks_sort_i -= 1
+						if disks_sort_i < 0: disks_sort_i = len(CONFIG.disks_sort_modes) - 1
+					if key == "right":
+						disks_sort_i += 1
+						if disks_sort_i > len(CONFIG.disks_sort_modes) - 1: disks_sort_i = 0
+					CONFIG.disks_sort = CONFIG.disks_sort_modes[disks_sort_i]
+					MemBox.disks_start = 0
+					Term.refresh(force=True)
+					cls.resized = False
+				elif key in ["left", "right"] and selected in ["cpu_heatmap", "cpu_heatmap_group"]:
+					if key == "left":
+						heatmap_i[selected] -= 1
+						if heatmap_i[selected] < 0: heatmap_i[selected] = len(heatmap_lists[selected]) - 1
+					if key == "right":
+						heatmap_i[selected] += 1
+						if heatmap_i[selected] > len(heatmap_lists[selected]) - 1: heatmap_i[selected] = 0
+					setattr(CONFIG, selected, heatmap_lists[selected][heatmap_i[selected]])
+					Term.refresh(force=True)
+					cls.resized = False
 				elif key in ["left", "right"] and selected == "cpu_sensor" and len(CONFIG.cpu_sensors) > 1:
 					if key == "left":
 						cpu_sensor_i -= 1
@@ -5257,6 +7345,7 @@ def clean_quit(errcode: int = 0, errmsg: str = "", thread: bool = False):
 	if THREAD_ERROR: errcode = THREAD_ERROR
 	Key.stop()
 	Collector.stop()
+	ProcCollector.stop_pool()
 	if not errcode: CONFIG.save_config()
 	Draw.now(Term.clear, Term.normal_screen, Term.show_cursor, Term.mouse_off, Term.mouse_direct_off, Term.title())
 	Term.echo(True)
@@ -5384,6 +7473,8 @@ def process_keys():
 			mouse_pos = Key.get_mouse()
 			if mouse_pos[0] >= ProcBox.x and ProcBox.current_y + 1 <= mouse_pos[1] < ProcBox.current_y + ProcBox.current_h - 1:
 				pass
+			elif key != "mouse_click" and "mem" in Box.boxes and CONFIG.show_disks and MemBox.divider < mouse_pos[0] < MemBox.x + MemBox.width - 1 and MemBox.y < mouse_pos[1] < MemBox.y + MemBox.height - 1:
+				key = key.replace("mouse", "disks")
 			elif key == "mouse_click":
 				key = "mouse_unselect"
 			else:
@@ -5451,13 +7542,17 @@ def process_keys():
 		if "proc" in Box.boxes:
 			if key in ["left", "right", "h", "l"]:
 				ProcCollector.sorting(key)
-			elif key == " " and CONFIG.proc_tree and ProcBox.selected > 0:
+			elif key == " " and CONFIG.proc_tree and ProcBox.selected > 0 and not ProcCollector.top_view:
 				if ProcBox.selected_pid in ProcCollector.collapsed:
 					ProcCollector.collapsed[ProcBox.selected_pid] = not ProcCollector.collapsed[ProcBox.selected_pid]
 				Collector.collect(ProcCollector, interrupt=True, redraw=True)
 			elif key == "e":
 				CONFIG.proc_tree = not CONFIG.proc_tree
 				Collector.collect(ProcCollector, interrupt=True, redraw=True)
+			elif key == "t":
+				ProcCollector.top_view = not ProcCollector.top_view
+				ProcBox.selected = ProcBox.selected_pid = 0
+				Collector.collect(ProcCollector, proc_interrupt=True, redraw=True, only_draw=True)
 			elif key == "r":
 				CONFIG.proc_reversed = not CONFIG.proc_reversed
 				Collector.collect(ProcCollector, interrupt=True, redraw=True)
@@ -5469,7 +7564,7 @@ def process_keys():
 				ProcCollector.case_sensitive = key == "F"
 				if not ProcCollector.search_filter: ProcBox.start = 0
 				Collector.collect(ProcCollector, redraw=True, only_draw=True)
-			elif key in ["T", "K", "I"] and (ProcBox.selected > 0 or ProcCollector.detailed):
+			elif key in ["T", "K", "I"] and ((ProcBox.selected > 0 and not ProcCollector.top_view) or ProcCollector.detailed):
 				pid: int = ProcBox.selected_pid if ProcBox.selected > 0 else ProcCollector.detailed_pid # type: ignore
 				if psutil.pid_exists(pid):
 					if key == "T": sig = signal.SIGTERM
@@ -5480,11 +7575,14 @@ def process_keys():
 					except Exception as e:
 						errlog.error(f'Exception when sending signal {sig} to pid {pid}')
 						errlog.exception(f'{e}')
+			elif key == "p" and ((ProcBox.selected > 0 and not ProcCollector.top_view) or ProcCollector.detailed):
+				ProcPinned.toggle(ProcBox.selected_pid if ProcBox.selected > 0 else ProcCollector.detailed_pid) # type: ignore
+				Collector.collect(ProcCollector, proc_interrupt=True, redraw=True, only_draw=True)
 			elif key == "delete" and ProcCollector.search_filter:
 				ProcCollector.search_filter = ""
 				Collector.collect(ProcCollector, proc_interrupt=True, redraw=True)
 			elif key == "enter":
-				if ProcBox.selected > 0 and ProcCollector.detailed_pid != ProcBox.selected_pid and psutil.pid_exists(ProcBox.selected_pid):
+				if ProcBox.selected > 0 and not ProcCollector.top_view and ProcCollector.detailed_pid != ProcBox.selected_pid and psutil.pid_exists(ProcBox.selected_pid):
 					ProcCollector.detailed = True
 					ProcBox.last_selection = ProcBox.selected
 					ProcBox.selected = 0
@@ -5539,6 +7637,13 @@ def process_keys():
 				Collector.collect_idle.wait()
 				CONFIG.io_mode = not CONFIG.io_mode
 				Collector.collect(MemCollector, interrupt=True, redraw=True)
+			elif key == "u" and CONFIG.show_disks:
+				CONFIG.disks_sort = CONFIG.disks_sort_modes[(CONFIG.disks_sort_modes.index(CONFIG.disks_sort) + 1) % len(CONFIG.disks_sort_modes)]
+				MemBox.disks_start = 0
+				Collector.collect(MemCollector, interrupt=True, redraw=True)
+			elif key in ["[", "]", "disks_scroll_up", "disks_scroll_down"] and CONFIG.show_disks:
+				MemBox.disks_start = max(0, MemBox.disks_start + (-1 if key in ["[", "disks_scroll_up"] else 1))
+				Collector.collect(MemCollector, interrupt=True, redraw=True)
 
 
 
@@ -5556,6 +7661,19 @@ THEME: Theme
 def main():
 	global THEME
 
+	if ARG_CGROUP:
+		try:
+			Cgroup.setup(ARG_CGROUP)
+		except Exception as e:
+			print(f'ERROR!\n{e}')
+			raise SystemExit(1)
+
+	if ARG_PID_ROOT:
+		if not psutil.pid_exists(ARG_PID_ROOT):
+			print(f'ERROR!\nNo process with pid {ARG_PID_ROOT}')
+			raise SystemExit(1)
+		ProcCollector.pid_root = ARG_PID_ROOT
+
 	Term.width = os.get_terminal_size().columns
 	Term.height = os.get_terminal_size().lines
 
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+'''Benchmark of the sharded process scan, reports seconds per 10k processes for 1 to N shards.
+Shards are read by ProcCollector._scan() in a thread pool, the same pid ranges read in a process pool are reported for comparison.
+Extra sleeping processes are started to get a larger process count, run from the repository root:
+
+	python3 tests/benchmark_proc_scan.py --procs 5000 --shards 8'''
+
+import os, sys, argparse, subprocess
+from time import perf_counter
+from math import ceil
+from typing import List, Dict, Any
+from concurrent.futures import ProcessPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+#* Cpu percent needs the cached process objects of the last scan, which can't be shared with worker processes
+POOL_ATTRS: List[str] = ["pid", "ppid", "name", "memory_percent", "cpu_times", "create_time", "cmdline", "num_threads", "username", "memory_info"]
+
+def read_shard(pids: List[int]) -> List[Dict[str, Any]]:
+	import psutil # type: ignore
+	out: List[Dict[str, Any]] = []
+	for pid in pids:
+		try:
+			out.append(psutil.Process(pid).as_dict(POOL_ATTRS, ad_value=0.0))
+		except psutil.Error:
+			continue
+	return out
+
+def main():
+	parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+	parser.add_argument("--procs", type=int, default=2000, help="number of extra sleeping processes to start (default 2000)")
+	parser.add_argument("--shards", type=int, default=4, help="highest shard count to measure (default 4)")
+	parser.add_argument("--runs", type=int, default=5, help="scans per shard count, the fastest is reported (default 5)")
+	args = parser.parse_args()
+	#* bpytop parses its own arguments when imported
+	sys.argv = sys.argv[:1]
+	import bpytop
+	from bpytop import ProcCollector, ProcBox
+
+	sleepers: List[subprocess.Popen] = [subprocess.Popen(["sleep", "600"]) for _ in range(args.procs)]
+	try:
+		ProcBox.width = 120
+		attrs: List[str] = ProcCollector._attrs("cpu lazy", [])
+		print(f'{"shards":>6} {"threads s/10k":>14} {"processes s/10k":>16} {"procs":>7}')
+		for shards in range(1, args.shards + 1):
+			bpytop.CONFIG.proc_shards = shards
+			ProcCollector.pmap.clear()
+			ProcCollector._scan(attrs, 0.0, [])
+			t_best: float = float("inf")
+			num: int = 0
+			for _ in range(args.runs):
+				start = perf_counter()
+				num = len(ProcCollector._scan(attrs, 0.0, []))
+				t_best = min(t_best, perf_counter() - start)
+			pids: List[int] = bpytop.psutil.pids()
+			size: int = ceil(len(pids) / shards)
+			p_best: float = float("inf")
+			with ProcessPoolExecutor(max_workers=shards) as pool:
+				list(pool.map(read_shard, [pids[i:i + size] for i in range(0, len(pids), size)]))
+				for _ in range(args.runs):
+					start = perf_counter()
+					list(pool.map(read_shard, [pids[i:i + size] for i in range(0, len(pids), size)]))
+					p_best = min(p_best, perf_counter() - start)
+			print(f'{shards:>6} {t_best * 10000 / max(1, num):>14.3f} {p_best * 10000 / max(1, len(pids)):>16.3f} {num:>7}')
+		ProcCollector.stop_pool()
+	finally:
+		for p in sleepers: p.kill()
+		for p in sleepers: p.wait()
+
+if __name__ == "__main__":
+	main()
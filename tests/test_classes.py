@@ -1,7 +1,8 @@
 import bpytop, pytest
+from collections import namedtuple
 from bpytop import Box, SubBox, CpuBox, MemBox, NetBox, ProcBox, Term, Draw
 from bpytop import Graph, Fx, Meter, Color, Banner
-from bpytop import Collector, CpuCollector, MemCollector, NetCollector, ProcCollector
+from bpytop import Collector, CpuCollector, MemCollector, NetCollector, ProcCollector, Cgroup, CpuStat, CpuTopology, Hwmon, CpuFreq, TempSampler, MemInfo, Mounts, DiskStats, DiskUsage, NetDev
 bpytop.Term.width, bpytop.Term.height = 80, 25
 
 def test_Fx_uncolor():
@@ -44,6 +45,23 @@ def test_CpuCollector_collect():
 	assert isinstance(CpuCollector.load_avg, list)
 	assert isinstance(CpuCollector.uptime, str)
 
+def test_CpuStat(tmp_path):
+	stat = tmp_path / "stat"
+	stat.write_text("cpu  100 0 100 700 100 0 0 0 0 0\ncpu0 100 0 100 700 100 0 0 0 0 0\nintr 1000 1 2 3\nctxt 5000\nprocesses 50\n")
+	CpuStat.path, CpuStat.file, CpuStat.last = str(stat), None, (0.0, {}, {})
+	try:
+		assert CpuStat.sample()
+		assert CpuStat.total == 20.0 and CpuStat.threads == [20.0]
+		assert CpuStat.times["iowait"] == 10.0 and CpuStat.counters == {"intr" : 1000, "ctxt" : 5000, "processes" : 50}
+		stat.write_text("cpu  150 0 150 700 100 0 0 0 50 0\ncpu0 150 0 150 700 100 0 0 0 50 0\nintr 1100 1 2 3\nctxt 5500\nprocesses 60\n")
+		CpuStat.last = (CpuStat.last[0] - 1, CpuStat.last[1], CpuStat.last[2])
+		assert CpuStat.sample()
+		assert CpuStat.total == 100.0 and CpuStat.times["user"] == 50.0 and CpuStat.times["guest"] == 50.0
+		assert round(CpuStat.ctxt_rate) == 500 and round(CpuStat.intr_rate) == 100
+	finally:
+		CpuStat.stop()
+		CpuStat.path, CpuStat.last = "/proc/stat", (0.0, {}, {})
+
 def test_CpuCollector_get_sensors():
 	bpytop.CONFIG.check_temp = True
 	bpytop.CONFIG.cpu_sensor = "Auto"
@@ -64,6 +82,58 @@ def test_CpuCollector_collect_temps():
 	assert isinstance(CpuCollector.cpu_temp_high, int)
 	assert isinstance(CpuCollector.cpu_temp_crit, int)
 
+def test_Hwmon(tmp_path):
+	for hwmon, name, files in [("hwmon0", "coretemp", {"temp1_input" : "45000", "temp1_label" : "Package id 0", "temp1_crit" : "100000", "temp10_input" : "41000", "temp10_label" : "Core 8", "temp2_input" : "40000", "temp2_label" : "Core 0"}),
+								("hwmon1", "nvme", {"temp1_input" : "35000", "temp1_label" : "Composite"}), ("hwmon2", "broken", {"temp1_input" : ""})]:
+		(tmp_path / hwmon).mkdir()
+		(tmp_path / hwmon / "name").write_text(name)
+		for file, value in files.items(): (tmp_path / hwmon / file).write_text(value)
+	Hwmon.root = str(tmp_path)
+	try:
+		sensors = Hwmon.temperatures()
+		assert list(sensors) == ["coretemp", "nvme"]
+		assert [(e.label, e.current, e.high, e.critical) for e in sensors["coretemp"]] == [("Package id 0", 45.0, 100.0, 100.0), ("Core 8", 41.0, None, None), ("Core 0", 40.0, None, None)]
+		(tmp_path / "hwmon0" / "temp1_input").write_text("47000")
+		assert Hwmon.temperatures()["coretemp"][0].current == 47.0
+		assert Hwmon.temperatures("coretemp:Core 0") is Hwmon.sensors and Hwmon.temperatures("nvme:2") is not Hwmon.sensors
+	finally:
+		Hwmon.reset()
+		Hwmon.root = "/sys/class/hwmon"
+
+def test_CpuFreq(tmp_path):
+	(tmp_path / "cpu0" / "cpufreq").mkdir(parents=True)
+	(tmp_path / "cpu0" / "cpufreq" / "scaling_cur_freq").write_text("2400000\n")
+	CpuFreq.root = str(tmp_path)
+	try:
+		CpuFreq.search()
+		assert CpuFreq.update()
+		assert CpuFreq.cores[0] == 2400 and CpuFreq.average == CpuFreq.low == CpuFreq.high == 2400
+		(tmp_path / "cpu0" / "cpufreq" / "scaling_cur_freq").write_text("800000\n")
+		assert CpuFreq.update() and CpuFreq.average == 2400
+		CpuFreq.last = 0.0
+		assert CpuFreq.update() and CpuFreq.average == 800
+	finally:
+		CpuFreq.stop()
+		CpuFreq.root = "/sys/devices/system/cpu"
+
+def test_TempSampler(monkeypatch):
+	monkeypatch.setattr(TempSampler, "_sample", staticmethod(lambda method: (55, [50, 52])))
+	TempSampler.start("coretemp")
+	try:
+		for _ in range(100):
+			if TempSampler.take()[0] >= 0: break
+			bpytop.sleep(0.01)
+		assert TempSampler.take() == (55, [50, 52])
+	finally:
+		TempSampler.stop()
+	assert TempSampler.take() == (-1, [])
+	monkeypatch.setattr(TempSampler, "_sample", staticmethod(lambda method: int("")))
+	TempSampler.start("vcgencmd")
+	TempSampler.thread.join(timeout=2)
+	with pytest.raises(ValueError):
+		TempSampler.take()
+	TempSampler.stop()
+
 def test_MemCollector_collect():
 	MemBox.width = 20
 	bpytop.CONFIG.show_swap = True
@@ -80,6 +150,149 @@ def test_MemCollector_collect():
 	else:
 		assert len(MemCollector.disks) > 0
 
+def test_Mounts(monkeypatch):
+	part = namedtuple("sdiskpart", ["device", "mountpoint", "fstype", "opts"])
+	calls = []
+	def partitions(all=False):
+		calls.append(all)
+		return [part("/dev/sda1", "/", "ext4", "rw"), part("/dev/loop0", "/snap/x", "squashfs", "ro")]
+	monkeypatch.setattr(bpytop.psutil, "disk_partitions", partitions)
+	Mounts.key = ()
+	assert [d.mountpoint for d in Mounts.partitions(["squashfs"])] == ["/"]
+	Mounts.partitions(["squashfs"])
+	if bpytop.SYSTEM == "Linux" and Mounts.poller:
+		assert len(calls) == 1
+	bpytop.CONFIG.disks_filter = "exclude=/"
+	try:
+		assert Mounts.partitions(["squashfs"]) == []
+	finally:
+		bpytop.CONFIG.disks_filter = ""
+		Mounts.key = ()
+
+def test_Mounts_bind(monkeypatch, tmp_path):
+	part = namedtuple("sdiskpart", ["device", "mountpoint", "fstype", "opts"])
+	mountinfo = tmp_path / "mountinfo"
+	mountinfo.write_text("22 1 8:1 / / rw - ext4 /dev/sda1 rw\n23 22 0:30 / /run rw - tmpfs tmpfs rw\n24 22 0:31 / /tmp rw - tmpfs tmpfs rw\n"
+		"25 22 8:1 /srv /mnt/my\\040srv rw - ext4 /dev/sda1 rw\n")
+	monkeypatch.setattr(Mounts, "mountinfo", str(mountinfo))
+	monkeypatch.setattr(bpytop, "SYSTEM", "Linux")
+	monkeypatch.setattr(bpytop.psutil, "disk_partitions", lambda all=False: [part("/dev/sda1", "/", "ext4", "rw"), part("tmpfs", "/run", "tmpfs", "rw"),
+		part("tmpfs", "/tmp", "tmpfs", "rw"), part("/dev/sda1", "/mnt/my srv", "ext4", "rw")])
+	Mounts.key = ()
+	try:
+		assert [d.mountpoint for d in Mounts.partitions([])] == ["/", "/run", "/tmp"]
+		assert Mounts.names == {"/" : "/dev/sda1", "/run" : "tmpfs:/run", "/tmp" : "tmpfs:/tmp"}
+	finally:
+		Mounts.key = ()
+
+def test_MemCollector_disks(monkeypatch):
+	part = namedtuple("sdiskpart", ["device", "mountpoint", "fstype", "opts"])
+	usage = namedtuple("sdiskusage", ["total", "used", "free", "percent"])
+	mounts = [part(f'/dev/sd{i}', f'/mnt/{i}', "ext4", "rw") for i in range(10)] + [part("/dev/sd3", "/bind", "ext4", "rw")]
+	monkeypatch.setattr(bpytop.psutil, "disk_partitions", lambda all=False: mounts)
+	monkeypatch.setattr(bpytop.psutil, "disk_usage", lambda mount: usage(100, int(mount[-1]) * 10, 100 - int(mount[-1]) * 10, int(mount[-1]) * 10))
+	monkeypatch.setattr(MemCollector, "_io_counters", classmethod(lambda cls: {}))
+	monkeypatch.setattr(MemBox, "height", 10)
+	monkeypatch.setattr(bpytop.CONFIG, "show_disks", True)
+	monkeypatch.setattr(bpytop.CONFIG, "swap_disk", False)
+	monkeypatch.setattr(bpytop.CONFIG, "io_mode", False)
+	monkeypatch.setattr(bpytop.CONFIG, "show_io_stat", False)
+	monkeypatch.setattr(bpytop.CONFIG, "disks_sort", "usage")
+	Mounts.key = ()
+	try:
+		MemCollector._collect()
+		assert MemCollector.disks_window == (0, 4, 10)
+		assert [disk["name"] for disk in MemCollector.disks.values()] == ["9", "8", "7", "6"]
+		MemBox.disks_start = 20
+		MemCollector._collect()
+		assert MemCollector.disks_window == (6, 10, 10) and MemBox.disks_start == 6
+		assert [disk["name"] for disk in MemCollector.disks.values()] == ["3", "2", "1", "0"]
+	finally:
+		MemBox.disks_start = 0
+		Mounts.key = ()
+		DiskUsage.results, DiskUsage.next_poll = {}, {}
+
+def test_Config_mem_extra(tmp_path, monkeypatch):
+	conf_file = tmp_path / "bpytop.conf"
+	conf_file.write_text('mem_extra="dirty slab"\n')
+	monkeypatch.setattr(bpytop.Config, "warnings", [])
+	conf = bpytop.Config.__new__(bpytop.Config)
+	object.__setattr__(conf, "config_file", str(conf_file))
+	assert conf.load_config()["mem_extra"] == "dirty slab" and conf.warnings == []
+	conf_file.write_text('mem_extra="dirty bogus"\n')
+	assert conf.load_config()["mem_extra"] == "_error_" and len(conf.warnings) == 1
+
+def test_MemInfo(tmp_path):
+	meminfo = tmp_path / "meminfo"
+	meminfo.write_text("MemTotal:       1000 kB\nMemFree:         200 kB\nMemAvailable:    600 kB\nBuffers:          50 kB\nCached:          300 kB\n"
+		"SwapTotal:       400 kB\nSwapFree:        100 kB\nDirty:            10 kB\nSlab:             40 kB\nSReclaimable:     30 kB\n"
+		"HugePages_Total:       4\nHugePages_Free:        1\nHugepagesize:       2 kB\n")
+	MemInfo.path, MemInfo.file = str(meminfo), None
+	try:
+		assert MemInfo.read()
+		assert MemInfo.memory() == {"total" : 1024000, "free" : 204800, "available" : 614400, "cached" : 337920, "used" : 409600}
+		assert MemInfo.values["SwapTotal"] == 409600 and MemInfo.values["SwapFree"] == 102400
+		assert MemInfo.extra("dirty") == 10240 and MemInfo.extra("slab") == 40960 and MemInfo.extra("hugepages") == 6144
+	finally:
+		MemInfo.file.close()
+		MemInfo.path, MemInfo.file, MemInfo.values = "/proc/meminfo", None, {}
+
+def test_DiskStats(tmp_path):
+	stats = tmp_path / "diskstats"
+	stats.write_text("   8       0 sda 100 0 2048 10 50 0 4096 20 1 300 400 0 0 0 0\n   8       1 sda1 10 0 8 1 5 0 8 2 0 3 4\n")
+	DiskStats.path, DiskStats.file = str(stats), None
+	try:
+		assert DiskStats.read()
+		assert DiskStats.stats == {"sda" : (2048 * 512, 4096 * 512, 150, 400, 300), "sda1" : (8 * 512, 8 * 512, 15, 4, 3)}
+		assert MemCollector._io_name("/dev/sda1", DiskStats.stats) == "sda1"
+		assert MemCollector._io_name("/dev/mapper/sda", DiskStats.stats) == "sda"
+		assert MemCollector._io_name("/dev/nvme0n1", DiskStats.stats) == ""
+	finally:
+		DiskStats.file.close()
+		DiskStats.path, DiskStats.file = "/proc/diskstats", None
+
+def test_DiskUsage(monkeypatch):
+	release = bpytop.threading.Event()
+	def disk_usage(mount):
+		if mount == "/hung": release.wait(5)
+		return mount
+	monkeypatch.setattr(bpytop.psutil, "disk_usage", disk_usage)
+	try:
+		usage = DiskUsage.usage(["/", "/hung"])
+		assert usage["/"] == "/" and not "/hung" in usage and DiskUsage.stale == {"/hung"}
+		release.set()
+		for _ in range(100):
+			if not "/hung" in DiskUsage.pending: break
+			bpytop.sleep(0.01)
+		assert DiskUsage.results["/hung"] == "/hung" and DiskUsage.next_poll["/hung"] > bpytop.time()
+		DiskUsage.usage(["/", "/hung"])
+		assert DiskUsage.stale == set() and not "/hung" in DiskUsage.pending
+		DiskUsage.prune(["/"])
+		assert not "/hung" in DiskUsage.results and not "/hung" in DiskUsage.next_poll
+		monkeypatch.setattr(DiskUsage, "min_workers", 0)
+		monkeypatch.setattr(DiskUsage, "slow_interval", 0.01)
+		with DiskUsage.cond: DiskUsage.cond.notify_all()
+		for _ in range(100):
+			if DiskUsage.started == 0: break
+			bpytop.sleep(0.01)
+		assert DiskUsage.started == 0
+	finally:
+		release.set()
+		DiskUsage.results, DiskUsage.next_poll = {}, {}
+
+def test_NetDev(tmp_path):
+	dev = tmp_path / "dev"
+	dev.write_text("Inter-|   Receive                                                |  Transmit\n"
+		" face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed\n"
+		"  eth0:  589692      75    1    2    0     0          0         0     8614      76    3    4    0     0       0          0\n")
+	NetDev.path, NetDev.file = str(dev), None
+	try:
+		assert NetDev.read()
+		assert NetDev.stats == {"eth0" : (8614, 589692, 76, 75, 1, 3, 2, 4)}
+	finally:
+		NetDev.file.close()
+		NetDev.path, NetDev.file, NetDev.stats = "/proc/net/dev", None, {}
+
 def test_NetCollector_get_nics():
 	NetCollector._get_nics()
 	if NetCollector.nic == "":
@@ -104,6 +317,254 @@ def test_ProcCollector_collect():
 	ProcCollector.processes = {}
 	ProcCollector._collect()
 	assert len(ProcCollector.processes) > 0
+	bpytop.CONFIG.proc_tree = False
+	bpytop.CONFIG.proc_shards = 4
+	ProcCollector._collect()
+	assert len(ProcCollector.processes) > 0 and ProcCollector.shard_workers == 4
+	bpytop.CONFIG.proc_shards = 1
+	ProcCollector._collect()
+	assert ProcCollector.shard_pool is None
+	bpytop.CONFIG.proc_hide_kernel = True
+	ProcCollector.search_filter = "python"
+	ProcCollector._collect()
+	assert all("python" in (p.name + p.cmd).lower() for p in ProcCollector.processes.values())
+	ProcCollector.search_filter = ""
+	bpytop.CONFIG.proc_hide_kernel = False
+	bpytop.CONFIG.proc_fds = True
+	bpytop.CONFIG.proc_sorting = "sockets"
+	with bpytop.socket.socket(bpytop.socket.AF_INET, bpytop.socket.SOCK_STREAM) as sock:
+		sock.bind(("127.0.0.1", 0))
+		sock.listen()
+		ProcCollector._collect()
+	assert ProcCollector.processes[bpytop.os.getpid()].fds >= ProcCollector.processes[bpytop.os.getpid()].sockets >= 1
+	bpytop.CONFIG.proc_fds = False
+	bpytop.CONFIG.proc_sorting = "cpu lazy"
+	child = bpytop.subprocess.Popen(["sleep", "10"])
+	ProcCollector.pid_root = bpytop.os.getpid()
+	ProcCollector.collapsed = {}
+	try:
+		for tree in [False, True]:
+			bpytop.CONFIG.proc_tree = tree
+			ProcCollector._collect()
+			assert set(ProcCollector.processes) == {bpytop.os.getpid(), child.pid}
+		bpytop.CONFIG.tree_totals = True
+		bpytop.CONFIG.proc_sorting = "threads"
+		ProcCollector._collect()
+		root = ProcCollector.processes[bpytop.os.getpid()]
+		assert root.threads > ProcCollector.processes[child.pid].threads and root.mem >= ProcCollector.processes[child.pid].mem
+		bpytop.CONFIG.tree_totals = False
+		ProcCollector.collapsed[bpytop.os.getpid()] = True
+		ProcCollector._collect()
+		assert set(ProcCollector.processes) == {bpytop.os.getpid()} and ProcCollector.processes[bpytop.os.getpid()].threads >= 2
+	finally:
+		bpytop.CONFIG.tree_totals = False
+		bpytop.CONFIG.proc_sorting = "cpu lazy"
+		ProcCollector.collapsed = {}
+		ProcCollector.pid_root = 0
+		bpytop.CONFIG.proc_tree = False
+		child.kill()
+		child.wait()
+
+def test_ProcCollector_tree_roots(monkeypatch):
+	def proc(pid, ppid, smooth=0.0):
+		return bpytop.ProcExited(pid, {"pid" : pid, "ppid" : ppid, "name" : f'p{pid}', "cmdline" : [], "username" : "", "num_threads" : 1, "memory_percent" : 0.0, "cpu_percent" : 0.0, "cpu_smooth" : smooth})
+	procs = [proc(10, 5, 1.0), proc(11, 10, 5.0), proc(12, 10, 5.0), proc(20, 7, 8.0)]
+	monkeypatch.setattr(ProcCollector, "_scan", classmethod(lambda cls, attrs, err, search: procs))
+	ProcCollector.collapsed = {}
+	try:
+		ProcCollector._tree(sort_cmd=ProcCollector.sort_expr["pid"], reverse=False, proc_per_cpu=False, search=[])
+		assert [(pid, p.depth) for pid, p in ProcCollector.processes.items()] == [(10, 1), (11, 2), (12, 2), (20, 1)]
+		bpytop.CONFIG.proc_sorting = "cpu smooth"
+		ProcCollector._tree(sort_cmd=ProcCollector.sort_expr["cpu smooth"], reverse=True, proc_per_cpu=False, search=[])
+		assert list(ProcCollector.processes)[0] == 20
+		bpytop.CONFIG.tree_sort_totals = True
+		ProcCollector._tree(sort_cmd=ProcCollector.sort_expr["cpu smooth"], reverse=True, proc_per_cpu=False, search=[])
+		assert list(ProcCollector.processes)[0] == 10
+	finally:
+		bpytop.CONFIG.tree_sort_totals = False
+		bpytop.CONFIG.proc_sorting = "cpu lazy"
+		ProcCollector.collapsed = {}
+
+def test_ProcCollector_attrs():
+	width = ProcBox.width
+	try:
+		ProcBox.width = 44
+		assert not {"cmdline", "num_threads", "username"} & set(ProcCollector._attrs("cpu lazy", []))
+		assert "username" in ProcCollector._attrs("user", [])
+		ProcBox.width = 120
+		assert {"cmdline", "num_threads", "username"} <= set(ProcCollector._attrs("cpu lazy", []))
+	finally:
+		ProcBox.width = width
+
+def test_ProcCollector_smooth():
+	p = bpytop.ProcExited(999999, {"cpu_percent" : 100.0})
+	ProcCollector._smooth([p])
+	assert p.info["cpu_smooth"] == 100.0
+	ProcCollector.cpu_smooth[999999] = (100.0, bpytop.time() - bpytop.CONFIG.proc_smooth_halflife)
+	p.info["cpu_percent"] = 0.0
+	ProcCollector._smooth([p])
+	assert 49.0 < p.info["cpu_smooth"] <= 50.0
+	del ProcCollector.cpu_smooth[999999]
+
+def test_ProcTop():
+	sketch = bpytop.SpaceSaving(2)
+	for key, value in [("a", 5.0), ("b", 1.0), ("c", 2.0), ("a", 1.0)]:
+		sketch.add(key, value)
+	assert sketch.top(2) == [("a", 6.0, 0.0), ("c", 3.0, 1.0)]
+	from collections import namedtuple
+	times = namedtuple("times", ["user", "system", "children_user", "children_system"])
+	p = bpytop.ProcExited(999999, {"name" : "cc1", "create_time" : 0.0, "cpu_times" : times(1.0, 1.0, 0.0, 0.0)})
+	bpytop.ProcTop.update([p])
+	p.info["cpu_times"] = times(2.0, 1.5, 3.0, 0.0)
+	bpytop.ProcTop.update([p])
+	top, total = bpytop.ProcTop.top(5)
+	assert top[0] == ("cc1 (exited children)", 3.0, 0.0) and top[1] == ("cc1", 1.5, 0.0) and total >= 4.5
+	bpytop.ProcTop.buckets.clear()
+	bpytop.ProcTop.cpu_times = {}
+
+def test_ProcAcct(tmp_path):
+	def record(name, utime, stime, version=3):
+		return bpytop.ProcAcct.record.pack(0, version, 0, 0, 0, 0, 4242, 1, 0, 0.0, utime, stime, 0, 0, 0, 0, 0, 0, name)
+	acct = tmp_path / "pacct"
+	acct.write_bytes(record(b"old", 100, 0))
+	bpytop.CONFIG.proc_acct_file = str(acct)
+	try:
+		bpytop.ProcAcct.read()
+		assert bpytop.ProcAcct.active and bpytop.ProcAcct.count == 0
+		with acct.open("ab") as f:
+			#* 0x2001 is comp_t for 8 ticks, mantissa 1 with base-8 exponent 1
+			f.write(record(b"cc1", 150, 50) + record(b"cc1", 0x2001, 0) + record(b"ld", 10, 0) + record(b"v2", 10, 0, version=2) + b"partial")
+		bpytop.ProcAcct.read()
+		assert bpytop.ProcAcct.count == 3 and bpytop.ProcAcct.top_names(1) == [("cc1", 2)]
+		assert bpytop.ProcAcct.cpu_time == pytest.approx((150 + 50 + 8 + 10) / 100)
+		assert bpytop.ProcAcct.offset == 5 * 64
+		acct.write_bytes(record(b"rotated", 1, 0))
+		bpytop.ProcAcct.read()
+		assert bpytop.ProcAcct.top_names(5) == [("rotated", 1)]
+	finally:
+		bpytop.CONFIG.proc_acct_file = ""
+		bpytop.ProcAcct.active = False
+
+def test_ProcLifecycle(tmp_path):
+	bpytop.CONFIG.proc_log_file = str(tmp_path / "proc.log")
+	p = bpytop.ProcExited(999998, {"name" : "crashy"})
+	bpytop.ProcLifecycle.last_update = 0.0
+	try:
+		bpytop.ProcLifecycle.update([1, 999999], [], [], host=False)
+		bpytop.ProcLifecycle.update([1, 999998], [p], [], host=False)
+		assert [e[1:] for e in list(bpytop.ProcLifecycle.events)[-2:]] == [(True, 999998, "crashy"), (False, 999999, "")]
+		assert bpytop.ProcLifecycle.fork_rate > 0 and bpytop.ProcLifecycle.exit_rate > 0
+		assert (tmp_path / "proc.log").read_text().splitlines()[0].endswith("\tstart\t999998\tcrashy")
+		if bpytop.SYSTEM == "Linux":
+			stat = tmp_path / "stat"
+			stat.write_text("cpu  100 0 100 700 100 0 0 0 0 0\nprocesses 50\n")
+			bpytop.CONFIG.proc_log_file = ""
+			CpuStat.path, CpuStat.file, CpuStat.stamp = str(stat), None, 0.0
+			bpytop.ProcLifecycle.update([1], [], [])
+			stat.write_text("cpu  100 0 100 700 100 0 0 0 0 0\nprocesses 60\n")
+			#* Rate follows the time between counter reads, not between updates
+			CpuStat.stamp = 0.0
+			bpytop.ProcLifecycle.forks_stamp -= 4
+			bpytop.ProcLifecycle.last_update -= 100
+			bpytop.ProcLifecycle.update([1], [], [])
+			assert 2.4 < bpytop.ProcLifecycle.fork_rate <= 2.5
+	finally:
+		bpytop.CONFIG.proc_log_file = ""
+		bpytop.ProcLifecycle.last_update = 0.0
+		bpytop.ProcLifecycle.forks = -1
+		CpuStat.stop()
+		CpuStat.path = "/proc/stat"
+
+def test_ProcEvents():
+	import queue, struct
+	class FakeSource:
+		def __init__(self):
+			self.queue = queue.Queue()
+		def recv(self, size):
+			try:
+				return self.queue.get(timeout=0.05)
+			except queue.Empty:
+				raise bpytop.socket.timeout
+		def close(self):
+			pass
+	def event(what, *values):
+		data = struct.pack("=IIQ", what, 0, 0) + struct.pack(f'={len(values)}I', *values)
+		return struct.pack("=IHHII", 36 + len(data), 3, 0, 0, 0) + struct.pack("=IIIIHH", 1, 1, 0, 0, len(data), 0) + data
+	def wait_for(test):
+		for _ in range(100):
+			if test(): return True
+			bpytop.sleep(0.01)
+		return False
+	source = FakeSource()
+	bpytop.Box.boxes = ["proc"]
+	bpytop.CONFIG.proc_events = True
+	bpytop.ProcEvents.start(source)
+	try:
+		ProcCollector._collect()
+		assert bpytop.os.getpid() in ProcCollector.processes and bpytop.os.getpid() in ProcCollector.static
+		child = bpytop.subprocess.Popen(["sleep", "10"])
+		source.queue.put(event(bpytop.ProcEvents.PROC_EVENT_FORK, bpytop.os.getpid(), bpytop.os.getpid(), child.pid, child.pid))
+		assert wait_for(lambda: child.pid in bpytop.ProcEvents.recent and bpytop.readfile(f'/proc/{child.pid}/comm') == "sleep")
+		source.queue.put(event(bpytop.ProcEvents.PROC_EVENT_EXEC, child.pid, child.pid))
+		source.queue.put(event(bpytop.ProcEvents.PROC_EVENT_EXEC, bpytop.os.getpid(), bpytop.os.getpid()))
+		assert wait_for(lambda: bpytop.ProcEvents.recent.get(child.pid, [0, ""])[1] == "sleep")
+		child.kill()
+		child.wait()
+		source.queue.put(event(bpytop.ProcEvents.PROC_EVENT_EXIT, child.pid, child.pid, 0, 9))
+		assert wait_for(lambda: not bpytop.ProcEvents.recent and bpytop.os.getpid() in bpytop.ProcEvents.changed and child.pid in bpytop.ProcEvents.changed)
+		ProcCollector._collect()
+		assert ProcCollector.processes[child.pid].name == "sleep"
+		ProcCollector._collect()
+		assert child.pid not in ProcCollector.processes
+		ProcCollector.pid_root = bpytop.os.getpid()
+		ProcCollector._collect()
+		assert not bpytop.ProcEvents.active and bpytop.ProcEvents.source is None
+		ProcCollector.pid_root = 0
+		def broken(size):
+			raise OSError(bpytop.errno.EBADF, "Bad file descriptor")
+		source.recv = broken
+		bpytop.ProcEvents.start(source)
+		assert wait_for(lambda: bpytop.ProcEvents.failed and not bpytop.ProcEvents.active)
+		assert bpytop.ProcEvents.source is None
+	finally:
+		ProcCollector.pid_root = 0
+		bpytop.CONFIG.proc_events = False
+		bpytop.ProcEvents.stop()
+		bpytop.ProcEvents.failed = False
+		ProcCollector.static.clear()
+
+def test_ProcPinned():
+	bpytop.CONFIG.proc_pinned_ms = 10
+	bpytop.ProcPinned.toggle(bpytop.os.getpid())
+	try:
+		assert bpytop.os.getpid() in bpytop.ProcPinned.pids
+		start = bpytop.time()
+		while bpytop.time() - start < 0.2: pass
+		samples, cpu, mem = bpytop.ProcPinned.take(bpytop.os.getpid())
+		assert len(samples) > 2 and mem > 0
+		Box.calc_sizes()
+		ProcBox._draw_fg()
+		assert ProcBox.footer_h == 2 and bpytop.os.getpid() in bpytop.Graphs.pinned
+	finally:
+		bpytop.ProcPinned.toggle(bpytop.os.getpid())
+		bpytop.CONFIG.proc_pinned_ms = 100
+	assert not bpytop.ProcPinned.pids and bpytop.ProcPinned.thread is None and not bpytop.ProcPinned.fds
+
+def test_Cgroup(tmp_path):
+	for name, value in [("cgroup.controllers", "cpu memory"), ("cgroup.procs", f'{bpytop.os.getpid()}\n'), ("cpu.stat", "usage_usec 1000\n"), ("cpu.max", "max 100000"),
+						("memory.current", "1048576"), ("memory.max", "4194304"), ("memory.stat", "anon 524288\nfile 524288\n")]:
+		(tmp_path / name).write_text(value)
+	(tmp_path / "child").mkdir()
+	(tmp_path / "child" / "cgroup.procs").write_text("1\n")
+	Cgroup.setup(str(tmp_path))
+	try:
+		assert Cgroup.version == 2
+		assert Cgroup.pids() == sorted([1, bpytop.os.getpid()])
+		assert Cgroup.memory() == {"total" : 4194304, "free" : 3145728, "available" : 3670016, "cached" : 524288, "used" : 524288}
+		assert Cgroup.cpu_percent() == 0
+		assert Cgroup.swap() is None
+	finally:
+		Cgroup.path = ""
 
 def test_CpuBox_draw():
 	Box.calc_sizes()
@@ -111,6 +572,19 @@ def test_CpuBox_draw():
 	CpuBox._draw_fg()
 	assert "cpu" in Draw.strings
 
+def test_CpuBox_heatmap():
+	assert CpuTopology.cpulist("0-3,8-9,12") == [0, 1, 2, 3, 8, 9, 12]
+	assert CpuTopology.groups("none") == [("", list(range(1, bpytop.THREADS + 1)))]
+	bpytop.CONFIG.cpu_heatmap = "on"
+	try:
+		Box.calc_sizes()
+		CpuCollector._collect()
+		CpuBox._draw_fg()
+		assert CpuBox.heatmap and bpytop.Symbol.meter in Draw.strings["cpu"]
+	finally:
+		bpytop.CONFIG.cpu_heatmap = "auto"
+		Box.calc_sizes()
+
 def test_MemBox_draw():
 	bpytop.CONFIG.show_disks = True
 	Box.calc_sizes()
@@ -124,6 +598,15 @@ def test_NetBox_draw():
 	NetBox._draw_fg()
 	assert "net" in Draw.strings
 
+def test_ProcBox_selector_top_view():
+	ProcCollector.top_view = True
+	ProcBox.selected = 0
+	try:
+		ProcBox.selector("down")
+		assert ProcBox.selected == 0
+	finally:
+		ProcCollector.top_view = False
+
 def test_ProcBox_draw():
 	Box.calc_sizes()
 	assert len(ProcBox._draw_bg()) > 1